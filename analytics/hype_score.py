@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+# Hourly metric columns the hype score is computed from, with the weights of the original formula:
+# (tweets * 0.4) + (likes * 0.3) + (retweets * 0.2) + (replies * 0.1) + (sentiment * 10)
+HYPE_FEATURES = ("tweet_count", "likes_mean", "retweets_mean", "replies_mean", "sentiment_mean")
+LEGACY_HYPE_WEIGHTS = {"tweet_count": 0.4, "likes_mean": 0.3, "retweets_mean": 0.2, "replies_mean": 0.1, "sentiment_mean": 10.0}
+
+HYPE_MODES = ("weighted", "legacy")
+HYPE_NORMALIZATIONS = ("none", "zscore", "minmax")
+
+
+def parse_weights(value: Optional[str]) -> Dict[str, float]:
+    """
+    Hype weights from a "feature=weight,..." string (HYPE_WEIGHTS). Features left out keep
+    their legacy weight; set one to 0 to ignore it.
+    """
+    weights = dict(LEGACY_HYPE_WEIGHTS)
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        feature, _, weight = item.partition("=")
+        feature = feature.strip()
+        if feature not in LEGACY_HYPE_WEIGHTS:
+            raise ValueError(f"Unknown hype feature: {feature}")
+        weights[feature] = float(weight)
+    return weights
+
+
+class HypeScoreEngine:
+    """
+    Vectorized hype score of the hourly metrics of one search term.
+
+    Each hour is scored as the weighted sum of its metrics, computed over all hours at once.
+    Options, on top of the weights:
+    - normalization: "zscore" or "minmax" rescales every metric across the hours of the
+      term first, so the weights compare metrics on the same scale instead of raw counts
+    - decay_half_life: hours after which an hour's score counts half, by its distance to
+      the current hour of day (the hourly metrics are per hour of day); 0 disables decay
+
+    Scores come back as an array aligned with the rows of the metrics frame. The "legacy"
+    mode is the original formula (legacy weights, no normalization, no decay).
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Mapping[str, float]] = None,
+        normalization: str = "none",
+        decay_half_life: float = 0,
+        mode: str = "weighted"
+    ):
+        if mode not in HYPE_MODES:
+            raise ValueError(f"Unknown hype score mode: {mode}")
+        if normalization not in HYPE_NORMALIZATIONS:
+            raise ValueError(f"Unknown hype score normalization: {normalization}")
+
+        if mode == "legacy":
+            weights, normalization, decay_half_life = LEGACY_HYPE_WEIGHTS, "none", 0
+
+        weights = {**LEGACY_HYPE_WEIGHTS, **(weights or {})}
+        self.weights = np.array([float(weights[feature]) for feature in HYPE_FEATURES])
+        self.normalization = normalization
+        self.decay_half_life = float(decay_half_life)
+        self.mode = mode
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "HypeScoreEngine":
+        return cls(
+            weights=parse_weights(config.get("HYPE_WEIGHTS")),
+            normalization=config.get("HYPE_NORMALIZATION", "none"),
+            decay_half_life=config.get("HYPE_DECAY_HALF_LIFE_HOURS", 0),
+            mode=config.get("HYPE_SCORE_MODE", "weighted")
+        )
+
+    def _features(self, hourly_stats: pd.DataFrame) -> np.ndarray:
+        """Metric matrix (hours x features); missing or non-numeric values count as 0."""
+        columns = [
+            pd.to_numeric(hourly_stats[feature], errors="coerce") if feature in hourly_stats else pd.Series(0.0, index=hourly_stats.index)
+            for feature in HYPE_FEATURES
+        ]
+        return np.nan_to_num(np.column_stack([column.to_numpy(dtype=float) for column in columns]))
+
+    def _normalize(self, features: np.ndarray) -> np.ndarray:
+        if self.normalization == "zscore":
+            std = features.std(axis=0)
+            return np.divide(features - features.mean(axis=0), std, out=np.zeros_like(features), where=std > 0)
+        if self.normalization == "minmax":
+            low = features.min(axis=0)
+            span = features.max(axis=0) - low
+            return np.divide(features - low, span, out=np.zeros_like(features), where=span > 0)
+        return features
+
+    def _decay(self, hours: np.ndarray, now: Optional[datetime]) -> np.ndarray:
+        current_hour = (now or datetime.utcnow()).hour
+        age = (current_hour - hours) % 24
+        return np.power(0.5, age / self.decay_half_life)
+
+    def score(self, hourly_stats: pd.DataFrame, now: Optional[datetime] = None) -> np.ndarray:
+        """
+        Hype score of every row of `hourly_stats`, rounded to 2 decimals.
+
+        Parameters:
+        - hourly_stats: Hourly metrics (HOURLY_METRIC_COLUMNS)
+        - now: Reference time for the decay (utcnow by default)
+
+        Returns:
+        - float array aligned with the rows of `hourly_stats`
+        """
+        if hourly_stats.empty:
+            return np.zeros(0)
+
+        features = self._normalize(self._features(hourly_stats))
+        # Column by column, in the order of the original formula, so the legacy mode gives
+        # the same floats
+        scores = np.zeros(len(features))
+        for column, weight in enumerate(self.weights):
+            scores = scores + features[:, column] * weight
+        if self.decay_half_life > 0 and "hour" in hourly_stats:
+            hours = pd.to_numeric(hourly_stats["hour"], errors="coerce").fillna(0).to_numpy(dtype=int)
+            scores = scores * self._decay(hours, now)
+        return np.round(scores, 2)
@@ -1,12 +1,15 @@
 import pandas as pd
 from flask import current_app
-from preprocess.tweets_preprocess import process_tweet
+from analytics.hype_score import HypeScoreEngine
+from preprocess.tweet_batch import TweetBatch
 
+from utils.instrumentation import instrumented
 from utils.logger import handle_logger
 
-def analytic_tweets(raw_tweets: list):
+@instrumented("analytics")
+def analytic_tweets(raw_tweets, sia=None):
     """
-    Analyzes a list of raw tweets and calculates various metrics per hour.
+    Analyzes a batch of tweets and calculates various metrics per hour.
 
     Metrics calculated:
     - Average sentiment per hour
@@ -14,41 +17,28 @@ def analytic_tweets(raw_tweets: list):
     - Average likes per hour
     - Average retweets per hour
     - Average replies per hour
-    - Average shares per hour
 
     Parameters:
-    - raw_tweets: List of dictionaries with at least the keys "text", "created_at", and optionally "public_metrics"
+    - raw_tweets: A `TweetBatch`, or a list of tweet dicts (stored documents) with at least
+      the keys "text" and "created_at"
+    - sia: Optional sentiment analyzer shared between calls
+
+    Tweets without current sentiment are scored in place; the hourly frame is built
+    straight from the batch columns.
 
     Returns:
     - A DataFrame with hourly metrics
     """
     try:
-        processed_tweets = process_tweet(raw_tweets)
-        df = pd.DataFrame(processed_tweets)
+        batch = raw_tweets if isinstance(raw_tweets, TweetBatch) else TweetBatch.from_records(raw_tweets)
 
-        if df.empty:
+        if not len(batch):
             handle_logger(message=f"No tweets available for analysis.", type_logger="warning")
             return pd.DataFrame()
 
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        df = df.dropna(subset=["timestamp"])
+        df = batch.score(sia=sia).to_frame()
         df['hour'] = df['timestamp'].dt.hour.astype(int)
 
-        if 'sentiment' not in df.columns:
-            raise ValueError("Processed tweets do not have the 'sentiment' column'")
-
-        required_columns = ['sentiment', 'likes', 'retweets', 'replies']
-        for col in required_columns:
-            if col not in df.columns:
-                handle_logger(message=f"⚠️ Missing column: {col}. Filling with zeros.", type_logger="warning")
-                df[col] = 0
-
-        df['likes'] = pd.to_numeric(df['likes'], errors='coerce').fillna(0).astype(float)
-        df['retweets'] = pd.to_numeric(df['retweets'], errors='coerce').fillna(0).astype(float)
-        df['replies'] = pd.to_numeric(df['replies'], errors='coerce').fillna(0).astype(float)
-        df['sentiment'] = pd.to_numeric(df['sentiment'], errors='coerce').fillna(0).astype(float)
-        
         # Group by hour and compute metrics
         hourly_stats = df.groupby('hour').agg(
             sentiment_mean=('sentiment', 'mean'),
@@ -59,7 +49,7 @@ def analytic_tweets(raw_tweets: list):
         ).reset_index()
 
         handle_logger(message="✅ Hourly metrics computed successfully.", type_logger="info")
-        hourly_stats["hour"] = pd.to_numeric(hourly_stats["hour"], errors='coerce').fillna(0).astype(int)
+        hourly_stats["hour"] = hourly_stats["hour"].astype(int)
 
         return hourly_stats
     except Exception as e:
@@ -67,41 +57,81 @@ def analytic_tweets(raw_tweets: list):
         raise
 
 
+HOURLY_METRIC_COLUMNS = ['hour', 'sentiment_mean', 'tweet_count', 'likes_mean', 'retweets_mean', 'replies_mean']
+
+def hourly_metrics_pipeline(search: str, since=None, until=None) -> list:
+    """
+    MongoDB aggregation pipeline computing the `analytic_tweets` metrics server-side.
+
+    Uses the sentiment and engagement stored on each tweet, so only one document per
+    hour leaves the database.
+    """
+    match = {"search": search}
+    if since is not None or until is not None:
+        match["created_at"] = {}
+        if since is not None:
+            match["created_at"]["$gte"] = since
+        if until is not None:
+            match["created_at"]["$lt"] = until
+
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {"$hour": "$created_at"},
+            "sentiment_mean": {"$avg": {"$ifNull": ["$sentiment", 0]}},
+            "tweet_count": {"$sum": 1},
+            "likes_mean": {"$avg": {"$ifNull": ["$likes", 0]}},
+            "retweets_mean": {"$avg": {"$ifNull": ["$retweets", 0]}},
+            "replies_mean": {"$avg": {"$ifNull": ["$replies", 0]}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "hour": "$_id",
+            "sentiment_mean": 1,
+            "tweet_count": 1,
+            "likes_mean": 1,
+            "retweets_mean": 1,
+            "replies_mean": 1
+        }},
+        {"$sort": {"hour": 1}}
+    ]
+
+def aggregate_hourly_metrics(collection, search: str, since=None, until=None):
+    """
+    Computes hourly metrics for a search term with a MongoDB aggregation.
+
+    Returns:
+    - A DataFrame with the same columns as `analytic_tweets`
+    """
+    records = list(collection.aggregate(hourly_metrics_pipeline(search, since=since, until=until)))
+    if not records:
+        handle_logger(message=f"No tweets available for analysis.", type_logger="warning")
+        return pd.DataFrame()
+
+    hourly_stats = pd.DataFrame(records, columns=HOURLY_METRIC_COLUMNS)
+    hourly_stats["hour"] = pd.to_numeric(hourly_stats["hour"], errors='coerce').fillna(0).astype(int)
+    hourly_stats["tweet_count"] = hourly_stats["tweet_count"].astype(int)
+
+    handle_logger(message="✅ Hourly metrics aggregated in MongoDB.", type_logger="info")
+    return hourly_stats
+
+
 def calculate_hype_score(hourly_stats):
     """
     Calculate a HYPE score based on tweets volume, engagement, and sentiment.
     Formula: (tweets * 0.4) + (likes * 0.3) + (retweets * 0.2) + (replies * 0.1) + (sentiment * 10)
+
+    Kept for callers of the record-based API; it is the "legacy" mode of `HypeScoreEngine`.
     """
     try:
-        hype_scores = []
-
-        for record in hourly_stats:
-            try:
-                hour = int(record.get("hour", 0))
-                tweet_count = float(record.get("tweet_count", 0))
-                likes_mean = float(record.get("likes_mean", 0))
-                retweets_mean = float(record.get("retweets_mean", 0))
-                replies_mean = float(record.get("replies_mean", 0))
-                sentiment_mean = float(record.get("sentiment_mean", 0))
-                
-                hype_score = (
-                    tweet_count * 0.4 +
-                    likes_mean * 0.3 +
-                    retweets_mean * 0.2 +
-                    replies_mean * 0.1 +
-                    sentiment_mean * 10
-                )
-
-
-                hype_scores.append({
-                    "hour": hour,
-                    "hype_score": round(hype_score, 2)
-                })
-            except Exception as inner_e:
-                from utils.logger import handle_logger
-                handle_logger(message=f"[Hype Score] Error in record {record}: {str(inner_e)}", type_logger="warning")
-
-        return hype_scores
+        frame = pd.DataFrame(list(hourly_stats))
+        if frame.empty:
+            return []
+
+        scores = HypeScoreEngine(mode="legacy").score(frame)
+        hour = frame["hour"] if "hour" in frame else pd.Series(0, index=frame.index)
+        hours = pd.to_numeric(hour, errors="coerce").fillna(0).astype(int)
+        return [{"hour": hour, "hype_score": score} for hour, score in zip(hours.tolist(), scores.tolist())]
 
     except Exception as e:
         handle_logger(message=f"Error calculating hype score: {str(e)}", type_logger="error")
@@ -0,0 +1,292 @@
+"""
+HTTP load test: concurrent keep-alive clients against a running server, the Flask dev
+server or gunicorn (gunicorn.conf.py), both started here from `config.create_app`.
+
+    python benchmarks/load_test.py --url http://localhost:5000 --path "/fetch_tweets?search=bitcoin"
+    python benchmarks/load_test.py --gunicorn --workers 4 --requests 2000 --concurrency 32
+    python benchmarks/load_test.py --compare --terms python:3,bitcoin,neymar --force-refresh 0.05
+
+Without --path, requests are drawn (seeded) from the endpoints and terms given, with
+optional weights ("python:3"), and a --force-refresh share of them forces a Twitter
+fetch. Servers started here run in offline mode (offline/: replayed Twitter pages and
+mongomock, one database per gunicorn worker) unless --online. --compare runs the same
+requests against the dev server and then gunicorn.
+
+Reports throughput, error rate and latency percentiles, overall and per endpoint;
+--json saves them and --max-error-rate / --max-p99-ms fail the run (exit 1) above a
+threshold, to catch regressions. Requests to /health also report which worker answered
+and how many clients it built, which should stay at one per client and worker however
+many requests it serves.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = "fetch_tweets,feelings,hourly_metrics"
+TERMS = "python,bitcoin,copa do mundo"
+
+# The dev server as `python main.py` runs it, without the debugger and reloader
+DEV_SERVER = (
+    "import os, sys; from config import create_app; "
+    "create_app(os.getenv('FLASK_ENV', 'dev')).run(host='127.0.0.1', port=int(sys.argv[1]), debug=False, threaded=True)"
+)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(host: str, port: int, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=2)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not come up")
+
+
+def server_env(offline: bool, **extra) -> dict:
+    env = dict(os.environ, **extra)
+    if offline:
+        env["OFFLINE_MODE"] = "true"
+    return env
+
+
+def start_server(command, port: int, env: dict):
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up("127.0.0.1", port)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process, f"http://127.0.0.1:{port}"
+
+
+def start_gunicorn(workers: int, threads: int, worker_class: str, offline: bool = False):
+    port = free_port()
+    env = server_env(offline, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads),
+                     GUNICORN_WORKER_CLASS=worker_class, GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_ACCESS_LOG="")
+    return start_server([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"], port, env)
+
+
+def start_dev_server(offline: bool = False):
+    port = free_port()
+    return start_server([sys.executable, "-c", DEV_SERVER, str(port)], port, server_env(offline))
+
+
+def weighted(spec: str):
+    """Choices and weights of "a:3,b,c:0.5" (weight 1 by default)."""
+    choices, weights = [], []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.rpartition(":") if ":" in item else (item, "", "1")
+        choices.append(name.strip().lstrip("/"))
+        weights.append(float(weight))
+    if not choices or not any(weights):
+        raise ValueError(f"Nothing to choose from in {spec!r}")
+    return choices, weights
+
+
+def plan_requests(total: int, endpoints: str, terms: str, force_refresh: float, seed: int):
+    """Paths of `total` requests drawn from the weighted endpoints and terms."""
+    rng = random.Random(seed)
+    endpoint_choices, endpoint_weights = weighted(endpoints)
+    term_choices, term_weights = weighted(terms)
+    paths = []
+    for _ in range(total):
+        params = {"search": rng.choices(term_choices, term_weights)[0]}
+        if rng.random() < force_refresh:
+            params["force_refresh"] = "true"
+        paths.append(f"/{rng.choices(endpoint_choices, endpoint_weights)[0]}?{urlencode(params)}")
+    return paths
+
+
+def run(url: str, paths, total: int, concurrency: int, timeout: float):
+    target = urlsplit(url)
+    results = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def client():
+        connection = None
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                break
+            path = paths[index % len(paths)]
+            start = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=timeout)
+                connection.request("GET", path)
+                response = connection.getresponse()
+                body = response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                body, status = b"", type(e).__name__
+                connection = None
+            elapsed = time.perf_counter() - start
+
+            worker = None
+            if path.startswith("/health") and status == 200:
+                worker = json.loads(body).get("data")
+            with lock:
+                results.append((path, status, elapsed, worker))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def is_error(status) -> bool:
+    """Connection errors and responses other than 2xx and 304."""
+    return not isinstance(status, int) or not (200 <= status < 300 or status == 304)
+
+
+def summarize(results, duration: float) -> dict:
+    """Throughput, error rate and latency percentiles (ms) of the results."""
+    latencies = [elapsed * 1000 for _, _, elapsed, _ in results]
+    errors = sum(1 for _, status, _, _ in results if is_error(status))
+    return {
+        "requests": len(results),
+        "throughput": round(len(results) / duration, 1) if duration else None,
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4),
+        "status": {str(status): count for status, count in Counter(status for _, status, _, _ in results).items()},
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies), 2),
+            "p50": round(percentile(latencies, 0.5), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(max(latencies), 2),
+        },
+    }
+
+
+def summarize_run(results, duration: float) -> dict:
+    """Summary of the run and of each endpoint (path without the query string)."""
+    by_endpoint = {}
+    for result in results:
+        by_endpoint.setdefault(result[0].split("?", 1)[0], []).append(result)
+    return {
+        "duration": round(duration, 3),
+        **summarize(results, duration),
+        "endpoints": {endpoint: summarize(rows, duration) for endpoint, rows in sorted(by_endpoint.items())},
+    }
+
+
+def report(results, duration: float) -> dict:
+    summary = summarize_run(results, duration)
+    print(f"{summary['requests']} requests in {duration:.2f}s ({summary['throughput']:.1f} req/s)")
+    print(f"  status: {summary['status']}")
+    print(f"  {'endpoint':<16} {'requests':>8} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, row in [("all", summary), *summary["endpoints"].items()]:
+        latency = row["latency_ms"]
+        print(
+            f"  {endpoint:<16} {row['requests']:>8} {row['throughput']:>8.1f} {row['error_rate']:>7.1%} "
+            f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} {latency['max']:>8.1f}"
+        )
+
+    workers = {}
+    for _, _, _, worker in results:
+        if worker:
+            served, created = workers.get(worker["pid"], (0, {}))
+            merged = {name: max(count, created.get(name, 0)) for name, count in worker["created"].items()}
+            workers[worker["pid"]] = (served + 1, {**created, **merged})
+    if workers:
+        print(f"  workers: {len(workers)}")
+        for pid, (served, created) in sorted(workers.items()):
+            print(f"    pid {pid}: {served} requests, clients built {created}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent HTTP load test.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Server to test (ignored when a server is started)")
+    parser.add_argument("--path", action="append", help="Path to request, repeatable (replaces the endpoint mix)")
+    parser.add_argument("--endpoints", default=ENDPOINTS, help="Endpoints to request, with optional weights (feelings:2)")
+    parser.add_argument("--terms", default=TERMS, help="Search terms, with optional weights (python:3)")
+    parser.add_argument("--force-refresh", type=float, default=0.0, help="Share of requests sent with force_refresh=true")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--dev-server", action="store_true", help="Start the Flask dev server for the test")
+    parser.add_argument("--gunicorn", action="store_true", help="Start gunicorn with gunicorn.conf.py for the test")
+    parser.add_argument("--compare", action="store_true", help="Run against the dev server, then gunicorn")
+    parser.add_argument("--online", action="store_true", help="Started servers use the real Twitter API and MongoDB")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--worker-class", default="gthread")
+    parser.add_argument("--json", default=None, help="Save the summaries to this file")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="Fail when the error rate is above this")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Fail when the p99 latency is above this")
+    args = parser.parse_args()
+
+    paths = args.path or plan_requests(args.requests, args.endpoints, args.terms, args.force_refresh, args.seed)
+    offline = not args.online
+
+    targets = []
+    if args.dev_server or args.compare:
+        targets.append(("flask dev server", lambda: start_dev_server(offline)))
+    if args.gunicorn or args.compare:
+        label = f"gunicorn {args.workers}x{args.threads} {args.worker_class}"
+        targets.append((label, lambda: start_gunicorn(args.workers, args.threads, args.worker_class, offline)))
+    if not targets:
+        targets.append((args.url, lambda: (None, args.url)))
+
+    summaries = {}
+    for label, start in targets:
+        process, url = start()
+        try:
+            results, duration = run(url, paths, args.requests, args.concurrency, args.timeout)
+            print(f"\nLoad test against {label} ({url})")
+            summaries[label] = report(results, duration)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": summaries}, f, indent=2)
+
+    failed = [
+        label for label, summary in summaries.items()
+        if (args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate)
+        or (args.max_p99_ms is not None and summary["latency_ms"]["p99"] > args.max_p99_ms)
+    ]
+    if failed:
+        print(f"\nAbove the thresholds: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Offline benchmark of the whole ingest and analytics pipeline, on replayed Twitter pages
+and the offline MongoDB (offline/), so it needs neither a bearer token nor a server.
+
+    python benchmarks/pipeline.py --sizes 1000,100000,1000000
+    python benchmarks/pipeline.py --sizes 100000 --recording recordings/tweets.jsonl --mongo-uri mongodb://localhost:27017
+
+Stages, each run on the output of the previous one:
+  fetch      tweepy models of the search pages and their TweetBatch (TweetBatch.from_tweepy)
+  process    sentiment scoring and the MongoDB documents (TweetBatch.score / documents,
+             which replaced _process_tweets)
+  feelings   process_tweet over the documents
+  analytics  analytic_tweets (pandas hourly metrics)
+  hype       calculate_hype_score over as many hourly records as tweets
+  store      TweetService._store_tweets (bulk upserts); up to --store-max tweets, since
+             mongomock scans its collections and grows quadratically
+
+Timings come from an untraced run; with --memory, "peak" is the largest allocation of
+each stage (tracemalloc, in a second run) and "held" what its output occupies.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import tweepy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("OFFLINE_MODE", "true")
+
+from flask import g  # noqa: E402
+
+from analytics.tweets_analytic import HOURLY_METRIC_COLUMNS, analytic_tweets, calculate_hype_score  # noqa: E402
+from config import create_app  # noqa: E402
+from config.indexes import ensure_indexes  # noqa: E402
+from config.mongo_db import get_mongo_db  # noqa: E402
+from offline.twitter import RecordedResponses, SyntheticResponses, to_response  # noqa: E402
+from preprocess.tweet_batch import TweetBatch  # noqa: E402
+from preprocess.tweets_preprocess import get_sentiment_analyzer, process_tweet  # noqa: E402
+from services.tweets_parser import build_search_query, build_users_map  # noqa: E402
+from services.tweets_service import TweetService  # noqa: E402
+
+SEARCH = "python"
+PAGE_SIZE = 100
+
+
+def fetch(source, count: int):
+    """Parse `count` tweets of search pages; page generation itself is not timed."""
+    query = build_search_query(SEARCH)
+    batches, parse_seconds, fetched, empty_pages = [], 0.0, 0, 0
+    while fetched < count:
+        try:
+            page = source.page(query)
+        except tweepy.TooManyRequests:  # recorded 429
+            continue
+        page["data"] = (page.get("data") or [])[:count - fetched]
+        if not page["data"]:
+            empty_pages += 1
+            if empty_pages > 100:
+                raise ValueError("The recording has no tweets to replay")
+            continue
+        start = time.perf_counter()
+        response = to_response(page)
+        batches.append(TweetBatch.from_tweepy(response.data, build_users_map(response)))
+        parse_seconds += time.perf_counter() - start
+        fetched += len(page["data"])
+    start = time.perf_counter()
+    batch = TweetBatch.concat(batches)
+    return batch, parse_seconds + time.perf_counter() - start
+
+
+def hourly_records(rows: int):
+    """Hourly metric records, as `calculate_hype_score` takes them."""
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame({column: rng.random(rows) * 100 for column in HOURLY_METRIC_COLUMNS})
+    frame["hour"] = np.arange(rows) % 24
+    return frame.to_dict("records")
+
+
+def run(source, count: int, store_max: int, trace: bool):
+    """Seconds, peak and held bytes of every stage (memory only when traced)."""
+    results = {}
+
+    def measure(name, fn, *args):
+        gc.collect()
+        if trace:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        output = fn(*args)
+        seconds = time.perf_counter() - start
+        peak = held = 0
+        if trace:
+            current, peak = tracemalloc.get_traced_memory()
+            peak, held = peak - before, current - before
+        results[name] = [seconds, peak, held]
+        return output
+
+    if trace:
+        tracemalloc.start()
+
+    batch, parse_seconds = measure("fetch", fetch, source, count)
+    results["fetch"][0] = parse_seconds
+    documents = measure("process", lambda: batch.score().documents(SEARCH, datetime.utcnow(), order=batch.newest_first()))
+    measure("feelings", process_tweet, documents)
+    measure("analytics", analytic_tweets, documents)
+    records = hourly_records(count)
+    measure("hype", calculate_hype_score, records)
+    del records
+
+    stored = documents[:store_max]
+    if stored:
+        g.mongo_db["tweets"].delete_many({})
+        measure("store", TweetService()._store_tweets, stored, SEARCH)
+        results["store"].append(len(stored))
+
+    if trace:
+        tracemalloc.stop()
+    return results
+
+
+def report(count: int, timings, memory) -> None:
+    print(f"\n{count} tweets")
+    print(f"  {'stage':<10} {'seconds':>9} {'tweets/s':>11} {'peak MiB':>9} {'held MiB':>9}")
+    for stage, (seconds, _, _, *stored) in timings.items():
+        rows = stored[0] if stored else count
+        peak, held = (memory[stage][1] / 2 ** 20, memory[stage][2] / 2 ** 20) if memory else (None, None)
+        line = f"  {stage:<10} {seconds:9.3f} {rows / seconds if seconds else float('inf'):11.0f}"
+        line += f" {peak:9.1f} {held:9.1f}" if memory else f" {'-':>9} {'-':>9}"
+        print(line + (f"  ({rows} tweets)" if rows != count else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tweet pipeline offline.")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated tweet counts")
+    parser.add_argument("--distinct-texts", type=int, default=5000, help="Distinct synthetic texts (sentiment is memoized per text)")
+    parser.add_argument("--recording", default=None, help="Replay this recording instead of synthetic pages")
+    parser.add_argument("--mongo-uri", default=None, help="Local MongoDB for the store stage (default: mongomock)")
+    parser.add_argument("--store-max", type=int, default=None, help="Tweets stored at most (default: 2000 on mongomock, all otherwise)")
+    parser.add_argument("--memory", action="store_true", help="Also measure memory (second, traced run per size)")
+    args = parser.parse_args()
+
+    store_max = args.store_max if args.store_max is not None else (10 ** 12 if args.mongo_uri else 2000)
+
+    app = create_app("prod")
+    # The offline clients read their settings when first built, below
+    app.config.update(OFFLINE_MONGO_URI=args.mongo_uri or "")
+    with app.app_context():
+        g.mongo_db = get_mongo_db()
+        # TweetWriter relies on the unique tweet_id index
+        ensure_indexes(g.mongo_db)
+        get_sentiment_analyzer()
+        for count in (int(size) for size in args.sizes.split(",")):
+            def source():
+                if args.recording:
+                    return RecordedResponses.load(args.recording)
+                return SyntheticResponses(tweets_per_page=PAGE_SIZE, distinct_texts=args.distinct_texts)
+
+            timings = run(source(), count, store_max, trace=False)
+            memory = run(source(), count, store_max, trace=True) if args.memory else None
+            report(count, timings, memory)
+
+
+if __name__ == "__main__":
+    main()
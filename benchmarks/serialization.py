@@ -0,0 +1,116 @@
+"""
+Serialization benchmark: encodes a synthetic set of stored tweets (as read from MongoDB,
+with ObjectId and datetime fields) with each JSON path and compresses the result.
+
+    python benchmarks/serialization.py --tweets 5000 --runs 20
+
+Paths compared:
+  - legacy: per-tweet conversion of _id / datetimes followed by Flask's default provider
+            (how responses were built before the JSON providers)
+  - std:    utils.json_provider.StdJSONProvider
+  - orjson: utils.json_provider.OrjsonProvider (when orjson is installed)
+"""
+import argparse
+import gzip
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.compression import brotli, compress  # noqa: E402
+from utils.json_provider import OrjsonProvider, StdJSONProvider, orjson  # noqa: E402
+
+
+def make_tweets(count: int):
+    now = datetime.utcnow()
+    words = ["python", "mongo", "flask", "tweet", "hype", "bom", "ruim", "ótimo", "dados", "api"]
+    return [
+        {
+            "_id": ObjectId(),
+            "tweet_id": 1_800_000_000_000_000_000 + i,
+            "text": " ".join(random.choices(words, k=18)),
+            "cleaned_text": " ".join(random.choices(words, k=12)),
+            "sentiment": round(random.uniform(-1, 1), 4),
+            "created_at": now - timedelta(seconds=i * 7),
+            "stored_at": now,
+            "author_id": str(random.randint(10 ** 8, 10 ** 9)),
+            "likes": random.randint(0, 500),
+            "retweets": random.randint(0, 100),
+            "replies": random.randint(0, 50),
+            "search": ["python"],
+            "source": "twitter",
+            "processed": True,
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_serialize(tweet):
+    tweet = dict(tweet)
+    tweet["_id"] = str(tweet["_id"])
+    for field in ("created_at", "stored_at"):
+        if isinstance(tweet.get(field), datetime):
+            tweet[field] = tweet[field].isoformat()
+    return tweet
+
+
+def timed(fn, runs: int):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON serialization and compression of tweet payloads.")
+    parser.add_argument("--tweets", type=int, default=5000, help="Tweets per payload")
+    parser.add_argument("--runs", type=int, default=20, help="Repetitions per measurement (median reported)")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    tweets = make_tweets(args.tweets)
+    payload = {"status": "success", "data": tweets}
+
+    paths = {
+        "legacy": lambda: DefaultJSONProvider(app).dumps(
+            {"status": "success", "data": [legacy_serialize(t) for t in tweets]}, separators=(",", ":")
+        ).encode("utf-8"),
+        "std": lambda: StdJSONProvider(app).dumps(payload, separators=(",", ":")).encode("utf-8"),
+    }
+    if orjson is not None:
+        provider = OrjsonProvider(app)
+        paths["orjson"] = lambda: provider.dumps_bytes(payload)
+
+    print(f"Serializing {args.tweets} tweets ({args.runs} runs, median)")
+    bodies = {}
+    for name, fn in paths.items():
+        seconds, body = timed(fn, args.runs)
+        bodies[name] = body
+        print(f"  {name:<8} {seconds * 1000:9.2f} ms  {len(body) / 1024:9.1f} KiB")
+
+    body = bodies.get("orjson", bodies["std"])
+    print(f"\nCompressing the {len(body) / 1024:.1f} KiB body")
+    encodings = [("gzip", {"gzip_level": level}, f"gzip -{level}") for level in (1, 6, 9)]
+    if brotli is not None:
+        encodings += [("br", {"brotli_quality": quality}, f"br q{quality}") for quality in (1, 4, 11)]
+    for encoding, options, label in encodings:
+        seconds, compressed = timed(lambda: compress(body, encoding, **options), max(1, args.runs // 4))
+        print(f"  {label:<8} {seconds * 1000:9.2f} ms  {len(compressed) / 1024:9.1f} KiB  ({len(compressed) / len(body):.0%})")
+    if brotli is None:
+        print("  (brotli not installed: pip install brotli)")
+    assert gzip.decompress(compress(body, "gzip")) == body
+
+
+if __name__ == "__main__":
+    main()
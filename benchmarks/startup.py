@@ -0,0 +1,84 @@
+"""
+Cold-start benchmark: import time, app creation and first-request latency, each
+measured in a fresh interpreter.
+
+    python benchmarks/startup.py --runs 5
+    git worktree add /tmp/coletor-before <ref> && python benchmarks/startup.py --path /tmp/coletor-before
+
+Run it against two checkouts to compare before/after. The MongoDB URI and Twitter
+token come from the environment (.env), as for the app itself.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {path!r})
+timings = {{}}
+
+def timed(name, step):
+    start = time.perf_counter()
+    try:
+        result = step()
+        timings[name] = time.perf_counter() - start
+        return result
+    except BaseException as e:
+        timings[name] = time.perf_counter() - start
+        timings[name + "_error"] = f"{{type(e).__name__}}: {{e}}"[:200]
+        raise
+
+try:
+    timed("import_preprocess", lambda: __import__("preprocess.tweets_preprocess"))
+    config = timed("import_app", lambda: __import__("config"))
+    app = timed("create_app", lambda: config.create_app("dev"))
+    client = app.test_client()
+    timed("first_request", lambda: client.get("/health" if "health" in app.blueprints else "/"))
+    from preprocess.tweets_preprocess import score_text
+    timed("first_sentiment", lambda: score_text("warm start benchmark"))
+except BaseException:
+    pass
+print("BENCH " + json.dumps(timings))
+"""
+
+STEPS = ("import_preprocess", "import_app", "create_app", "first_request", "first_sentiment")
+
+
+def run_once(path: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(path=path)],
+        cwd=path, capture_output=True, text=True
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])
+    raise RuntimeError(f"Benchmark process failed:\n{result.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start latency of the API.")
+    parser.add_argument("--path", default=ROOT, help="Checkout to benchmark (default: this one)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to start")
+    args = parser.parse_args()
+
+    runs = [run_once(os.path.abspath(args.path)) for _ in range(args.runs)]
+
+    print(f"Cold start of {args.path} ({args.runs} runs, median)")
+    for step in STEPS:
+        values = [run[step] for run in runs if step in run]
+        errors = {run[step + "_error"] for run in runs if step + "_error" in run}
+        if not values:
+            continue
+        line = f"  {step:<18} {statistics.median(values) * 1000:9.1f} ms"
+        if errors:
+            line += f"  (failed: {errors.pop()})"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
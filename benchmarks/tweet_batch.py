@@ -0,0 +1,189 @@
+"""
+Memory / throughput benchmark of the ingest pipeline representation: per-tweet dicts
+(how tweets flowed before `TweetBatch`) against the columnar `TweetBatch`.
+
+    python benchmarks/tweet_batch.py --tweets 100000
+
+Each path runs the same stages on synthetic tweepy Tweets:
+  fetch      tweepy objects -> pipeline representation
+  process    sentiment scoring and the MongoDB documents
+  analytics  hourly metrics frame (pandas)
+
+Texts are drawn from a fixed pool so VADER scoring (memoized) does not dominate. Timings
+come from an untraced run; memory from a second run under tracemalloc: "held" is what
+the fetched tweets occupy before processing, "peak" the maximum over the three stages.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocess.tweet_batch import TweetBatch  # noqa: E402
+from preprocess.tweets_preprocess import clean_text, get_sentiment_analyzer, score_text, score_tweet  # noqa: E402
+
+WORDS = ["python", "mongo", "love", "hate", "great", "awful", "api", "data", "hype", "fast", "slow", "ok"]
+
+
+def make_tweepy(count: int, distinct_texts: int):
+    random.seed(7)
+    texts = [" ".join(random.choices(WORDS, k=14)) + " #tag @user http://t.co/x" for _ in range(distinct_texts)]
+    users_map = {str(i): SimpleNamespace(name=f"user {i}", profile_image_url=f"https://img/{i}") for i in range(1000)}
+    now = datetime.now(timezone.utc)
+    tweets = [
+        SimpleNamespace(
+            id=1_800_000_000_000_000_000 + i,
+            text=texts[i % distinct_texts],
+            author_id=i % 1000,
+            created_at=now - timedelta(seconds=i * 3),
+            public_metrics={
+                "like_count": i % 50, "retweet_count": i % 9, "reply_count": i % 4,
+                "quote_count": i % 3, "bookmark_count": 0, "impression_count": i % 500,
+            },
+        )
+        for i in range(count)
+    ]
+    return tweets, users_map
+
+
+# Legacy path: the dict pipeline as it was before TweetBatch
+
+def legacy_fetch(tweets, users_map):
+    result = []
+    for tweet in tweets:
+        author = users_map.get(str(tweet.author_id))
+        metrics = tweet.public_metrics or {}
+        result.append({
+            "tweet_id": tweet.id,
+            "text": tweet.text,
+            "author_id": tweet.author_id,
+            "author_name": author.name if author else "Unknown",
+            "author_photo": author.profile_image_url if author else "",
+            "created_at": tweet.created_at.isoformat(),
+            "public_metrics": {
+                "like_count": int(metrics.get("like_count", 0)),
+                "retweet_count": int(metrics.get("retweet_count", 0)),
+                "reply_count": int(metrics.get("reply_count", 0)),
+                "quote_count": int(metrics.get("quote_count", 0)),
+                "bookmark_count": int(metrics.get("bookmark_count", 0)),
+                "impression_count": int(metrics.get("impression_count", 0)),
+            },
+            "likes": int(metrics.get("like_count", 0)),
+            "retweets": int(metrics.get("retweet_count", 0)),
+            "replies": int(metrics.get("reply_count", 0)),
+        })
+    return result
+
+
+def legacy_process(raw_tweets, search):
+    now = datetime.utcnow()
+    processed = []
+    for tweet in raw_tweets:
+        tweet_copy = tweet.copy()
+        tweet_copy.update({"stored_at": now, "source": "twitter_api", "search": search, "processed": True})
+        tweet_copy.update(score_tweet(tweet_copy))
+        for field in ("likes", "retweets", "replies"):
+            tweet_copy[field] = int(tweet.get(field, 0))
+        tweet_copy["created_at"] = datetime.fromisoformat(tweet_copy["created_at"].replace("Z", "+00:00"))
+        processed.append(tweet_copy)
+    return processed
+
+
+def legacy_analytics(documents):
+    rows = []
+    for tweet in documents:
+        metrics = tweet.get("public_metrics", {})
+        rows.append({
+            "tweet_id": tweet["tweet_id"], "text": tweet["text"], "cleaned_text": tweet["cleaned_text"],
+            "sentiment": tweet["sentiment"], "timestamp": tweet["created_at"],
+            "author_id": tweet["author_id"], "author_name": tweet["author_name"], "author_photo": tweet["author_photo"],
+            "likes": metrics.get("like_count", 0), "retweets": metrics.get("retweet_count", 0),
+            "replies": metrics.get("reply_count", 0), "shares": metrics.get("quote_count", 0),
+        })
+    df = pd.DataFrame(rows)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
+    df["hour"] = df["timestamp"].dt.hour.astype(int)
+    return df.groupby("hour").agg(sentiment_mean=("sentiment", "mean"), tweet_count=("text", "count"), likes_mean=("likes", "mean"))
+
+
+def batch_fetch(tweets, users_map, page_size: int = 100):
+    return TweetBatch.concat(TweetBatch.from_tweepy(tweets[i:i + page_size], users_map) for i in range(0, len(tweets), page_size))
+
+
+def batch_process(batch, search):
+    return batch.score().documents(search, datetime.utcnow())
+
+
+def batch_analytics(batch):
+    df = batch.to_frame()
+    df["hour"] = df["timestamp"].dt.hour.astype(int)
+    return df.groupby("hour").agg(sentiment_mean=("sentiment", "mean"), tweet_count=("text", "count"), likes_mean=("likes", "mean"))
+
+
+def run(name, tweets, users_map, fetch, process, analytics, trace: bool):
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    timings = {}
+
+    start = time.perf_counter()
+    fetched = fetch(tweets, users_map)
+    timings["fetch"] = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0] if trace else 0
+
+    start = time.perf_counter()
+    documents = process(fetched, "python")
+    timings["process"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # The legacy analytics read the documents (dict copies); the batch reads its own columns
+    analytics(documents if process is legacy_process else fetched)
+    timings["analytics"] = time.perf_counter() - start
+
+    peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    if trace:
+        tracemalloc.stop()
+    return timings, held, peak
+
+
+def report(name, count, timings, held, peak):
+    total = sum(timings.values())
+    print(
+        f"  {name:<6} fetch {timings['fetch'] * 1000:8.1f} ms  process {timings['process'] * 1000:8.1f} ms  "
+        f"analytics {timings['analytics'] * 1000:8.1f} ms  | {count / total:9.0f} tweets/s  "
+        f"held {held / 2 ** 20:7.1f} MiB  peak {peak / 2 ** 20:7.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dict and columnar tweet batches.")
+    parser.add_argument("--tweets", type=int, default=100_000, help="Tweets in the batch")
+    parser.add_argument("--distinct-texts", type=int, default=2000, help="Distinct texts (sentiment is memoized per text)")
+    args = parser.parse_args()
+
+    tweets, users_map = make_tweepy(args.tweets, args.distinct_texts)
+    # Load the analyzer and fill the sentiment memo so both paths score at the same cost
+    sia = get_sentiment_analyzer()
+    for text in {tweet.text for tweet in tweets}:
+        score_text(clean_text(text), sia=sia)
+
+    print(f"{args.tweets} tweets (timings without tracing, memory from a traced run)")
+    for name, stages in (
+        ("dicts", (legacy_fetch, legacy_process, legacy_analytics)),
+        ("batch", (batch_fetch, batch_process, batch_analytics)),
+    ):
+        timings, _, _ = run(name, tweets, users_map, *stages, trace=False)
+        _, held, peak = run(name, tweets, users_map, *stages, trace=True)
+        report(name, args.tweets, timings, held, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import signal
+
+from flask import g
+
+from config import create_app
+from config.indexes import ensure_indexes
+from config.mongo_db import get_mongo_db
+from config.x_connect import AsyncTwitterClient, get_twitter_client
+from services.collector_service import TweetCollector
+from services.search_registry import SearchRegistry
+from services.tweets_service import TweetService
+
+env = os.getenv('FLASK_ENV', 'dev')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Background tweet collector for tracked search terms.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("run", help="Poll tracked search terms until interrupted")
+    subparsers.add_parser("once", help="Collect every due search term once and exit")
+
+    track = subparsers.add_parser("track", help="Track a search term")
+    track.add_argument("search")
+    track.add_argument("--interval", type=int, default=None, help="Polling interval in seconds")
+
+    untrack = subparsers.add_parser("untrack", help="Stop tracking a search term")
+    untrack.add_argument("search")
+
+    subparsers.add_parser("list", help="List tracked search terms")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    app = create_app(env)
+
+    with app.app_context():
+        g.mongo_db = get_mongo_db()
+        ensure_indexes(g.mongo_db, ttl_days=app.config["TWEETS_TTL_DAYS"])
+        registry = SearchRegistry(g.mongo_db["tracked_searches"])
+
+        if args.command == "track":
+            interval = args.interval or app.config["COLLECTOR_DEFAULT_INTERVAL"]
+            entry = registry.track(args.search, interval)
+            print(f"✅ Tracking '{entry['search']}' every {entry['interval']}s")
+            return
+
+        if args.command == "untrack":
+            if registry.untrack(args.search):
+                print(f"🛑 Stopped tracking '{args.search}'")
+            else:
+                print(f"⚠️ '{args.search}' is not tracked")
+            return
+
+        if args.command == "list":
+            for entry in registry.list():
+                print(f"{entry['search']}\tevery {entry['interval']}s\tlast run: {entry.get('last_run_at')}\tnext run: {entry.get('next_run_at')}")
+            return
+
+        g.twitter_client = get_twitter_client()
+        collector = TweetCollector(
+            TweetService(),
+            registry,
+            poll_seconds=app.config["COLLECTOR_POLL_SECONDS"],
+            concurrent=app.config["COLLECTOR_ASYNC_FETCH"] and AsyncTwitterClient is not None
+        )
+
+        if args.command == "once":
+            processed = collector.run_once()
+            print(f"📡 Collected {processed} search terms")
+            return
+
+        signal.signal(signal.SIGTERM, lambda *_: collector.stop())
+        signal.signal(signal.SIGINT, lambda *_: collector.stop())
+        collector.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,10 @@ from flask_cors import CORS
 
 from config.x_connect import get_twitter_client, close_twitter_client
 from utils import error_handler
+from utils.compression import init_compression
+from utils.instrumentation import init_instrumentation
+from utils.json_provider import make_json_provider
+from utils.profiling import init_profiling
 from config.settings import DevConfig, ProdConfig
 
 load_dotenv()
@@ -26,6 +30,16 @@ def create_app(env='dev'):
         app.config.from_object(DevConfig)
         print("🛠️ Development Mode Enabled")
 
+    if app.config.get("OFFLINE_MODE"):
+        from offline.install import install
+
+        install(app.config)
+        print("🧪 Offline Mode: replayed Twitter responses, local MongoDB")
+
+    app.json = make_json_provider(app, app.config.get("JSON_SERIALIZER", "orjson"))
+    # First, so a profiled request also covers the other request hooks
+    init_profiling(app)
+
     cors_origins = os.getenv('BASE_URL', 'http://localhost:5173')
 
     CORS(
@@ -49,6 +63,10 @@ def create_app(env='dev'):
         if request.method == 'OPTIONS':
             return '', 200
 
+        # Health endpoints need no Twitter credentials; /ready pings MongoDB on its own
+        if request.blueprint == 'health':
+            return
+
         try:
             g.mongo_db = get_mongo_db()
             g.twitter_client = get_twitter_client()
@@ -70,10 +88,22 @@ def create_app(env='dev'):
 
     try:
         from resources.tweets_resource import tweets_bp
+        from resources.health_resource import health_bp
         app.register_blueprint(tweets_bp)
+        app.register_blueprint(health_bp)
     except ImportError as e:
         app.logger.error(f"❌ Blueprint registration failed: {str(e)}")
 
     app.register_error_handler(Exception, error_handler.handle_exception)
+    init_instrumentation(app)
+    init_compression(app)
+
+    # Under gunicorn (gunicorn.conf.py) each worker warms up after the fork instead, so
+    # the preloading master opens no MongoDB client
+    if app.config.get("WARM_UP_ON_START") and os.getenv("WARM_UP_IN_WORKERS", "false").lower() != "true":
+        from config.warmup import warm_up
+
+        with app.app_context():
+            warm_up()
 
     return app
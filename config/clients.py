@@ -0,0 +1,79 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class ClientRegistry:
+    """
+    Process-level registry of long-lived clients (MongoDB, Twitter).
+
+    Each client is built once per process by its factory and then borrowed by every
+    request. Clients must not cross a fork (a MongoClient is not fork-safe), so the
+    registry is emptied in the child right after a fork: every worker of a pre-fork
+    server builds its own clients on first use, even when the app was preloaded in the
+    master.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._closers: Dict[str, Optional[Callable[[Any], None]]] = {}
+        self._clients: Dict[str, Any] = {}
+        self._created: Dict[str, int] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any], close: Optional[Callable[[Any], None]] = None) -> None:
+        """Declare how to build (and optionally close) a client. Nothing is built yet."""
+        self._factories[name] = factory
+        self._closers[name] = close
+
+    def get(self, name: str) -> Any:
+        """Borrow a client, building it on first use in this process."""
+        if self._pid != os.getpid():
+            self.after_fork()
+
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._factories[name]()
+                    self._clients[name] = client
+                    self._created[name] = self._created.get(name, 0) + 1
+        return client
+
+    def build(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """Build a new client with its factory, without keeping it (e.g. clients bound to an event loop)."""
+        return self._factories[name](*args, **kwargs)
+
+    def after_fork(self) -> None:
+        """
+        Forget the clients inherited from the parent process, without closing them: their
+        sockets belong to the parent.
+        """
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._created = {}
+        self._pid = os.getpid()
+
+    def close(self) -> None:
+        """Close every client of this process, e.g. on worker exit."""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            close = self._closers.get(name)
+            if close is not None:
+                try:
+                    close(client)
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Process id, and how many times each client was built in this process."""
+        return {"pid": self._pid, "created": dict(self._created)}
+
+
+registry = ClientRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.after_fork)
@@ -0,0 +1,272 @@
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import OperationFailure, PyMongoError
+
+from utils.logger import handle_logger
+
+_ensured = False
+_ensure_lock = threading.Lock()
+# Collections (full names) already seen with the unique tweet_id index
+_tweet_id_checked: Set[str] = set()
+
+
+class MissingIndexError(RuntimeError):
+    """Raised when an index the writes rely on does not exist and could not be created."""
+
+
+def required_indexes(ttl_days: int = 0) -> Dict[str, List[IndexModel]]:
+    """
+    Indexes required by the queries of the application, per collection.
+
+    Parameters:
+    - ttl_days (int): Expire stored tweets this many days after they were first stored. 0 keeps them forever.
+    """
+    tweets = [
+        IndexModel([("tweet_id", ASCENDING)], unique=True),
+        # Cached reads and keyset pagination: {"search": ...} sorted by (created_at, _id) desc
+        IndexModel([("search", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ]
+    if ttl_days > 0:
+        tweets.append(IndexModel([("stored_at", ASCENDING)], expireAfterSeconds=ttl_days * 86400))
+
+    return {
+        "tweets": tweets,
+        # Rollup buckets only; metrics written before the rollups have no date
+        "tweets_metrics": [
+            IndexModel(
+                [("search", ASCENDING), ("date", ASCENDING), ("hour", ASCENDING), ("minute", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"date": {"$exists": True}}
+            ),
+        ],
+        "tweets_cache": [IndexModel([("search", ASCENDING)], unique=True)],
+        "tracked_searches": [
+            IndexModel([("search", ASCENDING)], unique=True),
+            IndexModel([("enabled", ASCENDING), ("next_run_at", ASCENDING)]),
+        ],
+        "tweets_watermarks": [IndexModel([("search", ASCENDING)], unique=True)],
+        "rate_limits": [IndexModel([("endpoint", ASCENDING)], unique=True)],
+        # Expired leases are removed by MongoDB; acquire() also takes over expired ones
+        "request_leases": [IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)],
+    }
+
+
+def _key(index: Dict[str, Any]) -> tuple:
+    key = index["key"]
+    pairs = key.items() if hasattr(key, "items") else key
+    return tuple((field, direction if isinstance(direction, str) else int(direction)) for field, direction in pairs)
+
+
+def ensure_indexes(db: Database, ttl_days: int = 0) -> Dict[str, List[str]]:
+    """
+    Create the required indexes. Indexes that already exist are left as they are, so
+    this is safe to run at every startup.
+
+    Unique indexes that cannot be created because of duplicate values are reported
+    together, after the other indexes are created, with a MissingIndexError.
+
+    Returns:
+    - dict: names of the indexes created or updated, per collection
+    """
+    created: Dict[str, List[str]] = {}
+    duplicated: List[str] = []
+
+    for collection_name, indexes in required_indexes(ttl_days).items():
+        collection = db[collection_name]
+        existing = {_key(info): (name, info) for name, info in collection.index_information().items()}
+
+        for index in indexes:
+            spec = index.document
+            name, info = existing.get(_key(spec), (None, None))
+
+            if info is not None:
+                ttl = spec.get("expireAfterSeconds")
+                if ttl is not None and info.get("expireAfterSeconds") != ttl:
+                    db.command("collMod", collection_name, index={"keyPattern": dict(spec["key"]), "expireAfterSeconds": ttl})
+                    created.setdefault(collection_name, []).append(name)
+                continue
+
+            try:
+                collection.create_indexes([index])
+                created.setdefault(collection_name, []).append(spec["name"])
+            except OperationFailure as e:
+                if e.code == 11000:
+                    handle_logger(
+                        message=f"⚠️ Index {spec['name']} on {collection_name} not created: duplicate values exist. "
+                                f"Run `python manage.py dedupe-tweets` first",
+                        type_logger="error"
+                    )
+                    duplicated.append(f"{collection_name}.{spec['name']}")
+                    continue
+                raise
+
+    if created:
+        handle_logger(message=f"🗂️ Indexes created: {created}", type_logger="info")
+    if duplicated:
+        raise MissingIndexError(f"Unique indexes not created, duplicate values exist: {', '.join(duplicated)}")
+    return created
+
+
+def ensure_indexes_once(db: Database, ttl_days: int = 0) -> None:
+    """
+    Run `ensure_indexes` once per process. Failures are logged and retried on the next
+    call; tweets are not written meanwhile if the unique tweet_id index is missing (see
+    `require_unique_tweet_id`).
+    """
+    global _ensured
+    if _ensured:
+        return
+
+    with _ensure_lock:
+        if _ensured:
+            return
+        try:
+            ensure_indexes(db, ttl_days)
+            _ensured = True
+        except (PyMongoError, MissingIndexError) as e:
+            handle_logger(message=f"Index creation failed: {str(e)}", type_logger="warning")
+
+
+def require_unique_tweet_id(collection: Collection) -> None:
+    """
+    Raise MissingIndexError unless `collection` has the unique tweet_id index. TweetWriter
+    relies on it to decide which tweets are new to a search term, so without it tweets
+    are not written (and /ready fails). Once found it is not looked up again in this process.
+    """
+    if collection.full_name in _tweet_id_checked:
+        return
+
+    if not any(
+        _key(info) == (("tweet_id", 1),) and info.get("unique")
+        for info in collection.index_information().values()
+    ):
+        raise MissingIndexError(
+            f"Unique index on {collection.full_name}.tweet_id is missing. "
+            f"Run `python manage.py dedupe-tweets` and `python manage.py ensure-indexes`"
+        )
+    _tweet_id_checked.add(collection.full_name)
+
+
+def index_report(db: Database, ttl_days: int = 0) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare the indexes of each collection with the required ones.
+
+    Returns:
+    - dict per collection with:
+      - "missing": required indexes that do not exist
+      - "extra": existing indexes that are not required (candidates to drop)
+      - "unused": existing indexes with no operations since the server started ($indexStats)
+    """
+    report = {}
+
+    for collection_name, indexes in required_indexes(ttl_days).items():
+        collection = db[collection_name]
+        existing = {name: _key(info) for name, info in collection.index_information().items()}
+        required = {_key(index.document): index.document["name"] for index in indexes}
+
+        try:
+            unused = sorted(
+                stats["name"] for stats in collection.aggregate([{"$indexStats": {}}])
+                if stats["name"] != "_id_" and not stats.get("accesses", {}).get("ops")
+            )
+        except PyMongoError:
+            unused = []
+
+        report[collection_name] = {
+            "missing": sorted(name for key, name in required.items() if key not in existing.values()),
+            "extra": sorted(name for name, key in existing.items() if name != "_id_" and key not in required),
+            "unused": unused,
+        }
+
+    return report
+
+
+def _plan_summary(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Winning plan stage, index and document counts of an explain output (find or aggregate)."""
+    if "queryPlanner" not in explain:
+        for stage in explain.get("stages", []):
+            if "$cursor" in stage:
+                explain = stage["$cursor"]
+                break
+
+    plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    plan = plan.get("queryPlan", plan)
+    stages = []
+    index_name = None
+    while plan:
+        stages.append(plan.get("stage"))
+        index_name = plan.get("indexName", index_name)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+
+    stats = explain.get("executionStats", {})
+    return {
+        "plan": " <- ".join(stage for stage in stages if stage),
+        "index": index_name,
+        "collection_scan": "COLLSCAN" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "returned": stats.get("nReturned"),
+    }
+
+
+def explain_queries(db: Database, search: str, since_date: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Explain the main queries of the application for one search term.
+
+    Returns:
+    - dict: plan summary per query ("plan", "index", "collection_scan", "docs_examined", "returned")
+    """
+    sort = [("created_at", DESCENDING), ("_id", DESCENDING)]
+    finds = {
+        "cached_tweets": (db["tweets"], {"search": search}, sort),
+        "tweet_by_id": (db["tweets"], {"tweet_id": {"$in": [0]}}, None),
+        "cache_entry": (db["tweets_cache"], {"search": search}, None),
+        "due_searches": (db["tracked_searches"], {"enabled": True, "next_run_at": {"$lte": datetime.utcnow()}}, [("next_run_at", ASCENDING)]),
+    }
+
+    plans = {}
+    for name, (collection, query, query_sort) in finds.items():
+        cursor = collection.find(query)
+        if query_sort:
+            cursor = cursor.sort(query_sort)
+        plans[name] = _plan_summary(cursor.explain())
+
+    rollup_match = {"search": search, "date": {"$gte": since_date} if since_date else {"$exists": True}}
+    explain = db.command(
+        "aggregate", "tweets_metrics",
+        pipeline=[{"$match": rollup_match}, {"$group": {"_id": "$hour", "tweet_count": {"$sum": "$tweet_count"}}}],
+        explain=True
+    )
+    plans["rollup_hourly"] = _plan_summary(explain)
+
+    return plans
+
+
+def dedupe_tweets(db: Database) -> int:
+    """
+    Merge tweets stored more than once under the same tweet_id, so the unique index can
+    be created. The oldest document is kept with the search terms of all the copies.
+
+    Returns the number of documents removed.
+    """
+    tweets = db["tweets"]
+    removed = 0
+    duplicates = tweets.aggregate([
+        {"$group": {"_id": "$tweet_id", "ids": {"$push": "$_id"}, "searches": {"$push": "$search"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+
+    for group in duplicates:
+        keep, *drop = sorted(group["ids"])
+        searches = set()
+        for value in group["searches"]:
+            searches.update(value if isinstance(value, list) else [value] if value else [])
+
+        tweets.update_one({"_id": keep}, {"$set": {"search": sorted(searches)}})
+        removed += tweets.delete_many({"_id": {"$in": drop}}).deleted_count
+
+    return removed
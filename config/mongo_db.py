@@ -1,21 +1,49 @@
 import os
+
 from pymongo import MongoClient
 
+from config.clients import registry
+
 environment = os.getenv('FLASK_ENV', 'dev')
 MONGO_URI = os.getenv("DATABASE_MONGO_URI_PROD") if environment == 'prod' else os.getenv("DATABASE_MONGO_URI_DEV")
 
-client = MongoClient(
-    MONGO_URI,
-    serverSelectionTimeoutMS=5000,
-    tls=True,
-    tlsAllowInvalidCertificates=False,
-    tlsCAFile=None
-)
+# Connection pool per process. Size it to the concurrent requests of one worker (threads or
+# greenlets) plus background refreshes; every worker of a pre-fork server has its own pool.
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+
+
+def _create_mongo_client() -> MongoClient:
+    # Creating the client does not block: PyMongo connects in the background and the first
+    # operation waits for a server (up to serverSelectionTimeoutMS)
+    return MongoClient(
+        MONGO_URI,
+        serverSelectionTimeoutMS=5000,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        tls=True,
+        tlsAllowInvalidCertificates=False,
+        tlsCAFile=None
+    )
+
+
+registry.register("mongo", _create_mongo_client, close=lambda client: client.close())
+
+
+def get_mongo_client() -> MongoClient:
+    """MongoClient of the current process, created on first use (see config.clients)."""
+    return registry.get("mongo")
+
+
+def ping_mongo() -> None:
+    """Round-trip to the server. Raises if MongoDB cannot be reached."""
+    try:
+        get_mongo_client().admin.command('ping')
+    except Exception as e:
+        raise Exception(f"Failed to connect to MongoDB: {e}")
 
-try:
-    client.admin.command('ping')
-except Exception as e:
-    raise Exception(f"Failed to connect to MongoDB: {e}")
 
 def get_mongo_db():
-    return client["twitter_db"]
+    return get_mongo_client()["twitter_db"]
@@ -1,11 +1,118 @@
 import os
 
-class DevConfig:
+class BaseConfig:
+    # Tweets cache (seconds)
+    TWEETS_CACHE_TTL = int(os.getenv('TWEETS_CACHE_TTL', 300))
+    TWEETS_CACHE_STALE_TTL = int(os.getenv('TWEETS_CACHE_STALE_TTL', 900))
+
+    # Cached tweets read path
+    TWEETS_PAGE_MAX_LIMIT = int(os.getenv('TWEETS_PAGE_MAX_LIMIT', 500))
+    TWEETS_STREAM_BATCH_SIZE = int(os.getenv('TWEETS_STREAM_BATCH_SIZE', 500))
+    BATCH_MAX_TERMS = int(os.getenv('BATCH_MAX_TERMS', 20))
+    TWEETS_WRITE_BATCH_SIZE = int(os.getenv('TWEETS_WRITE_BATCH_SIZE', 500))
+
+    # Indexes (config/indexes.py): created on the first request; TTL of 0 keeps tweets forever
+    MONGO_ENSURE_INDEXES = os.getenv('MONGO_ENSURE_INDEXES', 'true').lower() == 'true'
+    TWEETS_TTL_DAYS = int(os.getenv('TWEETS_TTL_DAYS', 0))
+
+    # Load the VADER lexicon, connect to MongoDB and create indexes in create_app instead of on the first request
+    WARM_UP_ON_START = os.getenv('WARM_UP_ON_START', 'false').lower() == 'true'
+
+    # Hourly metrics: 'rollup', 'aggregation' (MongoDB) or 'pandas'; window of 0 means every stored tweet,
+    # otherwise it starts at the rollup bucket holding now - METRICS_WINDOW_HOURS
+    METRICS_ENGINE = os.getenv('METRICS_ENGINE', 'rollup').lower()
+    METRICS_WINDOW_HOURS = int(os.getenv('METRICS_WINDOW_HOURS', 0))
+    # Rollup buckets: 'hour' or 'minute'
+    ROLLUP_GRANULARITY = os.getenv('ROLLUP_GRANULARITY', 'hour').lower()
+
+    # Hype score: 'weighted' (HYPE_WEIGHTS as "tweet_count=0.4,likes_mean=0.3,...", missing
+    # features keep the original weights) or 'legacy' (the original formula); optional
+    # per-term normalization ('none', 'zscore', 'minmax') and time decay half-life in hours
+    HYPE_SCORE_MODE = os.getenv('HYPE_SCORE_MODE', 'weighted').lower()
+    HYPE_WEIGHTS = os.getenv('HYPE_WEIGHTS', '')
+    HYPE_NORMALIZATION = os.getenv('HYPE_NORMALIZATION', 'none').lower()
+    HYPE_DECAY_HALF_LIFE_HOURS = float(os.getenv('HYPE_DECAY_HALF_LIFE_HOURS', 0))
+
+    # Write-behind ingest: fetched tweets are queued and written by a background thread in
+    # bulk (every WRITE_BEHIND_BATCH_SIZE tweets or WRITE_BEHIND_FLUSH_INTERVAL seconds).
+    # Above WRITE_BEHIND_MAX_PENDING queued tweets, requests wait up to
+    # WRITE_BEHIND_BLOCK_SECONDS and then write synchronously. With READ_YOUR_WRITES the
+    # request that fetched the tweets waits (up to WRITE_BEHIND_WAIT_SECONDS) for their flush.
+    WRITE_BEHIND = os.getenv('WRITE_BEHIND', 'false').lower() == 'true'
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', 1000))
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', 0.5))
+    WRITE_BEHIND_MAX_PENDING = int(os.getenv('WRITE_BEHIND_MAX_PENDING', 10000))
+    WRITE_BEHIND_BLOCK_SECONDS = float(os.getenv('WRITE_BEHIND_BLOCK_SECONDS', 5))
+    WRITE_BEHIND_READ_YOUR_WRITES = os.getenv('WRITE_BEHIND_READ_YOUR_WRITES', 'false').lower() == 'true'
+    WRITE_BEHIND_WAIT_SECONDS = float(os.getenv('WRITE_BEHIND_WAIT_SECONDS', 10))
+
+    # Response encoding: 'orjson' (falls back to 'std' when not installed) and gzip/brotli
+    # compression of bodies of at least COMPRESS_MIN_SIZE bytes
+    JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'orjson').lower()
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+
+    # HTTP caching: Cache-Control max-age per route (0 = always revalidate with the ETag) and
+    # the in-process LRU of serialized responses (entries, total bytes; 0 entries disables it)
+    FETCH_TWEETS_MAX_AGE = int(os.getenv('FETCH_TWEETS_MAX_AGE', 0))
+    FEELINGS_MAX_AGE = int(os.getenv('FEELINGS_MAX_AGE', 0))
+    HOURLY_METRICS_MAX_AGE = int(os.getenv('HOURLY_METRICS_MAX_AGE', 0))
+    HTTP_RESPONSE_CACHE_SIZE = int(os.getenv('HTTP_RESPONSE_CACHE_SIZE', 128))
+    HTTP_RESPONSE_CACHE_MAX_BYTES = int(os.getenv('HTTP_RESPONSE_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+
+    # Request coalescing: concurrent identical requests share one computation (and one
+    # Twitter fetch); with COALESCE_LEASE the refreshes are also coalesced across workers
+    COALESCE_REQUESTS = os.getenv('COALESCE_REQUESTS', 'true').lower() == 'true'
+    COALESCE_LEASE = os.getenv('COALESCE_LEASE', 'false').lower() == 'true'
+    COALESCE_LEASE_TTL = int(os.getenv('COALESCE_LEASE_TTL', 30))
+
+    # Stage timings and counters exposed in the Prometheus text format at /metrics (404 when disabled)
+    INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'false').lower() == 'true'
+
+    # On-demand request profiling (utils/profiling.py): requests sent with "X-Profile: 1" (or
+    # ?profile=1) are profiled and stored in PROFILE_DIR, "download" returns the profile as a
+    # zip. PROFILER: 'auto' (pyinstrument when installed), 'cprofile' or 'pyinstrument'.
+    # When PROFILING_TOKEN is set, requests must also send it (X-Profile-Token)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+    PROFILER = os.getenv('PROFILER', 'auto').lower()
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 50))
+
+    # Offline mode (offline/), for benchmarks and load tests: Twitter responses replayed from
+    # OFFLINE_RECORDING (see `manage.py record-tweets`) or generated (OFFLINE_TWEETS_PER_PAGE
+    # tweets, OFFLINE_PAGES pages per search), with OFFLINE_LATENCY_MS per call and a 429 every
+    # OFFLINE_TOO_MANY_REQUESTS_EVERY calls (0 never); MongoDB is mongomock, or the local
+    # server of OFFLINE_MONGO_URI
+    OFFLINE_MODE = os.getenv('OFFLINE_MODE', 'false').lower() == 'true'
+    OFFLINE_RECORDING = os.getenv('OFFLINE_RECORDING', '')
+    OFFLINE_TWEETS_PER_PAGE = int(os.getenv('OFFLINE_TWEETS_PER_PAGE', 10))
+    OFFLINE_PAGES = int(os.getenv('OFFLINE_PAGES', 1))
+    OFFLINE_LATENCY_MS = float(os.getenv('OFFLINE_LATENCY_MS', 0))
+    OFFLINE_TOO_MANY_REQUESTS_EVERY = int(os.getenv('OFFLINE_TOO_MANY_REQUESTS_EVERY', 0))
+    OFFLINE_MONGO_URI = os.getenv('OFFLINE_MONGO_URI', '')
+
+    # Background collector (collector.py)
+    TWEETS_READ_ONLY = os.getenv('TWEETS_READ_ONLY', 'false').lower() == 'true'
+    COLLECTOR_DEFAULT_INTERVAL = int(os.getenv('COLLECTOR_DEFAULT_INTERVAL', 300))
+    COLLECTOR_POLL_SECONDS = int(os.getenv('COLLECTOR_POLL_SECONDS', 5))
+    COLLECTOR_ASYNC_FETCH = os.getenv('COLLECTOR_ASYNC_FETCH', 'true').lower() == 'true'
+
+    # Shared Twitter API budget (requests per window, window in seconds)
+    TWITTER_RATE_LIMIT = int(os.getenv('TWITTER_RATE_LIMIT', 450))
+    TWITTER_RATE_LIMIT_WINDOW = int(os.getenv('TWITTER_RATE_LIMIT_WINDOW', 900))
+    TWITTER_FETCH_CONCURRENCY = int(os.getenv('TWITTER_FETCH_CONCURRENCY', 5))
+    # Pages (of 100 tweets) read at most by an incremental fetch (since the watermark) of one term
+    TWITTER_INCREMENTAL_MAX_PAGES = int(os.getenv('TWITTER_INCREMENTAL_MAX_PAGES', 10))
+
+class DevConfig(BaseConfig):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_MONGO_URI_DEV')
     BASE_URL= os.getenv('BASE_URL_DEV')
 
-class ProdConfig:
+class ProdConfig(BaseConfig):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_MONGO_URI_PROD')
     BASE_URL= os.getenv('BASE_URL_PROD')
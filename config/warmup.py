@@ -0,0 +1,59 @@
+import time
+from typing import Any, Callable, Dict
+
+from flask import current_app
+
+from config.indexes import ensure_indexes_once, require_unique_tweet_id
+from config.mongo_db import get_mongo_db, ping_mongo
+from preprocess.tweets_preprocess import get_sentiment_analyzer, sentiment_ready
+from utils.logger import handle_logger
+
+
+def _timed(step: Callable[[], Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        step()
+        return {"ok": True, "seconds": round(time.perf_counter() - start, 4)}
+    except Exception as e:
+        return {"ok": False, "seconds": round(time.perf_counter() - start, 4), "error": str(e)}
+
+
+def warm_up() -> Dict[str, Dict[str, Any]]:
+    """
+    Load everything the first request would otherwise pay for: the VADER lexicon, the
+    MongoDB connection and the indexes. Must run inside an app context.
+
+    Failures are logged and reported, never raised, so a worker still boots when MongoDB
+    is briefly unreachable.
+
+    Returns:
+    - dict per step ("sentiment", "mongo", "indexes") with "ok", "seconds" and "error"
+    """
+    steps = {
+        "sentiment": get_sentiment_analyzer,
+        "mongo": ping_mongo,
+    }
+    if current_app.config.get("MONGO_ENSURE_INDEXES", True):
+        steps["indexes"] = lambda: ensure_indexes_once(get_mongo_db(), ttl_days=current_app.config.get("TWEETS_TTL_DAYS", 0))
+
+    results = {name: _timed(step) for name, step in steps.items()}
+
+    failed = [name for name, result in results.items() if not result["ok"]]
+    if failed:
+        handle_logger(message=f"⚠️ Warm-up incomplete ({', '.join(failed)}): {results}", type_logger="warning")
+    else:
+        handle_logger(message=f"🔥 Warm-up done: {results}", type_logger="info")
+    return results
+
+
+def readiness_checks() -> Dict[str, Dict[str, Any]]:
+    """
+    Checks behind the readiness endpoint: MongoDB answers a ping, the unique tweet_id
+    index tweets are written with exists, and the sentiment analyzer is loaded (it is
+    loaded now if warm-up did not run).
+    """
+    return {
+        "mongo": _timed(ping_mongo),
+        "indexes": _timed(lambda: require_unique_tweet_id(get_mongo_db()["tweets"])),
+        "sentiment": {"ok": True, "seconds": 0.0} if sentiment_ready() else _timed(get_sentiment_analyzer),
+    }
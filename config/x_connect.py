@@ -1,23 +1,102 @@
 import os
+import threading
+
+import requests
 import tweepy
 from flask import g, current_app
 
+from config.clients import registry
 from utils.logger import handle_logger
 
-def get_twitter_client():
-    """Initialize and cache Twitter client in Flask's g object."""
-    if 'twitter_client' not in g:
+try:
+    from tweepy.asynchronous import AsyncClient
+except ImportError:  # aiohttp is optional (pip install "tweepy[async]")
+    AsyncClient = None
+
+RATE_LIMIT_HEADERS = ("x-rate-limit-limit", "x-rate-limit-remaining", "x-rate-limit-reset")
+
+# Keep-alive connections to api.twitter.com per process, one per concurrent request of a worker
+TWITTER_HTTP_POOL_SIZE = int(os.getenv("TWITTER_HTTP_POOL_SIZE", 10))
+
+def extract_rate_limit_headers(response):
+    """Keep only the x-rate-limit-* headers of an API response."""
+    headers = getattr(response, "headers", None) or {}
+    return {name: headers[name] for name in RATE_LIMIT_HEADERS if name in headers}
+
+class TwitterClient(tweepy.Client):
+    """
+    tweepy.Client that keeps the rate-limit headers of the last API response.
+
+    One instance is shared by every request of a process, so the headers are kept per
+    thread (per greenlet under gevent) and the HTTP session pools its connections.
+    """
+
+    def __init__(self, *args, pool_size: int = TWITTER_HTTP_POOL_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._local = threading.local()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+
+    @property
+    def rate_limit_headers(self):
+        return getattr(self._local, "rate_limit_headers", None)
+
+    @rate_limit_headers.setter
+    def rate_limit_headers(self, headers):
+        self._local.rate_limit_headers = headers
+
+    def request(self, method, route, params=None, json=None, user_auth=False):
         try:
-            bearer_token = os.getenv("BEARER_TOKEN")
-            if not bearer_token:
-                raise RuntimeError("Twitter credentials not configured")
+            response = super().request(method, route, params=params, json=json, user_auth=user_auth)
+        except tweepy.HTTPException as e:
+            self.rate_limit_headers = extract_rate_limit_headers(e.response)
+            raise
+        self.rate_limit_headers = extract_rate_limit_headers(response)
+        return response
+
+if AsyncClient is not None:
+    class AsyncTwitterClient(AsyncClient):
+        """
+        tweepy AsyncClient that reports the rate-limit headers of every response to
+        `on_rate_limit`, since concurrent calls can't share a "last response" attribute.
+        """
 
-            g.twitter_client = tweepy.Client(
-                bearer_token=bearer_token,
-                wait_on_rate_limit=True
-            )
+        def __init__(self, *args, on_rate_limit=None, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.on_rate_limit = on_rate_limit
 
-            handle_logger(message="✅ Twitter client initialized", type_logger="info")
+        async def request(self, method, route, params=None, json=None, user_auth=False):
+            try:
+                response = await super().request(method, route, params=params, json=json, user_auth=user_auth)
+            except tweepy.HTTPException as e:
+                await self._report(e.response)
+                raise
+            await self._report(response)
+            return response
+
+        async def _report(self, response):
+            if self.on_rate_limit is not None:
+                await self.on_rate_limit(extract_rate_limit_headers(response))
+else:
+    AsyncTwitterClient = None
+
+def _create_twitter_client() -> TwitterClient:
+    bearer_token = os.getenv("BEARER_TOKEN")
+    if not bearer_token:
+        raise RuntimeError("Twitter credentials not configured")
+
+    # Rate limits are handled by services.rate_limiter, never by sleeping here
+    client = TwitterClient(bearer_token=bearer_token, wait_on_rate_limit=False)
+    handle_logger(message=f"✅ Twitter client initialized (pid {os.getpid()})", type_logger="info")
+    return client
+
+registry.register("twitter", _create_twitter_client, close=lambda client: client.session.close())
+
+def get_twitter_client():
+    """Borrow the process-wide Twitter client for the current app context (cached in g)."""
+    if 'twitter_client' not in g:
+        try:
+            g.twitter_client = registry.get("twitter")
         except tweepy.TweepyException as e:
             handle_logger(message=f"❌ Twitter client error: {str(e)}", type_logger="error")
             raise
@@ -28,7 +107,21 @@ def get_twitter_client():
     return g.twitter_client
 
 def close_twitter_client(e=None):
-    """Cleanup function to remove Twitter client from Flask's global object (g)."""
-    client = g.pop('twitter_client', None)
-    if client is not None:
-        handle_logger(message="🔄 Twitter client removed from g", type_logger="info")
+    """Give the borrowed Twitter client back. It stays open for the next requests of this process."""
+    g.pop('twitter_client', None)
+
+def _create_async_twitter_client(on_rate_limit=None):
+    if AsyncTwitterClient is None:
+        raise RuntimeError("Async Twitter client requires aiohttp (pip install \"tweepy[async]\")")
+
+    bearer_token = os.getenv("BEARER_TOKEN")
+    if not bearer_token:
+        raise RuntimeError("Twitter credentials not configured")
+
+    return AsyncTwitterClient(bearer_token=bearer_token, wait_on_rate_limit=False, on_rate_limit=on_rate_limit)
+
+registry.register("twitter_async", _create_async_twitter_client)
+
+def get_async_twitter_client(on_rate_limit=None):
+    """Build an asyncio Twitter client. Not cached: it is bound to the running event loop."""
+    return registry.build("twitter_async", on_rate_limit=on_rate_limit)
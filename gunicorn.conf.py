@@ -0,0 +1,63 @@
+"""
+Gunicorn settings for production:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Every value can be overridden with the environment variables below. Each worker builds
+its own MongoDB and Twitter clients after the fork (config.clients) and reuses them for
+every request it serves.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', 5000)}")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# "gthread" (default) or "gevent" (pip install gevent). Requests spend most of their time
+# waiting on MongoDB and the Twitter API, so each worker serves several at once.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+
+# Import the app (pandas, flask, ...) once in the master and share it with the workers.
+# Clients are not shared: they are rebuilt in each worker after the fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# WARM_UP_ON_START runs in post_worker_init, not in create_app: in the preloading master
+# it would connect to MongoDB before the fork
+os.environ["WARM_UP_IN_WORKERS"] = "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 0))
+
+# "-" logs to stdout; empty disables the access log
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    from config.clients import registry
+
+    # os.register_at_fork already does this; kept explicit for servers that fork differently
+    registry.after_fork()
+
+
+def post_worker_init(worker):
+    app = worker.wsgi
+    if getattr(app, "config", {}).get("WARM_UP_ON_START"):
+        from config.warmup import warm_up
+
+        with app.app_context():
+            warm_up()
+
+
+def worker_exit(server, worker):
+    from config.clients import registry
+    from services.write_behind import close_all
+
+    # Flush queued tweets while the MongoDB client is still open
+    close_all(timeout=graceful_timeout)
+    registry.close()
@@ -0,0 +1,178 @@
+import argparse
+import os
+
+from flask import g
+
+from config import create_app
+from config.mongo_db import get_mongo_db
+
+env = os.getenv('FLASK_ENV', 'dev')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Maintenance commands for the tweets database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill = subparsers.add_parser("backfill-sentiment", help="Score stored tweets with missing or outdated sentiment")
+    backfill.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPU count)")
+    backfill.add_argument("--batch-size", type=int, default=5000, help="Tweets read and written per bulk update")
+    backfill.add_argument("--chunk-size", type=int, default=500, help="Tweets sent to a worker at a time")
+    backfill.add_argument("--all", action="store_true", help="Rescore every tweet, even up-to-date ones")
+
+    rollups = subparsers.add_parser("rebuild-rollups", help="Recompute metric rollups from the stored tweets")
+    rollups.add_argument("--search", default=None, help="Only rebuild this search term")
+    rollups.add_argument("--granularity", choices=["hour", "minute"], default=None, help="Default: ROLLUP_GRANULARITY")
+
+    subparsers.add_parser("migrate-search-field", help="Turn the scalar 'search' field of old tweets into an array")
+
+    subparsers.add_parser("ensure-indexes", help="Create the required indexes (idempotent)")
+    report = subparsers.add_parser("index-report", help="Report missing/unused indexes and explain the main queries")
+    report.add_argument("--search", default="bitcoin", help="Search term used to explain the queries")
+    subparsers.add_parser("dedupe-tweets", help="Merge tweets stored more than once under the same tweet_id")
+
+    record = subparsers.add_parser("record-tweets", help="Record search responses of the Twitter API for offline replay")
+    record.add_argument("--search", required=True, help="Search term to record")
+    record.add_argument("--pages", type=int, default=5, help="Pages to record (following next_token)")
+    record.add_argument("--max-results", type=int, default=100, help="Tweets per page (10-100)")
+    record.add_argument("--output", default="recordings/tweets.jsonl", help="Recording file (appended to)")
+
+    return parser.parse_args()
+
+
+def backfill_sentiment_command(args):
+    from flask import current_app
+    from services.metrics_rollup import MetricsRollup
+    from services.sentiment_backfill import backfill_sentiment
+    from services.tweets_cache import TweetCache
+
+    result = backfill_sentiment(
+        g.mongo_db["tweets"],
+        workers=args.workers,
+        batch_size=args.batch_size,
+        chunk_size=args.chunk_size,
+        rescore_all=args.all
+    )
+    print(f"✅ Sentiment backfill done: {result['scanned']} tweets scanned, {result['updated']} updated")
+    if not result["updated"]:
+        return
+
+    # The rollups still sum the old scores: rebuild the ones of the rescored terms
+    rollup = MetricsRollup(g.mongo_db["tweets_metrics"], granularity=current_app.config["ROLLUP_GRANULARITY"])
+    if args.all:
+        written = rollup.rebuild(g.mongo_db["tweets"])
+    else:
+        written = sum(rollup.rebuild(g.mongo_db["tweets"], search=search) for search in result["searches"])
+    TweetCache().invalidate(g.mongo_db["tweets_cache"])
+    print(f"✅ Rollups rebuilt: {written} buckets written for {len(result['searches'])} search terms")
+
+
+def rebuild_rollups_command(args):
+    from flask import current_app
+    from services.metrics_rollup import MetricsRollup
+    from services.tweets_cache import TweetCache, normalize_search
+
+    granularity = args.granularity or current_app.config["ROLLUP_GRANULARITY"]
+    rollup = MetricsRollup(g.mongo_db["tweets_metrics"], granularity=granularity)
+    search = normalize_search(args.search) if args.search else None
+
+    written = rollup.rebuild(g.mongo_db["tweets"], search=search)
+    TweetCache().invalidate(g.mongo_db["tweets_cache"], search=search)
+    print(f"✅ Rollups rebuilt: {written} {granularity} buckets written")
+
+
+def migrate_search_field_command(args):
+    # Tweets are upserted with $addToSet on 'search', which fails on the scalar values
+    # stored before a tweet could belong to several search terms
+    result = g.mongo_db["tweets"].update_many(
+        {"search": {"$type": "string"}},
+        [{"$set": {"search": ["$search"]}}]
+    )
+    print(f"✅ Search field migrated: {result.modified_count} tweets updated")
+
+
+def ensure_indexes_command(args):
+    from flask import current_app
+    from config.indexes import ensure_indexes
+
+    created = ensure_indexes(g.mongo_db, ttl_days=current_app.config["TWEETS_TTL_DAYS"])
+    print(f"✅ Indexes up to date ({sum(len(names) for names in created.values())} created or updated)")
+    for collection, names in created.items():
+        print(f"  {collection}: {', '.join(names)}")
+
+
+def index_report_command(args):
+    from flask import current_app
+    from config.indexes import explain_queries, index_report
+    from services.tweets_cache import normalize_search
+
+    for collection, report in index_report(g.mongo_db, ttl_days=current_app.config["TWEETS_TTL_DAYS"]).items():
+        print(f"🗂️ {collection}")
+        for status in ("missing", "extra", "unused"):
+            if report[status]:
+                print(f"  {status}: {', '.join(report[status])}")
+
+    print(f"\n🔎 Query plans for '{normalize_search(args.search)}'")
+    for query, plan in explain_queries(g.mongo_db, normalize_search(args.search)).items():
+        warning = " ⚠️ collection scan" if plan["collection_scan"] else ""
+        print(f"  {query}: {plan['plan']} (index: {plan['index']}, examined: {plan['docs_examined']}, returned: {plan['returned']}){warning}")
+
+
+def dedupe_tweets_command(args):
+    from config.indexes import dedupe_tweets
+
+    removed = dedupe_tweets(g.mongo_db)
+    print(f"✅ Duplicate tweets merged: {removed} documents removed")
+
+
+def record_tweets_command(args):
+    import tweepy
+    from config.x_connect import get_twitter_client
+    from offline.twitter import record_page
+    from services.tweets_cache import normalize_search
+    from services.tweets_parser import SEARCH_TWEET_PARAMS, build_search_query
+
+    client = get_twitter_client()
+    query = build_search_query(normalize_search(args.search))
+    params = {**SEARCH_TWEET_PARAMS, "max_results": args.max_results}
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+
+    recorded = 0
+    next_token = None
+    with open(args.output, "a", encoding="utf-8") as f:
+        for _ in range(args.pages):
+            try:
+                response = client.search_recent_tweets(query=query, next_token=next_token, **params)
+            except tweepy.TooManyRequests as e:
+                record_page(f, query, error=e)
+                print("⚠️ Rate limited, recording stopped")
+                break
+            record_page(f, query, response=response)
+            recorded += len(response.data or [])
+            next_token = (response.meta or {}).get("next_token")
+            if not next_token:
+                break
+    print(f"✅ {recorded} tweets of '{normalize_search(args.search)}' recorded in {args.output}")
+
+
+COMMANDS = {
+    "backfill-sentiment": backfill_sentiment_command,
+    "rebuild-rollups": rebuild_rollups_command,
+    "migrate-search-field": migrate_search_field_command,
+    "ensure-indexes": ensure_indexes_command,
+    "index-report": index_report_command,
+    "dedupe-tweets": dedupe_tweets_command,
+    "record-tweets": record_tweets_command,
+}
+
+
+def main():
+    args = parse_args()
+    app = create_app(env)
+
+    with app.app_context():
+        g.mongo_db = get_mongo_db()
+        COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# offline/__init__.py
@@ -0,0 +1,38 @@
+from typing import Any, Mapping
+
+from config.clients import registry
+from offline.mongo import create_offline_mongo_client
+from offline.twitter import AsyncReplayTwitterClient, RecordedResponses, ReplayTwitterClient, SyntheticResponses
+
+
+def replay_client_from_config(config: Mapping[str, Any]) -> ReplayTwitterClient:
+    """Replay client of the OFFLINE_* settings: the recording when given, synthetic pages otherwise."""
+    recording = config.get("OFFLINE_RECORDING")
+    source = RecordedResponses.load(recording) if recording else SyntheticResponses(
+        tweets_per_page=config.get("OFFLINE_TWEETS_PER_PAGE", 10),
+        pages=config.get("OFFLINE_PAGES", 1)
+    )
+    return ReplayTwitterClient(
+        source,
+        latency=config.get("OFFLINE_LATENCY_MS", 0) / 1000,
+        too_many_requests_every=config.get("OFFLINE_TOO_MANY_REQUESTS_EVERY", 0)
+    )
+
+
+def install(config: Mapping[str, Any]) -> None:
+    """
+    Serve the Twitter clients (sync and async) and MongoDB from the offline stand-ins.
+    Clients already built in this process are dropped; each process (worker) builds its own.
+    """
+    def create_twitter_client() -> ReplayTwitterClient:
+        return replay_client_from_config(config)
+
+    registry.register("twitter", create_twitter_client, close=lambda client: client.session.close())
+    # The async client shares the pages and counters of the process' sync client
+    registry.register(
+        "twitter_async", lambda on_rate_limit=None: AsyncReplayTwitterClient(registry.get("twitter"), on_rate_limit)
+    )
+    registry.register(
+        "mongo", lambda: create_offline_mongo_client(config.get("OFFLINE_MONGO_URI")), close=lambda client: client.close()
+    )
+    registry.close()
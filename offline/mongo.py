@@ -0,0 +1,70 @@
+import threading
+from typing import Any, Optional
+
+from pymongo import MongoClient
+
+try:
+    import mongomock
+    from mongomock.command_cursor import CommandCursor
+except ImportError:  # mongomock is optional (pip install mongomock)
+    mongomock = None
+
+
+class SerializedMongomock:
+    """
+    Proxy of a mongomock client (and of the databases, collections and cursors reached
+    through it) running every operation under one lock. mongomock is not thread-safe:
+    concurrent requests (gthread workers, the dev server) fail while iterating documents
+    another thread changes, and racing upserts hit duplicate keys a server would retry.
+    Cursors are computed on their first read, so iteration is serialized too.
+
+    Only the clients built by `create_offline_mongo_client` are wrapped; mongomock itself
+    is left as it is.
+    """
+
+    def __init__(self, target: Any, lock: Optional[threading.RLock] = None):
+        self._target = target
+        self._lock = lock or threading.RLock()
+
+    def _wrap(self, value: Any) -> Any:
+        if isinstance(value, (mongomock.MongoClient, mongomock.Database, mongomock.Collection, mongomock.collection.Cursor, CommandCursor)):
+            return SerializedMongomock(value, self._lock)
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        # Collections are callable (like pymongo's), so they are checked first
+        if callable(value) and not isinstance(value, mongomock.Collection):
+            def call(*args, **kwargs):
+                with self._lock:
+                    return self._wrap(value(*args, **kwargs))
+            return call
+        return self._wrap(value)
+
+    def __getitem__(self, name: str) -> Any:
+        with self._lock:
+            return self._wrap(self._target[name])
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._target))
+
+    def __next__(self):
+        with self._lock:
+            return next(self._target)
+
+
+def create_offline_mongo_client(uri: Optional[str] = None):
+    """
+    MongoDB for offline runs: a local server without TLS when `uri` is given (e.g.
+    mongodb://localhost:27017), an in-memory mongomock client otherwise.
+
+    A mongomock database lives in its process: every gunicorn worker gets its own, and
+    its operations run one at a time. Use a local server to share data (and leases)
+    between workers, or to measure concurrent database access.
+    """
+    if uri:
+        return MongoClient(uri, serverSelectionTimeoutMS=5000)
+    if mongomock is None:
+        raise RuntimeError("Offline mode needs mongomock (pip install mongomock) or OFFLINE_MONGO_URI")
+    return SerializedMongomock(mongomock.MongoClient())
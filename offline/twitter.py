@@ -0,0 +1,277 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+import tweepy
+
+# Words of the synthetic tweets, with enough sentiment-bearing ones for VADER to score
+WORDS = [
+    "love", "great", "awesome", "hate", "awful", "bad", "good", "amazing", "terrible", "ok",
+    "launch", "release", "update", "price", "market", "team", "game", "today", "news", "people",
+    "really", "not", "very", "new", "best", "worst", "happy", "sad", "wow", "lol",
+]
+
+# Snowflake epoch of tweet ids (ids grow with time, as since_id expects)
+TWITTER_EPOCH_MS = 1288834974657
+
+
+def search_term(query: str) -> str:
+    """Search term of a query built by `build_search_query` (operators dropped)."""
+    return " ".join(word for word in query.split() if ":" not in word and not word.startswith("-")) or query
+
+
+def too_many_requests(retry_after: int = 60) -> tweepy.TooManyRequests:
+    """The error tweepy raises on an HTTP 429 of the search endpoint."""
+    response = requests.Response()
+    response.status_code = 429
+    response.reason = "Too Many Requests"
+    response.headers["Retry-After"] = str(retry_after)
+    response.headers["x-rate-limit-remaining"] = "0"
+    response.headers["x-rate-limit-reset"] = str(int(time.time()) + retry_after)
+    response._content = json.dumps({"title": "Too Many Requests", "detail": "Too Many Requests", "status": 429}).encode()
+    return tweepy.TooManyRequests(response)
+
+
+def to_response(page: Dict[str, Any]) -> tweepy.Response:
+    """tweepy Response of a search page in the API v2 JSON shape (data, includes.users, meta)."""
+    includes = page.get("includes") or {}
+    return tweepy.Response(
+        data=[tweepy.Tweet(tweet) for tweet in page.get("data") or []] or None,
+        includes={"users": [tweepy.User(user) for user in includes.get("users", [])]} if includes else {},
+        errors=page.get("errors", []),
+        meta=page.get("meta") or {"result_count": len(page.get("data") or [])}
+    )
+
+
+class SyntheticResponses:
+    """
+    Search pages generated on demand, in the API v2 JSON shape.
+
+    Every call returns `tweets_per_page` new tweets (ids grow with time, so watermarks
+    advance), written by `authors` users (expanded in includes.users). A search is
+    `pages` pages long: the first `pages - 1` carry a next_token. Texts and engagement
+    come from a seeded generator; `distinct_texts` bounds the texts (the sentiment memo
+    then serves repeats, as with retweet-heavy terms).
+    """
+
+    def __init__(
+        self,
+        tweets_per_page: int = 10,
+        pages: int = 1,
+        authors: int = 200,
+        distinct_texts: int = 0,
+        seed: int = 7
+    ):
+        self.tweets_per_page = tweets_per_page
+        self.pages = max(1, pages)
+        self.authors = max(1, authors)
+        self._random = random.Random(seed)
+        self._texts = [self._text() for _ in range(distinct_texts)]
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def _text(self) -> str:
+        return " ".join(self._random.choices(WORDS, k=self._random.randint(6, 18)))
+
+    def _next_id(self) -> int:
+        sequence = next(self._sequence)
+        millis = int(time.time() * 1000) - TWITTER_EPOCH_MS
+        return (millis << 22) | ((os.getpid() & 0x3FF) << 12) | (sequence & 0xFFF)
+
+    def page(self, query: str, since_id: Optional[int] = None, next_token: Optional[str] = None) -> Dict[str, Any]:
+        term = search_term(query)
+        page_number = int(next_token.rsplit(":", 1)[1]) if next_token else 0
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            tweets = []
+            for _ in range(self.tweets_per_page):
+                tweet_id = self._next_id()
+                text = self._random.choice(self._texts) if self._texts else self._text()
+                tweets.append({
+                    "id": str(tweet_id),
+                    "text": f"{term} {text}",
+                    "author_id": str(self._random.randrange(self.authors)),
+                    "created_at": datetime.fromtimestamp(
+                        now.timestamp() - self._random.uniform(0, 86400), timezone.utc
+                    ).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                    "edit_history_tweet_ids": [str(tweet_id)],
+                    "public_metrics": {
+                        "like_count": int(self._random.paretovariate(1.5)) - 1,
+                        "retweet_count": int(self._random.paretovariate(2)) - 1,
+                        "reply_count": self._random.randint(0, 5),
+                        "quote_count": self._random.randint(0, 2),
+                        "bookmark_count": self._random.randint(0, 3),
+                        "impression_count": self._random.randint(0, 5000),
+                    },
+                })
+
+        # Newest first, like the API
+        tweets.reverse()
+        author_ids = sorted({tweet["author_id"] for tweet in tweets}, key=int)
+        meta = {
+            "result_count": len(tweets),
+            "newest_id": tweets[0]["id"] if tweets else None,
+            "oldest_id": tweets[-1]["id"] if tweets else None,
+        }
+        if page_number + 1 < self.pages:
+            meta["next_token"] = f"{term}:{page_number + 1}"
+        return {
+            "data": tweets,
+            "includes": {"users": [
+                {"id": author_id, "name": f"User {author_id}", "username": f"user{author_id}",
+                 "profile_image_url": f"https://pbs.twimg.com/profile_images/{author_id}/normal.jpg"}
+                for author_id in author_ids
+            ]},
+            "meta": meta,
+        }
+
+
+class RecordedResponses:
+    """
+    Search pages replayed from a recording (JSON lines, see `record_page`).
+
+    Each line holds the query and either an API v2 response ("response") or an error
+    ("status": 429 and its "headers"). Pages of a query are replayed in order and the
+    recording loops, so it can feed a long run; tweets at or below `since_id` are
+    dropped, as the API would. Queries missing from the recording get the pages of the
+    first recorded one.
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]]):
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in entries:
+            self._entries.setdefault(search_term(entry.get("query", "")), []).append(entry)
+        if not self._entries:
+            raise ValueError("Empty recording")
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "RecordedResponses":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    def page(self, query: str, since_id: Optional[int] = None, next_token: Optional[str] = None) -> Dict[str, Any]:
+        term = search_term(query)
+        entries = self._entries.get(term) or next(iter(self._entries.values()))
+        with self._lock:
+            position = self._cursors.get(term, 0)
+            self._cursors[term] = position + 1
+        entry = entries[position % len(entries)]
+
+        if entry.get("status") == 429:
+            raise too_many_requests(int((entry.get("headers") or {}).get("Retry-After", 60)))
+
+        page = dict(entry.get("response") or {})
+        if since_id is not None and page.get("data"):
+            page["data"] = [tweet for tweet in page["data"] if int(tweet["id"]) > since_id]
+        return page
+
+
+def record_page(f, query: str, response: Optional[tweepy.Response] = None, error: Optional[tweepy.HTTPException] = None) -> None:
+    """Append a search response (or a 429) of the real API to a recording file."""
+    if error is not None:
+        headers = dict(getattr(error.response, "headers", {}) or {})
+        entry = {"query": query, "status": 429, "headers": {"Retry-After": headers.get("Retry-After", "60")}}
+    else:
+        includes = response.includes or {}
+        entry = {"query": query, "response": {
+            "data": [tweet.data for tweet in response.data or []],
+            "includes": {"users": [user.data for user in includes.get("users", [])]},
+            "meta": response.meta or {},
+        }}
+    f.write(json.dumps(entry, default=str) + "\n")
+
+
+class ReplayTwitterClient:
+    """
+    Stand-in for `TwitterClient` serving `search_recent_tweets` from synthetic or recorded
+    pages, without network or credentials.
+
+    Like the real client it keeps the x-rate-limit-* headers of the last response (per
+    thread), counting `rate_limit` calls per `rate_limit_window` seconds. Options:
+    - latency: seconds each call takes (the API round-trip)
+    - too_many_requests_every: every Nth call fails with a 429 (0 never)
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        latency: float = 0.0,
+        too_many_requests_every: int = 0,
+        rate_limit: int = 450,
+        rate_limit_window: int = 900
+    ):
+        self.source = source
+        self.latency = latency
+        self.too_many_requests_every = too_many_requests_every
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.session = requests.Session()
+        self.calls = 0
+        self._window_start = time.time()
+        self._window_calls = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def rate_limit_headers(self):
+        return getattr(self._local, "rate_limit_headers", None)
+
+    @rate_limit_headers.setter
+    def rate_limit_headers(self, headers):
+        self._local.rate_limit_headers = headers
+
+    def respond(self, query: str, next_token: Optional[str] = None, since_id: Optional[int] = None):
+        """Rate-limit headers and tweepy Response of one call (raises TooManyRequests on a 429)."""
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            now = time.time()
+            if now - self._window_start >= self.rate_limit_window:
+                self._window_start, self._window_calls = now, 0
+            self._window_calls += 1
+            headers = {
+                "x-rate-limit-limit": str(self.rate_limit),
+                "x-rate-limit-remaining": str(max(0, self.rate_limit - self._window_calls)),
+                "x-rate-limit-reset": str(int(self._window_start + self.rate_limit_window)),
+            }
+
+        if self.too_many_requests_every and call % self.too_many_requests_every == 0:
+            raise too_many_requests()
+        return headers, to_response(self.source.page(query, since_id=since_id, next_token=next_token))
+
+    def search_recent_tweets(self, query: str, next_token: Optional[str] = None, since_id: Optional[int] = None, **params):
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            headers, response = self.respond(query, next_token=next_token, since_id=since_id)
+        except tweepy.TooManyRequests as e:
+            self.rate_limit_headers = dict(e.response.headers)
+            raise
+        self.rate_limit_headers = headers
+        return response
+
+
+class AsyncReplayTwitterClient:
+    """asyncio counterpart of `ReplayTwitterClient` (see `AsyncTwitterClient`), sharing its pages and counters."""
+
+    def __init__(self, client: ReplayTwitterClient, on_rate_limit=None):
+        self.client = client
+        self.on_rate_limit = on_rate_limit
+        self.session = None
+
+    async def search_recent_tweets(self, query: str, next_token: Optional[str] = None, since_id: Optional[int] = None, **params):
+        if self.client.latency:
+            await asyncio.sleep(self.client.latency)
+        headers, response = self.client.respond(query, next_token=next_token, since_id=since_id)
+        if self.on_rate_limit is not None:
+            await self.on_rate_limit(headers)
+        return response
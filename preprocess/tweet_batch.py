@@ -0,0 +1,247 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from preprocess.tweets_preprocess import SENTIMENT_VERSION, clean_text, has_current_sentiment, score_text
+
+# Engagement columns and the public_metrics field each one comes from
+PUBLIC_METRICS = {
+    "likes": "like_count",
+    "retweets": "retweet_count",
+    "replies": "reply_count",
+    "quotes": "quote_count",
+    "bookmarks": "bookmark_count",
+    "impressions": "impression_count",
+}
+
+SCORE_NAMES = ("neg", "neu", "pos", "compound")
+
+
+def _utc_naive(value: Optional[datetime]) -> datetime:
+    """Naive UTC datetime (what MongoDB returns), utcnow when missing."""
+    if value is None:
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_created_at(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return _utc_naive(value)
+    if isinstance(value, str):
+        try:
+            return _utc_naive(datetime.fromisoformat(value.replace("Z", "+00:00")))
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+
+class TweetBatch:
+    """
+    Columnar batch of tweets flowing from the Twitter fetch through sentiment scoring,
+    storage and the pandas analytics.
+
+    Numeric fields are NumPy arrays (int64 ids and engagement counts, float64 scores,
+    datetime64 creation times) and text fields are plain lists, so a batch holds one
+    object per column instead of one dict per tweet. Dicts are only built at the edges:
+    `documents` for MongoDB / JSON and `to_frame` for pandas.
+
+    Rows without sentiment have NaN scores until `score` fills them.
+    """
+
+    __slots__ = (
+        "tweet_id", "text", "author_id", "author_name", "author_photo", "created_at",
+        "likes", "retweets", "replies", "quotes", "bookmarks", "impressions",
+        "cleaned_text", "scores",
+    )
+
+    def __init__(
+        self,
+        tweet_id: np.ndarray,
+        text: List[str],
+        author_id: List[Any],
+        author_name: List[str],
+        author_photo: List[str],
+        created_at: np.ndarray,
+        engagement: Dict[str, np.ndarray],
+        cleaned_text: Optional[List[Optional[str]]] = None,
+        scores: Optional[np.ndarray] = None
+    ):
+        size = len(tweet_id)
+        self.tweet_id = tweet_id
+        self.text = text
+        self.author_id = author_id
+        self.author_name = author_name
+        self.author_photo = author_photo
+        self.created_at = created_at
+        for column in PUBLIC_METRICS:
+            setattr(self, column, engagement.get(column, np.zeros(size, dtype=np.int64)))
+        self.cleaned_text = cleaned_text if cleaned_text is not None else [None] * size
+        # neg, neu, pos, compound per row
+        self.scores = scores if scores is not None else np.full((size, len(SCORE_NAMES)), np.nan)
+
+    def __len__(self) -> int:
+        return len(self.tweet_id)
+
+    @property
+    def sentiment(self) -> np.ndarray:
+        """Compound score of each tweet (a view on `scores`)."""
+        return self.scores[:, 3]
+
+    @classmethod
+    def empty(cls) -> "TweetBatch":
+        return cls(np.empty(0, dtype=np.int64), [], [], [], [], np.empty(0, dtype="datetime64[us]"), {})
+
+    @classmethod
+    def from_tweepy(cls, tweets: Sequence[Any], users_map: Dict[str, Any]) -> "TweetBatch":
+        """
+        Batch of the tweepy Tweets of one search response.
+
+        Parameters:
+        - tweets: `response.data` of search_recent_tweets
+        - users_map: Authors expanded in the response (see `build_users_map`)
+        """
+        size = len(tweets)
+        authors = [users_map.get(str(tweet.author_id)) for tweet in tweets]
+        metrics = [tweet.public_metrics or {} for tweet in tweets]
+        return cls(
+            tweet_id=np.fromiter((tweet.id for tweet in tweets), dtype=np.int64, count=size),
+            text=[tweet.text for tweet in tweets],
+            author_id=[tweet.author_id for tweet in tweets],
+            author_name=[author.name if author else "Unknown" for author in authors],
+            author_photo=[author.profile_image_url if author else "" for author in authors],
+            created_at=np.array([_utc_naive(tweet.created_at) for tweet in tweets], dtype="datetime64[us]"),
+            engagement={
+                column: np.fromiter((int(m.get(field, 0) or 0) for m in metrics), dtype=np.int64, count=size)
+                for column, field in PUBLIC_METRICS.items()
+            }
+        )
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "TweetBatch":
+        """
+        Batch of tweet dicts: stored documents or fetched tweets in the document shape.
+        Sentiment scored with the current SENTIMENT_VERSION is kept.
+        """
+        size = len(records)
+        metrics = [record.get("public_metrics") or {} for record in records]
+
+        def engagement(column: str) -> np.ndarray:
+            field = PUBLIC_METRICS[column]
+            return np.fromiter(
+                (int(record.get(column, m.get(field, 0)) or 0) for record, m in zip(records, metrics)),
+                dtype=np.int64, count=size
+            )
+
+        scores = np.full((size, len(SCORE_NAMES)), np.nan)
+        cleaned_text: List[Optional[str]] = [None] * size
+        for i, record in enumerate(records):
+            if has_current_sentiment(record):
+                cleaned_text[i] = record["cleaned_text"]
+                stored = record.get("sentiment_scores") or {}
+                scores[i] = [stored.get(name, np.nan) for name in SCORE_NAMES[:3]] + [record["sentiment"]]
+
+        return cls(
+            tweet_id=np.fromiter((int(record.get("tweet_id", 0)) for record in records), dtype=np.int64, count=size),
+            text=[(record.get("text") or "").strip() for record in records],
+            author_id=[record.get("author_id", "unknown") for record in records],
+            author_name=[record.get("author_name", "Unknown") for record in records],
+            author_photo=[record.get("author_photo", "") for record in records],
+            created_at=np.array([_parse_created_at(record.get("created_at")) for record in records], dtype="datetime64[us]"),
+            engagement={column: engagement(column) for column in PUBLIC_METRICS},
+            cleaned_text=cleaned_text,
+            scores=scores
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable["TweetBatch"]) -> "TweetBatch":
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        return cls(
+            tweet_id=np.concatenate([batch.tweet_id for batch in batches]),
+            text=[value for batch in batches for value in batch.text],
+            author_id=[value for batch in batches for value in batch.author_id],
+            author_name=[value for batch in batches for value in batch.author_name],
+            author_photo=[value for batch in batches for value in batch.author_photo],
+            created_at=np.concatenate([batch.created_at for batch in batches]),
+            engagement={column: np.concatenate([getattr(batch, column) for batch in batches]) for column in PUBLIC_METRICS},
+            cleaned_text=[value for batch in batches for value in batch.cleaned_text],
+            scores=np.concatenate([batch.scores for batch in batches])
+        )
+
+    def score(self, sia=None) -> "TweetBatch":
+        """Clean and score, in place, the tweets without current sentiment. Returns the batch."""
+        rows = np.flatnonzero(np.isnan(self.sentiment))
+        if not len(rows):
+            return self
+
+        # Each distinct text is cleaned and scored once per batch
+        distinct: Dict[str, int] = {}
+        positions = np.fromiter((distinct.setdefault(self.text[i], len(distinct)) for i in rows), dtype=np.intp, count=len(rows))
+        cleaned = [clean_text(text) for text in distinct]
+        table = np.array([[score[name] for name in SCORE_NAMES] for score in (score_text(text, sia=sia) for text in cleaned)])
+
+        self.scores[rows] = table[positions]
+        for i, position in zip(rows.tolist(), positions.tolist()):
+            self.cleaned_text[i] = cleaned[position]
+        return self
+
+    def newest_first(self) -> np.ndarray:
+        """Row order by creation time, newest first (stable)."""
+        return np.argsort(-self.created_at.astype(np.int64), kind="stable")
+
+    def documents(self, search: str, stored_at: datetime, order: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        MongoDB documents of a scored batch, in `order` (row order by default).
+
+        Same shape as the stored tweets: engagement both in `public_metrics` and as
+        likes/retweets/replies, the sentiment fields, and the search terms as a list.
+        """
+        rows = range(len(self)) if order is None else order.tolist()
+        tweet_ids = self.tweet_id.tolist()
+        created_at = self.created_at.tolist()
+        engagement = {column: getattr(self, column).tolist() for column in PUBLIC_METRICS}
+        scores = self.scores.tolist()
+
+        documents = []
+        for i in rows:
+            neg, neu, pos, compound = scores[i]
+            documents.append({
+                "tweet_id": tweet_ids[i],
+                "text": self.text[i],
+                "author_id": self.author_id[i],
+                "author_name": self.author_name[i],
+                "author_photo": self.author_photo[i],
+                "created_at": created_at[i],
+                "public_metrics": {field: engagement[column][i] for column, field in PUBLIC_METRICS.items()},
+                "likes": engagement["likes"][i],
+                "retweets": engagement["retweets"][i],
+                "replies": engagement["replies"][i],
+                "stored_at": stored_at,
+                "source": "twitter_api",
+                "search": [search],
+                "processed": True,
+                "cleaned_text": self.cleaned_text[i],
+                "sentiment": compound,
+                "sentiment_scores": {"neg": neg, "neu": neu, "pos": pos, "compound": compound},
+                "sentiment_version": SENTIMENT_VERSION,
+            })
+        return documents
+
+    def to_frame(self) -> pd.DataFrame:
+        """Columns used by the pandas analytics, without copying the numeric arrays."""
+        return pd.DataFrame({
+            "timestamp": self.created_at,
+            "text": self.text,
+            "sentiment": self.sentiment,
+            "likes": self.likes,
+            "retweets": self.retweets,
+            "replies": self.replies,
+            "shares": self.quotes,
+        }, copy=False)
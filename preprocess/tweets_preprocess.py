@@ -1,10 +1,27 @@
-from typing import Any, Dict, List
-import nltk
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+import hashlib
+import importlib.util
+import os
 import re
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import threading
 from datetime import datetime
 
-nltk.download('vader_lexicon')
+from utils.instrumentation import instrumented
+
+if TYPE_CHECKING:
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+# Bump when the lexicon or the scoring changes so stored scores get recomputed
+SENTIMENT_VERSION = 1
+
+SENTIMENT_MEMO_SIZE = 10000
+
+_analyzer: Optional["SentimentIntensityAnalyzer"] = None
+_analyzer_lock = threading.Lock()
+_sentiment_memo: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+_memo_lock = threading.Lock()
 
 def clean_text(text: str) -> str:
     """Remove mentions, hashtags, and URLs from text."""
@@ -14,13 +31,173 @@ def clean_text(text: str) -> str:
     text = re.sub(r"http\S+", "", text)    # Remove URLs
     return text.strip()
 
-def process_tweet(raw_tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def find_vader_lexicon() -> str:
+    """
+    Locate the VADER lexicon without touching the network when possible.
+
+    Looked up in order:
+    1. VADER_LEXICON_PATH (a vader_lexicon.txt file)
+    2. the NLTK data directories (NLTK_DATA, ~/nltk_data, ...)
+    3. the lexicon shipped with the `vaderSentiment` package, if installed
+    4. a one-time `nltk.download`, unless NLTK_AUTO_DOWNLOAD=false
+
+    Returns:
+    - An NLTK resource name, or the absolute path of a vader_lexicon.txt file
+    """
+    import nltk
+
+    path = os.getenv("VADER_LEXICON_PATH")
+    if path:
+        if not os.path.isfile(path):
+            raise LookupError(f"VADER_LEXICON_PATH does not exist: {path}")
+        return os.path.abspath(path)
+
+    resource = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+    try:
+        nltk.data.find(resource)
+        return resource
+    except LookupError:
+        pass
+
+    spec = importlib.util.find_spec("vaderSentiment")
+    if spec is not None and spec.origin:
+        vendored = os.path.join(os.path.dirname(spec.origin), "vader_lexicon.txt")
+        if os.path.isfile(vendored):
+            return vendored
+
+    if os.getenv("NLTK_AUTO_DOWNLOAD", "true").lower() == "true" and nltk.download("vader_lexicon", quiet=True):
+        return resource
+
+    raise LookupError(
+        "VADER lexicon not found. Set VADER_LEXICON_PATH, run `python -m nltk.downloader vader_lexicon` "
+        "or install vaderSentiment"
+    )
+
+def _load_analyzer(lexicon: str) -> "SentimentIntensityAnalyzer":
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+    if os.path.isabs(lexicon):
+        # nltk.data.load only opens files under the NLTK data directories: the directory
+        # of the lexicon file becomes the first of them and the file is loaded by name
+        directory, lexicon = os.path.split(lexicon)
+        if directory not in nltk.data.path:
+            nltk.data.path.insert(0, directory)
+
+    return SentimentIntensityAnalyzer(lexicon_file=lexicon)
+
+def get_sentiment_analyzer() -> "SentimentIntensityAnalyzer":
+    """Process-wide VADER analyzer, created on first use."""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = _load_analyzer(find_vader_lexicon())
+    return _analyzer
+
+def sentiment_ready() -> bool:
+    """Whether the process-wide analyzer is already loaded."""
+    return _analyzer is not None
+
+def score_text(cleaned_text: str, sia: Optional["SentimentIntensityAnalyzer"] = None) -> Dict[str, float]:
+    """
+    VADER scores (neg, neu, pos, compound) of an already cleaned text.
+
+    Results are memoized by text hash, so repeated texts are only scored once.
+    """
+    key = hashlib.sha1(cleaned_text.encode("utf-8")).hexdigest()
+    with _memo_lock:
+        scores = _sentiment_memo.get(key)
+        if scores is not None:
+            _sentiment_memo.move_to_end(key)
+            return scores
+
+    scores = (sia or get_sentiment_analyzer()).polarity_scores(cleaned_text)
+
+    with _memo_lock:
+        _sentiment_memo[key] = scores
+        if len(_sentiment_memo) > SENTIMENT_MEMO_SIZE:
+            _sentiment_memo.popitem(last=False)
+    return scores
+
+def has_current_sentiment(tweet: Dict[str, Any]) -> bool:
+    """Whether a tweet carries sentiment scored with the current SENTIMENT_VERSION."""
+    return tweet.get("sentiment_version") == SENTIMENT_VERSION and "sentiment" in tweet and "cleaned_text" in tweet
+
+def score_tweet(tweet: Dict[str, Any], sia: Optional["SentimentIntensityAnalyzer"] = None) -> Dict[str, Any]:
+    """
+    Sentiment fields to persist on a tweet document at ingest.
+
+    Returns:
+    - "cleaned_text", "sentiment" (compound), "sentiment_scores" (neg/neu/pos/compound)
+      and "sentiment_version"
+    """
+    cleaned = clean_text(tweet.get("text", "").strip())
+    scores = score_text(cleaned, sia=sia)
+    return {
+        "cleaned_text": cleaned,
+        "sentiment": scores["compound"],
+        "sentiment_scores": dict(scores),
+        "sentiment_version": SENTIMENT_VERSION,
+    }
+
+def _init_scoring_worker() -> None:
+    """ProcessPoolExecutor initializer: one analyzer per worker for its whole lifetime."""
+    get_sentiment_analyzer()
+
+def _score_chunk(texts: Sequence[str]) -> List[Dict[str, Any]]:
+    return [score_tweet({"text": text or ""}) for text in texts]
+
+def sentiment_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Process pool whose workers each keep one VADER analyzer."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_scoring_worker)
+
+def score_texts(
+    texts: Sequence[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 500,
+    executor: Optional[Executor] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score many raw texts, splitting them into chunks across a process pool.
+
+    Parameters:
+    - texts: Raw tweet texts (cleaned before scoring)
+    - workers: Pool size when no executor is given (1 scores in the current process)
+    - chunk_size: Texts sent to a worker at a time
+    - executor: Existing pool to reuse across calls, e.g. from `sentiment_pool`
+
+    Returns:
+    - The `score_tweet` fields of each text, in input order
+    """
+    if not texts:
+        return []
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+    if executor is None and (workers == 1 or len(chunks) == 1):
+        return _score_chunk(texts)
+
+    if executor is not None:
+        results = executor.map(_score_chunk, chunks)
+        return [scores for chunk in results for scores in chunk]
+
+    with sentiment_pool(workers) as pool:
+        results = pool.map(_score_chunk, chunks)
+        return [scores for chunk in results for scores in chunk]
+
+@instrumented("feelings")
+def process_tweet(raw_tweets: List[Dict[str, Any]], sia: Optional["SentimentIntensityAnalyzer"] = None) -> List[Dict[str, Any]]:
     """
     Processes a list of raw tweets, cleaning the text, classifying the sentiment,
     and preserving important metadata.
 
     Parameters:
     - raw_tweets: List of dictionaries with at least the keys "text" and "created_at"
+    - sia: Optional analyzer (the process-wide one is used otherwise)
+
+    Tweets already scored at ingest with the current SENTIMENT_VERSION keep their stored
+    scores; the others are scored now.
 
     Returns:
     - A list of dictionaries with:
@@ -28,18 +205,24 @@ def process_tweet(raw_tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
       - "author_id", "author_name", "author_photo"
       - "likes", "retweets", "replies", "shares"
     """
-    sia = SentimentIntensityAnalyzer()
     processed_tweets = []
 
     for tweet in raw_tweets:
         text = tweet.get("text", "").strip()
-        cleaned_tweet = clean_text(text)
-        sentiment = sia.polarity_scores(cleaned_tweet)["compound"]
+        if has_current_sentiment(tweet):
+            cleaned_tweet = tweet["cleaned_text"]
+            sentiment = tweet["sentiment"]
+        else:
+            cleaned_tweet = clean_text(text)
+            sentiment = score_text(cleaned_tweet, sia=sia)["compound"]
 
         # Ensure valid timestamps
         created_at = tweet.get("created_at")
         timestamp = None
-        if isinstance(created_at, str):
+        if isinstance(created_at, datetime):
+            # Stored tweets carry datetimes since serialization moved to the JSON provider
+            timestamp = created_at
+        elif isinstance(created_at, str):
             try:
                 timestamp = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
             except ValueError:
@@ -0,0 +1,36 @@
+from flask import Blueprint, Response, abort
+
+from config.clients import registry
+from config.warmup import readiness_checks
+from utils import instrumentation
+from utils.response_http_util import standard_response
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/health', methods=['GET'])
+def health():
+    """
+    Liveness: the process is up and serving requests. Touches no dependency.
+
+    Also reports the worker pid and how many times each client was built in it, to check
+    that clients are reused across requests.
+    """
+    return standard_response(True, "OK", 200, registry.stats())
+
+@health_bp.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: MongoDB is reachable, the tweets can be written and the sentiment lexicon is loaded."""
+    checks = readiness_checks()
+    if all(check["ok"] for check in checks.values()):
+        return standard_response(True, "Ready", 200, checks)
+    return standard_response(False, "Not ready", 503, checks)
+
+@health_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Stage latency histograms and pipeline counters of the worker that answered, in the
+    Prometheus text format. Not found unless INSTRUMENTATION_ENABLED.
+    """
+    if not instrumentation.registry.enabled:
+        abort(404)
+    return Response(instrumentation.registry.render(), content_type=instrumentation.PROMETHEUS_CONTENT_TYPE)
@@ -1,7 +1,11 @@
-from flask import Blueprint, request
+
+from flask import Blueprint, Response, current_app, request, stream_with_context
 from preprocess.tweets_preprocess import process_tweet
+from services.tweets_cache import normalize_search
 from utils.error_handler import handle_exceptions
-from utils.params import get_query_params
+from utils.http_cache import conditional_response, response_cache
+from utils.pagination import decode_cursor
+from utils.params import get_query_params, get_pagination_params, get_batch_params
 
 from utils.response_http_util import standard_response
 from services.tweets_service import TweetService
@@ -12,16 +16,52 @@ tweet_service = TweetService()
 @tweets_bp.route('/fetch_tweets', methods=['GET'])
 @handle_exceptions
 def fetch_tweets():
-    """Fetch tweets and return them as a JSON response"""
+    """
+    Fetch tweets and return them as a JSON response.
+
+    Optional query params:
+    - limit / after: keyset pagination over (created_at, _id), newest first.
+    - format=ndjson: stream every cached tweet as newline-delimited JSON.
+
+    Responses carry an ETag and honor If-None-Match / If-Modified-Since (304).
+    """
     force_refresh, search = get_query_params()
     if search is None:
         return search
 
-    tweets = tweet_service.get_tweets(force_refresh=force_refresh, search=search)
-    if not tweets:
-        return standard_response(False, "No tweets available", 404)
+    limit, after, stream = get_pagination_params(current_app.config.get("TWEETS_PAGE_MAX_LIMIT", 500))
+    cursor = decode_cursor(after) if after else None
+
+    # Synchronizes (and refreshes) the cache, so the builders below only read it
+    version, last_modified = tweet_service.data_version(search, force_refresh)
+    variant = f"{normalize_search(search)}|{limit}|{after}|{stream}"
+
+    if stream:
+        def build_stream():
+            batch_size = current_app.config.get("TWEETS_STREAM_BATCH_SIZE", 500)
+            tweets = tweet_service.iter_tweets(search=search, batch_size=batch_size)
+            dumps = current_app.json.dumps
+            lines = (dumps(tweet) + "\n" for tweet in tweets)
+            return Response(stream_with_context(lines), mimetype="application/x-ndjson"), 200
+
+        return conditional_response("fetch_tweets", version, last_modified, build_stream, variant, store=False)
+
+    if limit is not None:
+        def build_page():
+            tweets, next_cursor = tweet_service.get_tweets_page(search=search, limit=limit, after=cursor)
+            if not tweets and cursor is None:
+                return standard_response(False, "No tweets available", 404)
+            return standard_response(True, "Tweets retrieved", 200, {"tweets": tweets, "next": next_cursor})
+
+        return conditional_response("fetch_tweets", version, last_modified, build_page, variant)
+
+    def build():
+        tweets = tweet_service.get_tweets(search=search)
+        if not tweets:
+            return standard_response(False, "No tweets available", 404)
+        return standard_response(True, "Tweets retrieved", 200, tweets)
 
-    return standard_response(True, "Tweets retrieved", 200, tweets)
+    return conditional_response("fetch_tweets", version, last_modified, build, variant)
 
 @tweets_bp.route('/feelings', methods=['GET'])
 @handle_exceptions
@@ -31,12 +71,17 @@ def get_feelings():
     if search is None:
         return search
 
-    tweets = tweet_service.get_tweets(force_refresh=force_refresh, search=search)
-    if not tweets:
-        return standard_response(False, "No tweets available", 404)
+    version, last_modified = tweet_service.data_version(search, force_refresh)
 
-    feelings = process_tweet(tweets)
-    return standard_response(True, "Feelings retrieved", 200, feelings)
+    def build():
+        tweets = tweet_service.get_tweets(search=search)
+        if not tweets:
+            return standard_response(False, "No tweets available", 404)
+
+        feelings = process_tweet(tweets)
+        return standard_response(True, "Feelings retrieved", 200, feelings)
+
+    return conditional_response("feelings", version, last_modified, build, normalize_search(search))
 
 @tweets_bp.route('/hourly_metrics', methods=['GET'])
 @handle_exceptions
@@ -46,8 +91,30 @@ def hourly_metrics():
     if search is None:
         return search
 
-    metrics = tweet_service.process_hourly_metrics(force_refresh=force_refresh, search=search)
-    if not metrics:
-        return standard_response(False, "No tweets available", 404)
+    version, last_modified = tweet_service.data_version(search, force_refresh)
+
+    def build():
+        metrics = tweet_service.process_hourly_metrics(search=search)
+        if not metrics:
+            return standard_response(False, "No tweets available", 404)
+        return standard_response(True, "Hourly metrics retrieved", 200, metrics)
 
-    return standard_response(True, "Hourly metrics retrieved", 200, metrics)
+    return conditional_response("hourly_metrics", version, last_modified, build, normalize_search(search))
+
+@tweets_bp.route('/batch_metrics', methods=['POST'])
+@handle_exceptions
+def batch_metrics():
+    """Process hourly metrics for many search terms in one request"""
+    force_refresh, searches = get_batch_params(current_app.config.get("BATCH_MAX_TERMS", 20))
+
+    batch = tweet_service.process_batch_metrics(searches=searches, force_refresh=force_refresh)
+    if not batch["results"]:
+        return standard_response(False, "No tweets available", 404, batch)
+
+    return standard_response(True, "Batch metrics retrieved", 200, batch)
+
+@tweets_bp.route('/stats', methods=['GET'])
+@handle_exceptions
+def stats():
+    """Cache, request coalescing and response cache counters of this worker"""
+    return standard_response(True, "Stats retrieved", 200, {**tweet_service.stats(), "responses": response_cache.stats()})
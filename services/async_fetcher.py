@@ -0,0 +1,139 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import tweepy
+
+from config.x_connect import get_async_twitter_client
+from services.rate_limiter import RateLimiter, RateLimitExceeded, SEARCH_RECENT_ENDPOINT
+from preprocess.tweet_batch import TweetBatch
+from services.tweets_parser import build_search_query, build_users_map, search_tweet_params
+from utils.instrumentation import RATE_LIMIT_HITS, TWEETS_FETCHED, TWITTER_API_CALLS, instrumented
+from utils.logger import handle_logger
+
+
+class AsyncTweetFetcher:
+    """
+    Fetch many search terms concurrently with tweepy's asyncio client.
+
+    Pages of one term are requested in order (each needs the previous `next_token`), while
+    different terms run concurrently with at most `max_concurrency` API calls in flight.
+    A term without watermark reads `max_pages` pages; one with a watermark follows
+    `next_token` down to it, up to `incremental_max_pages` pages. Tweets come back as a
+    `TweetBatch` per term, like `TweetService._fetch_from_twitter`.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_concurrency: int = 5,
+        max_pages: int = 1,
+        incremental_max_pages: int = 10,
+        client_factory: Optional[Callable] = None
+    ):
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pages = max(1, max_pages)
+        self.incremental_max_pages = max(1, incremental_max_pages)
+        self.client_factory = client_factory or get_async_twitter_client
+
+    def fetch_many(self, since_ids: Dict[str, Optional[int]]) -> Dict[str, Union[Tuple[TweetBatch, bool], Exception]]:
+        """
+        Fetch every search term of `since_ids` (term -> watermark or None).
+
+        Returns the fetched tweets and whether every tweet newer than the watermark was
+        read, or the error, per search term.
+        """
+        if not since_ids:
+            return {}
+        return asyncio.run(self.fetch_many_async(since_ids))
+
+    async def fetch_many_async(
+        self, since_ids: Dict[str, Optional[int]]
+    ) -> Dict[str, Union[Tuple[TweetBatch, bool], Exception]]:
+        import aiohttp
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self.client_factory(on_rate_limit=self._on_rate_limit)
+        searches = list(since_ids)
+
+        # One keep-alive session for the whole batch instead of one per request
+        async with aiohttp.ClientSession() as session:
+            client.session = session
+            results = await asyncio.gather(
+                *(self._fetch_term(client, semaphore, search, since_ids[search]) for search in searches),
+                return_exceptions=True
+            )
+
+        return dict(zip(searches, results))
+
+    @instrumented("fetch")
+    async def _fetch_term(
+        self, client, semaphore: asyncio.Semaphore, search: str, since_id: Optional[int]
+    ) -> Tuple[TweetBatch, bool]:
+        batches: List[TweetBatch] = []
+        next_token = None
+        pages = 0
+
+        while pages < (self.max_pages if since_id is None else self.incremental_max_pages):
+            allowed, retry_at = await self._acquire()
+            if not allowed:
+                RATE_LIMIT_HITS.inc(reason="budget")
+                if batches:
+                    break
+                raise RateLimitExceeded(SEARCH_RECENT_ENDPOINT, retry_at)
+
+            try:
+                async with semaphore:
+                    TWITTER_API_CALLS.inc(client="async")
+                    response = await client.search_recent_tweets(
+                        query=build_search_query(search),
+                        next_token=next_token,
+                        since_id=since_id,
+                        **search_tweet_params(since_id)
+                    )
+            except tweepy.TooManyRequests as e:
+                RATE_LIMIT_HITS.inc(reason="too_many_requests")
+                retry_at = await self._register_too_many_requests(e)
+                if batches:
+                    break
+                raise RateLimitExceeded(SEARCH_RECENT_ENDPOINT, retry_at) from e
+            except tweepy.BadRequest as e:
+                if since_id is None:
+                    handle_logger(message=f"Twitter API error for '{search}': {str(e)}", type_logger="error")
+                    raise
+                # The watermark fell out of the recent search window: fetch without it
+                handle_logger(message=f"since_id {since_id} rejected, fetching without it: {str(e)}", type_logger="warning")
+                since_id = None
+                next_token = None
+                continue
+
+            if not response.data:
+                break
+
+            users_map = build_users_map(response)
+            batches.append(TweetBatch.from_tweepy(response.data, users_map))
+            TWEETS_FETCHED.inc(len(response.data))
+
+            next_token = response.meta.get("next_token")
+            if not next_token:
+                break
+            pages += 1
+
+        return TweetBatch.concat(batches), since_id is None or not next_token
+
+    async def _acquire(self):
+        if self.rate_limiter is None:
+            return True, None
+        return await asyncio.to_thread(self.rate_limiter.acquire, SEARCH_RECENT_ENDPOINT)
+
+    async def _on_rate_limit(self, headers) -> None:
+        if self.rate_limiter is not None and headers:
+            await asyncio.to_thread(self.rate_limiter.update_from_headers, SEARCH_RECENT_ENDPOINT, headers)
+
+    async def _register_too_many_requests(self, error: tweepy.TooManyRequests):
+        retry_after = int(error.response.headers.get("Retry-After", 60))
+        if self.rate_limiter is None:
+            return None
+        return await asyncio.to_thread(
+            self.rate_limiter.register_too_many_requests, SEARCH_RECENT_ENDPOINT, None, retry_after
+        )
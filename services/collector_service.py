@@ -0,0 +1,83 @@
+import threading
+from datetime import datetime
+from typing import Optional
+
+from services.rate_limiter import RateLimitExceeded
+from services.search_registry import SearchRegistry
+from services.tweets_service import TweetService
+from utils.logger import handle_logger
+
+
+class TweetCollector:
+    """
+    Polls the tracked search terms on their own intervals and ingests new tweets
+    through `TweetService`, outside of the HTTP request path. With `concurrent`, due
+    terms are fetched together through the asyncio client.
+
+    Must run inside a Flask app context with `g.mongo_db` and `g.twitter_client` set.
+    """
+
+    def __init__(self, tweet_service: TweetService, registry: SearchRegistry, poll_seconds: int = 5, concurrent: bool = False):
+        self.tweet_service = tweet_service
+        self.registry = registry
+        self.poll_seconds = poll_seconds
+        self.concurrent = concurrent
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self) -> int:
+        """Collect every due search term once. Returns the number of terms processed."""
+        due = self.registry.due()
+        if not due or self._stop.is_set():
+            return 0
+
+        if self.concurrent and len(due) > 1:
+            results = self.tweet_service.collect_many([entry["search"] for entry in due])
+        else:
+            results = {entry["search"]: self._collect(entry["search"]) for entry in due}
+
+        for entry in due:
+            search = entry["search"]
+            interval = entry["interval"]
+            error = None
+            result = results.get(search)
+
+            if isinstance(result, RateLimitExceeded):
+                # Come back once the shared budget is refilled
+                error = str(result)
+                interval = max(interval, result.retry_after)
+                handle_logger(message=f"⚠️ Collection postponed for '{search}': {error}", type_logger="warning")
+            elif isinstance(result, ValueError):
+                handle_logger(message=f"No tweets collected for '{search}': {str(result)}", type_logger="info")
+            elif isinstance(result, Exception):
+                error = str(result)
+                handle_logger(message=f"❌ Collection failed for '{search}': {error}", type_logger="error")
+            else:
+                handle_logger(message=f"📡 Collected {len(result or [])} tweets for '{search}'", type_logger="info")
+
+            self.registry.reschedule(search, interval, error=error)
+
+        return len(due)
+
+    def _collect(self, search: str):
+        try:
+            return self.tweet_service.collect(search)
+        except Exception as e:
+            return e
+
+    def run_forever(self) -> None:
+        """Run the scheduler until `stop` is called."""
+        handle_logger(message="🚀 Tweet collector started", type_logger="info")
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self._seconds_until_next_run())
+        handle_logger(message="🛑 Tweet collector stopped", type_logger="info")
+
+    def _seconds_until_next_run(self) -> float:
+        next_run_at: Optional[datetime] = self.registry.next_run_at()
+        if next_run_at is None:
+            return self.poll_seconds
+        wait = (next_run_at - datetime.utcnow()).total_seconds()
+        return min(max(wait, 0), self.poll_seconds)
@@ -0,0 +1,206 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+ROLLUP_SUM_FIELDS = {
+    "sentiment_sum": "sentiment",
+    "likes_sum": "likes",
+    "retweets_sum": "retweets",
+    "replies_sum": "replies",
+}
+
+GRANULARITIES = ("hour", "minute")
+
+
+class MetricsRollup:
+    """
+    Time-bucket rollups of tweet metrics in the ``tweets_metrics`` collection.
+
+    Each bucket is keyed by (search, date, hour), plus minute with minute granularity, and
+    holds the tweet count and the sums of sentiment, likes, retweets and replies. Ingest
+    adds new tweets with `$inc`, and means and hype scores are derived at read time, so
+    reads cost O(buckets) instead of O(tweets).
+    """
+
+    def __init__(self, collection: Collection, granularity: str = "hour"):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+        self.collection = collection
+        self.granularity = granularity
+
+    def _bucket_key(self, search: str, created_at: datetime) -> Dict[str, Any]:
+        key = {"search": search, "date": created_at.strftime("%Y-%m-%d"), "hour": created_at.hour}
+        if self.granularity == "minute":
+            key["minute"] = created_at.minute
+        return key
+
+    def ingest(
+        self,
+        search: str,
+        tweets: Iterable[Dict[str, Any]],
+        engagement_deltas: Iterable[Dict[str, Any]] = ()
+    ) -> int:
+        """
+        Add newly stored tweets to their buckets with one bulk `$inc`.
+
+        Tweets must be ingested only once (i.e. only the ones new to the search, as
+        reported by `TweetWriter.upsert`), since rollups are not idempotent. `engagement_deltas` holds the likes/retweets/replies
+        change of tweets already counted, which is added to the sums without counting them
+        again. Returns the number of buckets touched.
+        """
+        buckets: Dict[tuple, Dict[str, Any]] = {}
+
+        def bucket_for(created_at: datetime) -> Dict[str, Any]:
+            key = self._bucket_key(search, created_at)
+            return buckets.setdefault(tuple(key.values()), {"key": key, "tweet_count": 0, **{f: 0.0 for f in ROLLUP_SUM_FIELDS}})
+
+        for tweet in tweets:
+            created_at = tweet.get("created_at")
+            if not isinstance(created_at, datetime):
+                continue
+
+            bucket = bucket_for(created_at)
+            bucket["tweet_count"] += 1
+            for sum_field, field in ROLLUP_SUM_FIELDS.items():
+                bucket[sum_field] += float(tweet.get(field) or 0)
+
+        for delta in engagement_deltas:
+            created_at = delta.get("created_at")
+            if not isinstance(created_at, datetime) or not any(delta.get(f) for f in ("likes", "retweets", "replies")):
+                continue
+
+            bucket = bucket_for(created_at)
+            for sum_field, field in ROLLUP_SUM_FIELDS.items():
+                if field != "sentiment":
+                    bucket[sum_field] += float(delta.get(field) or 0)
+
+        if not buckets:
+            return 0
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                bucket["key"],
+                {
+                    "$inc": {"tweet_count": bucket["tweet_count"], **{f: bucket[f] for f in ROLLUP_SUM_FIELDS}},
+                    "$set": {"updated_at": now}
+                },
+                upsert=True
+            )
+            for bucket in buckets.values()
+        ]
+        self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def window_start(self, since: datetime) -> datetime:
+        """Start of the bucket holding `since`: windows start there, so every engine counts the same tweets."""
+        since = since.replace(second=0, microsecond=0)
+        return since if self.granularity == "minute" else since.replace(minute=0)
+
+    def _query(self, search: str, since: Optional[datetime] = None) -> Dict[str, Any]:
+        """Buckets of a search term, from the one holding `since` on."""
+        query: Dict[str, Any] = {"search": search, "date": {"$exists": True}}
+        if since is None:
+            return query
+
+        date = since.strftime("%Y-%m-%d")
+        first_bucket: Dict[str, Any] = {"date": date, "hour": since.hour}
+        if self.granularity == "minute":
+            first_bucket["minute"] = {"$gte": since.minute}
+        query["$or"] = [{"date": {"$gt": date}}, {"date": date, "hour": {"$gt": since.hour}}, first_bucket]
+        return query
+
+    def hourly(self, search: str, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Hourly metrics of a search term (hour of day, across every stored date), from the
+        bucket holding `since` on (see `window_start`).
+
+        Returns:
+        - Records with "hour", "sentiment_mean", "tweet_count", "likes_mean",
+          "retweets_mean" and "replies_mean", sorted by hour
+        """
+        match = self._query(search, since)
+
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": "$hour",
+                "tweet_count": {"$sum": "$tweet_count"},
+                **{f: {"$sum": f"${f}"} for f in ROLLUP_SUM_FIELDS}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        return [self._derive(bucket, hour=bucket["_id"]) for bucket in self.collection.aggregate(pipeline)]
+
+    def buckets(self, search: str, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Every bucket of a search term with its derived metrics, oldest first."""
+        query = self._query(search, since)
+
+        sort = [("date", 1), ("hour", 1)] + ([("minute", 1)] if self.granularity == "minute" else [])
+        return [
+            self._derive(bucket, date=bucket["date"], hour=bucket["hour"], minute=bucket.get("minute"))
+            for bucket in self.collection.find(query, {"_id": 0}).sort(sort)
+        ]
+
+    @staticmethod
+    def _derive(bucket: Dict[str, Any], **key) -> Dict[str, Any]:
+        count = bucket.get("tweet_count", 0) or 0
+        record = {k: v for k, v in key.items() if v is not None}
+        record.update({
+            "sentiment_mean": bucket.get("sentiment_sum", 0) / count if count else 0.0,
+            "tweet_count": int(count),
+            "likes_mean": bucket.get("likes_sum", 0) / count if count else 0.0,
+            "retweets_mean": bucket.get("retweets_sum", 0) / count if count else 0.0,
+            "replies_mean": bucket.get("replies_sum", 0) / count if count else 0.0,
+        })
+        return record
+
+    def rebuild(self, tweets_collection: Collection, search: Optional[str] = None) -> int:
+        """
+        Recompute rollups from the raw tweets, for one search term or for all of them.
+
+        Returns the number of buckets written.
+        """
+        bucket_filter: Dict[str, Any] = {"date": {"$exists": True}}
+        tweet_filter: Dict[str, Any] = {"search": {"$exists": True}, "created_at": {"$type": "date"}}
+        if search is not None:
+            bucket_filter["search"] = search
+            tweet_filter["search"] = search
+
+        group_id = {
+            "search": "$search",
+            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "hour": {"$hour": "$created_at"},
+        }
+        if self.granularity == "minute":
+            group_id["minute"] = {"$minute": "$created_at"}
+
+        pipeline = [
+            {"$match": tweet_filter},
+            # A tweet found by several search terms counts once in each of them
+            {"$unwind": "$search"},
+            {"$match": {"search": search} if search is not None else {}},
+            {"$group": {
+                "_id": group_id,
+                "tweet_count": {"$sum": 1},
+                **{sum_field: {"$sum": {"$ifNull": [f"${field}", 0]}} for sum_field, field in ROLLUP_SUM_FIELDS.items()}
+            }}
+        ]
+
+        self.collection.delete_many(bucket_filter)
+
+        now = datetime.utcnow()
+        documents = []
+        written = 0
+        for bucket in tweets_collection.aggregate(pipeline, allowDiskUse=True):
+            documents.append({**bucket.pop("_id"), **bucket, "updated_at": now})
+            if len(documents) >= 1000:
+                self.collection.insert_many(documents, ordered=False)
+                written += len(documents)
+                documents = []
+        if documents:
+            self.collection.insert_many(documents, ordered=False)
+            written += len(documents)
+        return written
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from typing import Mapping, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+
+SEARCH_RECENT_ENDPOINT = "search_recent_tweets"
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised instead of sleeping when the shared Twitter API budget is exhausted."""
+
+    def __init__(self, endpoint: str, retry_at: Optional[datetime]):
+        self.endpoint = endpoint
+        self.retry_at = retry_at
+        super().__init__(f"Rate limit exhausted for {endpoint}, retry at {retry_at.isoformat() if retry_at else 'unknown'}")
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds until the budget is refilled."""
+        if self.retry_at is None:
+            return 0
+        return max(int((self.retry_at - datetime.utcnow()).total_seconds()) + 1, 0)
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every worker through the ``rate_limits`` collection.
+
+    Each endpoint has one document with the tokens left in the current window and the
+    time the window resets. Tokens are taken atomically before each API call, and the
+    bucket is re-synchronized with the `x-rate-limit-*` headers returned by the API.
+    """
+
+    def __init__(self, collection: Collection, limit: int = 450, window: int = 900):
+        self.collection = collection
+        self.limit = limit
+        self.window = window
+
+    def check(self, endpoint: str) -> Tuple[bool, Optional[datetime]]:
+        """
+        Tell whether a call may be made now, without taking a token.
+
+        Returns (True, None) when a token is available, otherwise (False, retry_at).
+        """
+        bucket = self.collection.find_one({"endpoint": endpoint}, {"_id": 0})
+        if bucket is None or bucket.get("remaining", 1) > 0:
+            return True, None
+        reset_at = bucket.get("reset_at")
+        if reset_at is None or reset_at <= datetime.utcnow():
+            return True, None
+        return False, reset_at
+
+    def acquire(self, endpoint: str) -> Tuple[bool, Optional[datetime]]:
+        """
+        Take a token for one API call. Never blocks.
+
+        Returns (True, None) when the call may proceed, otherwise (False, retry_at).
+        """
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"endpoint": endpoint},
+            {"$setOnInsert": {"remaining": self.limit, "limit": self.limit, "reset_at": now + timedelta(seconds=self.window)}},
+            upsert=True
+        )
+        # Refill the bucket once its window has passed, up to the limit last reported by the
+        # API (x-rate-limit-limit), which can differ from the configured one
+        expired = self.collection.find_one({"endpoint": endpoint, "reset_at": {"$lte": now}}, {"_id": 0, "limit": 1})
+        if expired is not None:
+            self.collection.update_one(
+                {"endpoint": endpoint, "reset_at": {"$lte": now}},
+                {"$set": {"remaining": expired.get("limit", self.limit), "reset_at": now + timedelta(seconds=self.window)}}
+            )
+
+        bucket = self.collection.find_one_and_update(
+            {"endpoint": endpoint, "remaining": {"$gt": 0}},
+            {"$inc": {"remaining": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if bucket is not None:
+            return True, None
+
+        bucket = self.collection.find_one({"endpoint": endpoint}, {"_id": 0, "reset_at": 1})
+        return False, bucket.get("reset_at") if bucket else None
+
+    def update_from_headers(self, endpoint: str, headers: Optional[Mapping[str, str]]) -> None:
+        """Synchronize the bucket with the API's own view of the remaining budget."""
+        if not headers or "x-rate-limit-remaining" not in headers:
+            return
+
+        try:
+            update = {"remaining": int(headers["x-rate-limit-remaining"])}
+            if "x-rate-limit-limit" in headers:
+                update["limit"] = int(headers["x-rate-limit-limit"])
+            if "x-rate-limit-reset" in headers:
+                update["reset_at"] = datetime.utcfromtimestamp(int(headers["x-rate-limit-reset"]))
+        except (TypeError, ValueError):
+            return
+
+        self.collection.update_one({"endpoint": endpoint}, {"$set": update}, upsert=True)
+
+    def exhaust(self, endpoint: str, retry_at: datetime) -> None:
+        """Mark the bucket as empty until `retry_at`, e.g. after a 429 without headers."""
+        self.collection.update_one(
+            {"endpoint": endpoint},
+            {"$set": {"remaining": 0, "reset_at": retry_at}},
+            upsert=True
+        )
+
+    def register_too_many_requests(self, endpoint: str, headers: Optional[Mapping[str, str]], retry_after: int = 60) -> datetime:
+        """Record a 429 response and return when calls may resume."""
+        self.update_from_headers(endpoint, headers)
+        allowed, retry_at = self.check(endpoint)
+        if allowed or retry_at is None:
+            retry_at = datetime.utcnow() + timedelta(seconds=retry_after)
+            self.exhaust(endpoint, retry_at)
+        return retry_at
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+
+from services.tweets_cache import normalize_search
+
+
+class SearchRegistry:
+    """
+    Registry of search terms tracked by the background collector.
+
+    Each term is a document in the ``tracked_searches`` collection with its own polling
+    interval and the time of its next scheduled run.
+    """
+
+    def __init__(self, collection: Collection):
+        self.collection = collection
+
+    def track(self, search: str, interval: int) -> Dict[str, Any]:
+        """Start tracking a search term (or update its interval). The term is due immediately."""
+        search = normalize_search(search)
+        if not search:
+            raise ValueError("Search term must not be empty")
+        if interval <= 0:
+            raise ValueError("Interval must be greater than zero")
+
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"search": search},
+            {
+                "$set": {"interval": int(interval), "enabled": True, "next_run_at": now},
+                "$setOnInsert": {"created_at": now, "last_run_at": None, "last_error": None}
+            },
+            upsert=True
+        )
+        return self.collection.find_one({"search": search}, {"_id": 0})
+
+    def track_if_missing(self, search: str, interval: int) -> None:
+        """Track a search term requested by a client, keeping its settings if already tracked."""
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"search": normalize_search(search)},
+            {"$setOnInsert": {
+                "interval": int(interval),
+                "enabled": True,
+                "next_run_at": now,
+                "created_at": now,
+                "last_run_at": None,
+                "last_error": None
+            }},
+            upsert=True
+        )
+
+    def untrack(self, search: str) -> bool:
+        """Stop tracking a search term. Returns False if it was not tracked."""
+        result = self.collection.update_one(
+            {"search": normalize_search(search)},
+            {"$set": {"enabled": False}}
+        )
+        return result.matched_count > 0
+
+    def list(self, include_disabled: bool = False) -> List[Dict[str, Any]]:
+        query = {} if include_disabled else {"enabled": True}
+        return list(self.collection.find(query, {"_id": 0}).sort("search", ASCENDING))
+
+    def due(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Tracked terms whose next run is due, oldest first."""
+        now = now or datetime.utcnow()
+        return list(
+            self.collection.find({"enabled": True, "next_run_at": {"$lte": now}}, {"_id": 0})
+            .sort("next_run_at", ASCENDING)
+        )
+
+    def next_run_at(self) -> Optional[datetime]:
+        """Earliest scheduled run among enabled terms."""
+        entry = self.collection.find_one(
+            {"enabled": True},
+            {"_id": 0, "next_run_at": 1},
+            sort=[("next_run_at", ASCENDING)]
+        )
+        return entry["next_run_at"] if entry else None
+
+    def reschedule(self, search: str, interval: int, error: Optional[str] = None) -> None:
+        """Record a run and schedule the next one `interval` seconds from now."""
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"search": search},
+            {"$set": {
+                "last_run_at": now,
+                "last_error": error,
+                "next_run_at": now + timedelta(seconds=interval)
+            }}
+        )
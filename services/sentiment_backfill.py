@@ -0,0 +1,62 @@
+from typing import Any, Dict, Optional, Set
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.collection import Collection
+
+from preprocess.tweets_preprocess import SENTIMENT_VERSION, score_texts, sentiment_pool
+from utils.logger import handle_logger
+
+
+def backfill_sentiment(
+    collection: Collection,
+    workers: Optional[int] = None,
+    batch_size: int = 5000,
+    chunk_size: int = 500,
+    rescore_all: bool = False
+) -> Dict[str, Any]:
+    """
+    Score stored tweets whose sentiment is missing or from an older SENTIMENT_VERSION.
+
+    Tweets are streamed from MongoDB in `_id` order, `batch_size` at a time, scored across
+    a process pool and written back with one bulk update per batch.
+
+    Returns:
+    - dict: "scanned" and "updated" counts, and "searches", the search terms of the
+      rescored tweets (their rollups hold the old sentiment sums)
+    """
+    query = {} if rescore_all else {"sentiment_version": {"$ne": SENTIMENT_VERSION}}
+    scanned = 0
+    updated = 0
+    searches: Set[str] = set()
+    last_id = None
+
+    with sentiment_pool(workers) as pool:
+        while True:
+            page_query = dict(query)
+            if last_id is not None:
+                page_query["_id"] = {"$gt": last_id}
+
+            batch = list(
+                collection.find(page_query, {"_id": 1, "text": 1, "search": 1})
+                .sort("_id", ASCENDING)
+                .limit(batch_size)
+            )
+            if not batch:
+                break
+
+            scores = score_texts([tweet.get("text", "") for tweet in batch], chunk_size=chunk_size, executor=pool)
+            operations = [
+                UpdateOne({"_id": tweet["_id"]}, {"$set": {**fields, "processed": True}})
+                for tweet, fields in zip(batch, scores)
+            ]
+            result = collection.bulk_write(operations, ordered=False)
+            for tweet in batch:
+                terms = tweet.get("search") or []
+                searches.update(terms if isinstance(terms, list) else [terms])
+
+            scanned += len(batch)
+            updated += result.modified_count
+            last_id = batch[-1]["_id"]
+            handle_logger(message=f"🔁 Sentiment backfill: {scanned} tweets scanned, {updated} updated", type_logger="info")
+
+    return {"scanned": scanned, "updated": updated, "searches": sorted(searches)}
@@ -0,0 +1,125 @@
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    In-process request coalescing.
+
+    The first caller of `do` for a key runs the function; callers arriving with the same
+    key while it runs wait for it and get the same result (or exception). Keys are tuples
+    whose first item names the operation, which is what the counters are grouped by.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._executed: Counter = Counter()
+        self._coalesced: Counter = Counter()
+        self._coalesced_remote: Counter = Counter()
+
+    def do(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._executed[key[0]] += 1
+            else:
+                self._coalesced[key[0]] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def record_remote(self, operation: str) -> None:
+        """Count a call that waited for another worker (see `RequestLease`) instead of running."""
+        with self._lock:
+            self._coalesced_remote[operation] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per operation: calls executed, calls coalesced in-process and across workers, and calls running now."""
+        with self._lock:
+            in_flight = Counter(key[0] for key in self._flights)
+            operations = set(self._executed) | set(self._coalesced) | set(self._coalesced_remote)
+            return {
+                operation: {
+                    "executed": self._executed[operation],
+                    "coalesced": self._coalesced[operation],
+                    "coalesced_remote": self._coalesced_remote[operation],
+                    "in_flight": in_flight[operation],
+                }
+                for operation in sorted(operations)
+            }
+
+
+class RequestLease:
+    """
+    Cross-worker coalescing through lease documents in the ``request_leases`` collection.
+
+    A worker holds the lease of a key while it does the work; the others wait until it is
+    released and then read the result from MongoDB. Leases expire after `ttl` seconds, so
+    a crashed worker never blocks a key for longer than that.
+    """
+
+    def __init__(self, collection: Collection, ttl: int = 30, poll_interval: float = 0.2):
+        self.collection = collection
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+
+    def acquire(self, key: str) -> Optional[str]:
+        """Take the lease of `key`. Returns the owner token, or None when another worker holds it."""
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        try:
+            lease = self.collection.find_one_and_update(
+                {"_id": key, "expires_at": {"$lte": now}},
+                {"$set": {"owner": token, "expires_at": now + timedelta(seconds=self.ttl)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The lease exists and has not expired: the upsert collided with it
+            return None
+        return token if lease and lease.get("owner") == token else None
+
+    def release(self, key: str, token: str) -> None:
+        self.collection.delete_one({"_id": key, "owner": token})
+
+    def wait(self, key: str, timeout: Optional[float] = None) -> bool:
+        """Wait until the lease of `key` is released or expires. Returns False on timeout."""
+        timeout = self.ttl if timeout is None else timeout
+        deadline = datetime.utcnow() + timedelta(seconds=timeout)
+        while datetime.utcnow() < deadline:
+            if not self.collection.count_documents({"_id": key, "expires_at": {"$gt": datetime.utcnow()}}, limit=1):
+                return True
+            time.sleep(self.poll_interval)
+        return False
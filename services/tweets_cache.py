@@ -0,0 +1,133 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+from utils.logger import handle_logger
+
+CACHE_FRESH = "fresh"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+
+
+def normalize_search(search: str) -> str:
+    """Normalize a search term so equivalent queries share the same cache entry."""
+    return " ".join((search or "").lower().split())
+
+
+class TweetCache:
+    """
+    Per-search cache bookkeeping for tweets stored in MongoDB.
+
+    Each search term has an entry in the ``tweets_cache`` collection with the time
+    of its last successful refresh. An entry is:
+    - fresh: younger than ``ttl`` seconds, served straight from MongoDB.
+    - stale: older than ``ttl`` but younger than ``ttl + stale_ttl``, served from
+      MongoDB while a refresh runs in the background.
+    - missing: never refreshed or too old, must be refreshed before returning.
+    """
+
+    def __init__(self, ttl: int = 300, stale_ttl: int = 900):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def configure(self, ttl: Optional[int] = None, stale_ttl: Optional[int] = None) -> None:
+        """Override the TTLs, usually from the Flask app config."""
+        if ttl is not None:
+            self.ttl = int(ttl)
+        if stale_ttl is not None:
+            self.stale_ttl = int(stale_ttl)
+
+    def lookup(self, cache_collection: Collection, search: str) -> str:
+        """Return the cache state (fresh, stale or miss) for a search term."""
+        try:
+            entry = cache_collection.find_one({"search": search}, {"_id": 0, "refreshed_at": 1})
+        except PyMongoError as e:
+            handle_logger(message=f"Cache check failed: {str(e)}", type_logger="error")
+            entry = None
+
+        state = self._state(entry)
+        with self._lock:
+            if state == CACHE_FRESH:
+                self.hits += 1
+            elif state == CACHE_STALE:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+        return state
+
+    def _state(self, entry: Optional[Dict[str, Any]]) -> str:
+        if not entry or not isinstance(entry.get("refreshed_at"), datetime):
+            return CACHE_MISS
+
+        age = datetime.utcnow() - entry["refreshed_at"].replace(tzinfo=None)
+        if age < timedelta(seconds=self.ttl):
+            return CACHE_FRESH
+        if age < timedelta(seconds=self.ttl + self.stale_ttl):
+            return CACHE_STALE
+        return CACHE_MISS
+
+    def mark_refreshed(self, cache_collection: Collection, search: str, tweet_count: int, changed: bool = True) -> None:
+        """
+        Record a successful refresh for a search term.
+
+        When the refresh `changed` the stored tweets, the entry's `data_version` is bumped,
+        which changes the ETag of every response built from them.
+        """
+        now = datetime.utcnow()
+        update: Dict[str, Any] = {"$set": {"refreshed_at": now, "tweet_count": tweet_count}}
+        if changed:
+            update["$set"]["data_updated_at"] = now
+            update["$inc"] = {"data_version": 1}
+        try:
+            cache_collection.update_one({"search": search}, update, upsert=True)
+        except PyMongoError as e:
+            handle_logger(message=f"Cache update failed: {str(e)}", type_logger="warning")
+
+    def version(self, cache_collection: Collection, search: str) -> Dict[str, Any]:
+        """Data version of a search term and when its data last changed (empty when never refreshed)."""
+        entry = cache_collection.find_one(
+            {"search": search}, {"_id": 0, "data_version": 1, "data_updated_at": 1, "refreshed_at": 1}
+        )
+        return entry or {}
+
+    def invalidate(self, cache_collection: Collection, search: Optional[str] = None) -> int:
+        """
+        Bump the data version of one search term, or of all of them, after stored tweets or
+        metrics were changed outside of a refresh (backfills, rebuilds). Returns the number
+        of entries bumped.
+        """
+        query = {"search": search} if search is not None else {}
+        result = cache_collection.update_many(
+            query, {"$inc": {"data_version": 1}, "$set": {"data_updated_at": datetime.utcnow()}}
+        )
+        return result.modified_count
+
+    def begin_refresh(self, search: str) -> bool:
+        """Claim the background refresh of a search term. Returns False if one is already running."""
+        with self._lock:
+            if search in self._refreshing:
+                return False
+            self._refreshing.add(search)
+            return True
+
+    def end_refresh(self, search: str) -> None:
+        with self._lock:
+            self._refreshing.discard(search)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshing": len(self._refreshing),
+            }
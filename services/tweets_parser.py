@@ -0,0 +1,28 @@
+from typing import Any, Dict, Optional
+
+# Parameters shared by every search_recent_tweets call, sync or async
+SEARCH_TWEET_PARAMS = {
+    "max_results": 10,
+    "tweet_fields": ["text", "author_id", "created_at", "public_metrics"],
+    "expansions": ["author_id"],
+    "user_fields": ["name", "profile_image_url"],
+}
+
+# Page size of incremental fetches (since_id): the API maximum, so a busy term catches up
+# in a few calls
+INCREMENTAL_MAX_RESULTS = 100
+
+def search_tweet_params(since_id: Optional[int] = None) -> Dict[str, Any]:
+    """search_recent_tweets parameters of a fetch, with full pages when it is incremental."""
+    if since_id is None:
+        return SEARCH_TWEET_PARAMS
+    return {**SEARCH_TWEET_PARAMS, "max_results": INCREMENTAL_MAX_RESULTS}
+
+def build_search_query(search: str) -> str:
+    """Twitter query for a search term, excluding retweets."""
+    return f"{search} -is:retweet"
+
+def build_users_map(response) -> Dict[str, Any]:
+    """Map author ids to the users expanded in a search response."""
+    includes = getattr(response, "includes", None) or {}
+    return {str(user.id): user for user in includes.get("users", [])}
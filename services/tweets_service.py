@@ -1,21 +1,71 @@
-from datetime import datetime
-from time import sleep
-from typing import List, Dict, Any, Optional
-
+import contextlib
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+
+import pandas as pd
+from bson import ObjectId
+from pymongo import DESCENDING
 from pymongo.collection import Collection
-from pymongo.errors import PyMongoError, DuplicateKeyError
-from flask import g
+from pymongo.errors import PyMongoError
+from flask import g, current_app, has_request_context
 import tweepy
 
-from analytics.tweets_analytic import analytic_tweets, calculate_hype_score
-from preprocess.tweets_preprocess import process_tweet
-
+from analytics.hype_score import HypeScoreEngine
+from analytics.tweets_analytic import HOURLY_METRIC_COLUMNS, aggregate_hourly_metrics, analytic_tweets
+from config.indexes import ensure_indexes_once
+from config.x_connect import AsyncTwitterClient
+from preprocess.tweet_batch import TweetBatch
+from preprocess.tweets_preprocess import SENTIMENT_VERSION, get_sentiment_analyzer, process_tweet
+from services.async_fetcher import AsyncTweetFetcher
+from services.metrics_rollup import MetricsRollup
+from services.rate_limiter import RateLimiter, RateLimitExceeded, SEARCH_RECENT_ENDPOINT
+from services.search_registry import SearchRegistry
+from services.single_flight import RequestLease, SingleFlight
+from services.tweets_cache import TweetCache, normalize_search, CACHE_FRESH, CACHE_STALE
+from services.tweets_parser import build_search_query, build_users_map, search_tweet_params
+from services.tweets_watermark import TweetWatermarks
+from services.tweets_writer import TweetWriter
+from services.write_behind import WriteBehindBuffer
+
+from utils.instrumentation import (
+    RATE_LIMIT_HITS, TWEETS_DUPLICATES, TWEETS_FETCHED, TWITTER_API_CALLS, instrumented, timed
+)
 from utils.logger import handle_logger
+from utils.pagination import encode_cursor
+
+# Fields returned for tweets read back from MongoDB
+CACHED_TWEET_FIELDS = {
+    "_id": 1,
+    "tweet_id": 1,
+    "text": 1,
+    "author_id": 1,
+    "author_name": 1,
+    "author_photo": 1,
+    "created_at": 1,
+    "stored_at": 1,
+    "source": 1,
+    "processed": 1,
+    "search": 1,
+    "public_metrics": 1,
+    "likes": 1,
+    "retweets": 1,
+    "replies": 1,
+    "cleaned_text": 1,
+    "sentiment": 1,
+    "sentiment_scores": 1,
+    "sentiment_version": 1
+}
 
 class TweetService:
     def __init__(self):
         self._tweets_collection: Optional[Collection] = None
         self._twitter_client: Optional[tweepy.Client] = None
+        self.cache = TweetCache()
+        self.flights = SingleFlight()
+        self._write_behind: Optional[WriteBehindBuffer] = None
+        self._write_behind_lock = threading.Lock()
 
     @property
     def metrics_collection(self) -> Collection:
@@ -27,6 +77,11 @@ class TweetService:
             raise RuntimeError("Database connection not initialized")
         return g.mongo_db["tweets_metrics"]
 
+    @property
+    def metrics_rollup(self) -> MetricsRollup:
+        """Time-bucket rollups stored in the tweet metrics collection."""
+        return MetricsRollup(self.metrics_collection, granularity=current_app.config.get("ROLLUP_GRANULARITY", "hour"))
+
     @property
     def tweets_collection(self) -> Collection:
         """Lazy-loaded MongoDB tweets collection."""
@@ -37,6 +92,50 @@ class TweetService:
             self._tweets_collection = g.mongo_db["tweets"]
         return self._tweets_collection
 
+    @property
+    def cache_collection(self) -> Collection:
+        """MongoDB collection holding per-search cache entries."""
+        if 'mongo_db' not in g:
+            handle_logger(message="Database connection not initialized", type_logger="error")
+            raise RuntimeError("Database connection not initialized")
+        return g.mongo_db["tweets_cache"]
+
+    @property
+    def tracked_collection(self) -> Collection:
+        """MongoDB collection holding the search terms tracked by the collector."""
+        if 'mongo_db' not in g:
+            handle_logger(message="Database connection not initialized", type_logger="error")
+            raise RuntimeError("Database connection not initialized")
+        return g.mongo_db["tracked_searches"]
+
+    @property
+    def watermarks_collection(self) -> Collection:
+        """MongoDB collection holding the per-search since_id watermarks."""
+        if 'mongo_db' not in g:
+            handle_logger(message="Database connection not initialized", type_logger="error")
+            raise RuntimeError("Database connection not initialized")
+        return g.mongo_db["tweets_watermarks"]
+
+    @property
+    def leases_collection(self) -> Collection:
+        """MongoDB collection holding the cross-worker request leases."""
+        if 'mongo_db' not in g:
+            handle_logger(message="Database connection not initialized", type_logger="error")
+            raise RuntimeError("Database connection not initialized")
+        return g.mongo_db["request_leases"]
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Token bucket for Twitter API calls, shared by every worker through MongoDB."""
+        if 'mongo_db' not in g:
+            handle_logger(message="Database connection not initialized", type_logger="error")
+            raise RuntimeError("Database connection not initialized")
+        return RateLimiter(
+            g.mongo_db["rate_limits"],
+            limit=current_app.config.get("TWITTER_RATE_LIMIT", 450),
+            window=current_app.config.get("TWITTER_RATE_LIMIT_WINDOW", 900)
+        )
+
     @property
     def twitter_client(self) -> tweepy.Client:
         """Lazy-loaded Twitter client."""
@@ -47,36 +146,107 @@ class TweetService:
             self._twitter_client = g.twitter_client
         return self._twitter_client
 
-    def get_tweets(self, force_refresh: bool = False, search: str = '') -> List[Dict[str, Any]]:
-        """Retrieve tweets, with caching and optional refresh."""
-        try:
-            if not force_refresh and self._has_cached_tweets():
-                return self._get_cached_tweets()
+    def stats(self) -> Dict[str, Any]:
+        """In-process counters of the cache, of request coalescing and of the write-behind buffer."""
+        write_behind = self._write_behind
+        return {
+            "cache": self.cache.stats(),
+            "coalescing": self.flights.stats(),
+            "write_behind": write_behind.stats() if write_behind is not None else None,
+        }
 
-            raw_tweets = self._fetch_from_twitter(search=search)
-            
-            if not raw_tweets:
-                raise ValueError("No tweets received from Twitter API")
+    @property
+    def write_behind(self) -> Optional[WriteBehindBuffer]:
+        """
+        Write-behind buffer of this process when WRITE_BEHIND is on, created on first use.
+        Its flusher thread runs in an app context with the current `g.mongo_db`.
+        """
+        if not current_app.config.get("WRITE_BEHIND", False):
+            return None
+
+        buffer = self._write_behind
+        if buffer is None or buffer.pid != os.getpid():
+            with self._write_behind_lock:
+                buffer = self._write_behind
+                if buffer is None or buffer.pid != os.getpid():
+                    config = current_app.config
+                    app = current_app._get_current_object()
+                    mongo_db = g.mongo_db
+
+                    @contextlib.contextmanager
+                    def flush_context():
+                        with app.app_context():
+                            g.mongo_db = mongo_db
+                            yield
+
+                    buffer = self._write_behind = WriteBehindBuffer(
+                        self._persist_ingest,
+                        batch_size=config.get("WRITE_BEHIND_BATCH_SIZE", 1000),
+                        flush_interval=config.get("WRITE_BEHIND_FLUSH_INTERVAL", 0.5),
+                        max_pending=config.get("WRITE_BEHIND_MAX_PENDING", 10000),
+                        block_timeout=config.get("WRITE_BEHIND_BLOCK_SECONDS", 5),
+                        context=flush_context
+                    )
+        return buffer
+
+    def _coalesce(self, key: tuple, fn):
+        """Run `fn` through the single-flight layer, unless COALESCE_REQUESTS is off."""
+        if not current_app.config.get("COALESCE_REQUESTS", True):
+            return fn()
+        return self.flights.do(key, fn)
+
+    def data_version(self, search: str, force_refresh: bool = False) -> Tuple[str, Optional[datetime]]:
+        """
+        Version token of the data served for a search term, for HTTP conditional requests.
 
-            processed_tweets = self._process_tweets(raw_tweets)
-            self._store_tweets(processed_tweets)
-            tweets = processed_tweets
-            
-            sorted_tweets = sorted(
-                tweets,
-                key=lambda x: x.get("created_at", datetime.min),
-                reverse=True
-            )
-            
-            for tweet in sorted_tweets:
-                if '_id' in tweet:
-                    tweet['_id'] = str(tweet['_id'])
-                if 'created_at' in tweet and isinstance(tweet['created_at'], datetime):
-                    tweet['created_at'] = tweet['created_at'].isoformat()
-                if 'stored_at' in tweet and isinstance(tweet['stored_at'], datetime):
-                    tweet['stored_at'] = tweet['stored_at'].isoformat()
+        The cache is synchronized first (refreshing the term if needed), so the token
+        describes what the next read returns. It combines the entry's data version (bumped
+        by every ingest that changed tweets), the since_id watermark and the metrics
+        configuration (sentiment version, engine, rollup granularity, window start, hype
+        decay hour).
 
-            return sorted_tweets
+        Returns:
+        - The version token.
+        - When the data last changed, or None if unknown.
+        """
+        search = normalize_search(search)
+        self._sync_cache(search, force_refresh)
+
+        entry = self.cache.version(self.cache_collection, search)
+        since_id = TweetWatermarks(self.watermarks_collection).get(search)
+        window_hours = current_app.config.get("METRICS_WINDOW_HOURS", 0)
+        # A sliding window or a hype time decay changes the metrics as time passes, even
+        # without new tweets
+        window_start = self.metrics_rollup.window_start(
+            datetime.utcnow() - timedelta(hours=window_hours)
+        ).strftime("%Y%m%d%H%M") if window_hours else 0
+        decay_hour = datetime.utcnow().strftime("%Y%m%d%H") if current_app.config.get("HYPE_DECAY_HALF_LIFE_HOURS", 0) else 0
+        metrics_version = ".".join(str(part) for part in (
+            SENTIMENT_VERSION,
+            current_app.config.get("METRICS_ENGINE", "rollup"),
+            current_app.config.get("ROLLUP_GRANULARITY", "hour"),
+            window_start,
+            decay_hour,
+        ))
+        token = f"{entry.get('data_version', 0)}-{since_id or 0}-{metrics_version}"
+        return token, entry.get("data_updated_at") or entry.get("refreshed_at")
+
+    def get_tweets(self, force_refresh: bool = False, search: str = '') -> List[Dict[str, Any]]:
+        """
+        Retrieve tweets for a search term, with per-search caching and optional refresh.
+
+        Concurrent identical calls are coalesced: one of them loads the tweets and the
+        others share its result.
+        """
+        search = normalize_search(search)
+        return self._coalesce(("tweets", search, force_refresh), lambda: self._load_tweets(search, force_refresh))
+
+    def _load_tweets(self, search: str, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        try:
+            refreshed = self._sync_cache(search, force_refresh)
+            if refreshed is not None:
+                return refreshed
+            return self._get_cached_tweets(search)
 
         except (PyMongoError, tweepy.TweepyException) as e:
             handle_logger(message=f"Tweet service failed: {str(e)}", type_logger="error")
@@ -85,93 +255,379 @@ class TweetService:
             handle_logger(message=f"Unexpected error in tweet service: {str(e)}", type_logger="error")
             raise
 
-    def _has_cached_tweets(self) -> bool:
-        """Check if there are any cached tweets in the database."""
+    def get_tweets_page(
+        self,
+        force_refresh: bool = False,
+        search: str = '',
+        limit: int = 100,
+        after: Optional[Tuple[datetime, ObjectId]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Retrieve one page of cached tweets using keyset pagination on (created_at, _id).
+
+        Returns:
+        - The page of tweets, newest first.
+        - The cursor for the next page, or None when this is the last one.
+        """
         try:
-            return self.tweets_collection.count_documents({}, limit=1) > 0
-        except PyMongoError as e:
-            handle_logger(message=f"Cache check failed: {str(e)}", type_logger="error")
+            search = normalize_search(search)
+            self._sync_cache(search, force_refresh)
+
+            query: Dict[str, Any] = {"search": search}
+            if after is not None:
+                created_at, object_id = after
+                query["$or"] = [
+                    {"created_at": {"$lt": created_at}},
+                    {"created_at": created_at, "_id": {"$lt": object_id}}
+                ]
+
+            documents = list(
+                self.tweets_collection.find(query, CACHED_TWEET_FIELDS)
+                .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+                .limit(limit + 1)
+            )
+
+            next_cursor = None
+            if len(documents) > limit:
+                documents = documents[:limit]
+                last = documents[-1]
+                next_cursor = encode_cursor(last.get("created_at"), last["_id"])
+
+            return documents, next_cursor
+
+        except (PyMongoError, tweepy.TweepyException) as e:
+            handle_logger(message=f"Tweet service failed: {str(e)}", type_logger="error")
+            raise RuntimeError("Tweet service operation failed") from e
+
+    def iter_tweets(self, force_refresh: bool = False, search: str = '', batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Yield cached tweets for a search term one by one, newest first.
+
+        Documents are pulled from the PyMongo cursor in batches of `batch_size`, so memory
+        stays bounded regardless of how many tweets are stored. The cache is synchronized
+        before returning, so refresh errors surface before a response starts streaming.
+        """
+        try:
+            search = normalize_search(search)
+            self._sync_cache(search, force_refresh)
+
+            cursor = (
+                self.tweets_collection.find({"search": search}, CACHED_TWEET_FIELDS)
+                .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+                .batch_size(batch_size)
+            )
+        except (PyMongoError, tweepy.TweepyException) as e:
+            handle_logger(message=f"Tweet service failed: {str(e)}", type_logger="error")
+            raise RuntimeError("Tweet service operation failed") from e
+
+        return self._iter_cursor(cursor)
+
+    @staticmethod
+    def _iter_cursor(cursor) -> Iterator[Dict[str, Any]]:
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def _sync_cache(self, search: str, force_refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        Make sure the cache for a normalized search term can be served.
+
+        Returns the freshly fetched tweets when a synchronous refresh happened, otherwise None
+        and the caller reads from MongoDB.
+
+        Within a request a term is synchronized once: later calls (the response builder,
+        after `data_version`) get the outcome of the first, without a second cache lookup
+        or refresh.
+        """
+        synced = g.setdefault("synced_searches", {}) if has_request_context() else None
+        if synced is not None and search in synced:
+            return synced[search]
+
+        refreshed = self._synchronize(search, force_refresh)
+        if synced is not None:
+            synced[search] = refreshed
+        return refreshed
+
+    def _synchronize(self, search: str, force_refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
+        self._prepare_cache()
+
+        if not self._needs_refresh(search, force_refresh):
+            return None
+
+        try:
+            return self._refresh_tweets(search)
+        except RateLimitExceeded as e:
+            # Degrade to whatever is cached instead of waiting for the budget to refill
+            cached = self._get_cached_tweets(search)
+            if not cached:
+                raise
+            handle_logger(message=f"⚠️ {str(e)}. Serving cached tweets for '{search}'", type_logger="warning")
+            return cached
+
+    def _prepare_cache(self) -> None:
+        self.cache.configure(
+            ttl=current_app.config.get("TWEETS_CACHE_TTL"),
+            stale_ttl=current_app.config.get("TWEETS_CACHE_STALE_TTL")
+        )
+        if current_app.config.get("MONGO_ENSURE_INDEXES", True):
+            ensure_indexes_once(g.mongo_db, ttl_days=current_app.config.get("TWEETS_TTL_DAYS", 0))
+
+    def _needs_refresh(self, search: str, force_refresh: bool = False) -> bool:
+        """
+        Decide whether a normalized search term must be refreshed before it is read.
+
+        Stale entries are refreshed in the background and served as they are, and in
+        read-only mode unknown terms are handed over to the collector instead.
+        """
+        if current_app.config.get("TWEETS_READ_ONLY"):
+            # The collector owns ingestion: only read precomputed data, and make sure
+            # terms nobody tracked yet get picked up on its next pass.
+            if self.cache.lookup(self.cache_collection, search) != CACHE_FRESH:
+                SearchRegistry(self.tracked_collection).track_if_missing(
+                    search, current_app.config.get("COLLECTOR_DEFAULT_INTERVAL", 300)
+                )
             return False
 
-    def _get_cached_tweets(self) -> List[Dict[str, Any]]:
-        """Retrieve stored tweets, including new user fields."""
+        if not force_refresh:
+            state = self.cache.lookup(self.cache_collection, search)
+            if state == CACHE_FRESH:
+                return False
+
+            buffer = self.write_behind
+            if buffer is not None and buffer.has_pending(search):
+                # A refresh of this term is on its way to MongoDB: don't fetch it again, and
+                # wait for it only when nothing of the term is stored yet
+                if TweetWatermarks(self.watermarks_collection).get(search) is None:
+                    buffer.flush_now()
+                    buffer.wait_for(search, timeout=current_app.config.get("WRITE_BEHIND_WAIT_SECONDS", 10))
+                return False
+
+            if state == CACHE_STALE:
+                self._refresh_in_background(search)
+                return False
+
+        return True
+
+    def collect(self, search: str) -> List[Dict[str, Any]]:
+        """Fetch and store new tweets for a search term. Used by the background collector."""
+        return self._refresh_tweets(normalize_search(search))
+
+    def collect_many(self, searches: List[str]) -> Dict[str, Union[List[Dict[str, Any]], Exception]]:
+        """
+        Fetch and store new tweets for many search terms at once.
+
+        Terms are fetched concurrently with the asyncio client (bounded by
+        TWITTER_FETCH_CONCURRENCY) and then ingested one by one through the same path as
+        `collect`. Returns the ingested tweets, or the error, per search term.
+        """
+        searches = list(dict.fromkeys(normalize_search(search) for search in searches))
+        watermarks = TweetWatermarks(self.watermarks_collection)
+        since_ids = {search: watermarks.get(search) for search in searches}
+
+        fetcher = AsyncTweetFetcher(
+            rate_limiter=self.rate_limiter,
+            max_concurrency=current_app.config.get("TWITTER_FETCH_CONCURRENCY", 5),
+            incremental_max_pages=current_app.config.get("TWITTER_INCREMENTAL_MAX_PAGES", 10)
+        )
+        fetched = fetcher.fetch_many(since_ids)
+
+        results: Dict[str, Union[List[Dict[str, Any]], Exception]] = {}
+        for search in searches:
+            result = fetched.get(search)
+            if isinstance(result, Exception):
+                results[search] = result
+                continue
+            batch, complete = result or (TweetBatch.empty(), True)
+            try:
+                results[search] = self._ingest_tweets(search, batch, since_id=since_ids[search], complete=complete)
+            except Exception as e:
+                results[search] = e
+        return results
+
+    def _refresh_tweets(self, search: str) -> List[Dict[str, Any]]:
+        """
+        Fetch tweets newer than the search watermark and ingest them.
+
+        Concurrent refreshes of a term share one Twitter fetch: within the process through
+        the single-flight layer, and across workers through a MongoDB lease when
+        COALESCE_LEASE is on.
+        """
+        return self._coalesce(("refresh", search), lambda: self._refresh_leased(search))
+
+    def _refresh_leased(self, search: str) -> List[Dict[str, Any]]:
+        if not current_app.config.get("COALESCE_LEASE", False):
+            return self._fetch_and_ingest(search)
+
+        lease = RequestLease(self.leases_collection, ttl=current_app.config.get("COALESCE_LEASE_TTL", 30))
+        key = f"refresh:{search}"
+        token = lease.acquire(key)
+        if token is None:
+            # Another worker is refreshing this term: wait for it and read what it stored
+            self.flights.record_remote("refresh")
+            if not lease.wait(key):
+                handle_logger(message=f"Timed out waiting for the refresh of '{search}'", type_logger="warning")
+            return self._get_cached_tweets(search)
+
         try:
-            tweets_cursor = self.tweets_collection.find(
-                {},
-                {
-                    "_id": 1,
-                    "tweet_id": 1,
-                    "text": 1,
-                    "author_id": 1,
-                    "author_name": 1,
-                    "author_photo": 1,
-                    "created_at": 1,
-                    "stored_at": 1,
-                    "source": 1,
-                    "processed": 1
-                }
+            return self._fetch_and_ingest(search)
+        finally:
+            lease.release(key, token)
+
+    def _fetch_and_ingest(self, search: str) -> List[Dict[str, Any]]:
+        since_id = TweetWatermarks(self.watermarks_collection).get(search)
+        batch, complete = self._fetch_from_twitter(search=search, since_id=since_id)
+        return self._ingest_tweets(search, batch, since_id=since_id, complete=complete)
+
+    def _ingest_tweets(
+        self, search: str, batch: TweetBatch, since_id: Optional[int] = None, complete: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Score and store fetched tweets, advance the watermark and mark the search as refreshed.
+
+        Returns the stored tweets of the search, as a cached read does (the API only sent
+        the new ones on an incremental fetch). When the fetch did not reach
+        `since_id` (`complete` is False) the watermark stays where it is, so the next fetch
+        reads the tweets left in between; such ingests are written synchronously.
+
+        With WRITE_BEHIND the writes are queued and flushed by a background thread. The
+        request waits for its own flush on the first fetch of a term (nothing else to serve)
+        or with WRITE_BEHIND_READ_YOUR_WRITES; otherwise it returns right away, with the
+        fetched tweets (not stored yet, so without `_id`) on top of the stored ones.
+        """
+        if not len(batch):
+            if since_id is None:
+                raise ValueError("No tweets received from Twitter API")
+            handle_logger(message=f"No new tweets for '{search}' since {since_id}", type_logger="info")
+            self.cache.mark_refreshed(self.cache_collection, search, 0, changed=False)
+            return self._get_cached_tweets(search)
+
+        if not complete:
+            handle_logger(
+                message=f"Fetch of '{search}' stopped before reaching since_id {since_id}, watermark kept",
+                type_logger="warning"
             )
-            tweets = list(tweets_cursor)
-
-            # Convert ObjectId and datetime fields
-            for tweet in tweets:
-                if "_id" in tweet:
-                    tweet["_id"] = str(tweet["_id"])
-                for field in ["created_at", "stored_at"]:
-                    if field in tweet and isinstance(tweet[field], datetime):
-                        tweet[field] = tweet[field].isoformat()
-            return tweets
+
+        # Documents are built once, newest first: written, and served until the write lands
+        with timed("process"):
+            documents = batch.score().documents(search, datetime.utcnow(), order=batch.newest_first())
+
+        buffer = self.write_behind
+        job = buffer.submit(search, documents) if buffer is not None and complete else None
+        if job is None:
+            self._persist_ingest(search, documents, advance_watermark=complete)
+        elif since_id is None or current_app.config.get("WRITE_BEHIND_READ_YOUR_WRITES", False):
+            buffer.flush_now()
+            if job.wait(timeout=current_app.config.get("WRITE_BEHIND_WAIT_SECONDS", 10)) is None:
+                handle_logger(message=f"Write-behind flush of '{search}' still pending, not waiting", type_logger="warning")
+
+        cached = self._get_cached_tweets(search)
+        if job is not None and not job.done.is_set():
+            return self._merge_tweets(documents, cached)
+        return cached
+
+    def _persist_ingest(self, search: str, documents: List[Dict[str, Any]], advance_watermark: bool = True) -> Dict[str, Any]:
+        """
+        Write an ingest: upsert the tweets, update the rollups, advance the watermark and
+        mark the search as refreshed (bumping its data version when tweets changed).
+        Runs in the request, or in the write-behind flusher (complete fetches only).
+        """
+        report = self._store_tweets(documents, search=search)
+        with timed("rollup"):
+            self.metrics_rollup.ingest(search, report["new_for_search"], report["engagement_deltas"])
+        if advance_watermark:
+            TweetWatermarks(self.watermarks_collection).advance(search, (document["tweet_id"] for document in documents))
+        self.cache.mark_refreshed(
+            self.cache_collection, search, len(documents), changed=bool(report["upserted"] or report["modified"])
+        )
+        return report
+
+    @staticmethod
+    def _merge_tweets(fetched: List[Dict[str, Any]], cached: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetched tweets not yet flushed plus the stored ones, newest first, each tweet once."""
+        fetched_ids = {tweet["tweet_id"] for tweet in fetched}
+        merged = fetched + [tweet for tweet in cached if tweet.get("tweet_id") not in fetched_ids]
+        return sorted(merged, key=lambda tweet: tweet.get("created_at") or datetime.min, reverse=True)
+
+    def _refresh_in_background(self, search: str) -> None:
+        """Refresh a stale search term in a daemon thread while the caller serves cached data."""
+        if not self.cache.begin_refresh(search):
+            return
+
+        app = current_app._get_current_object()
+        mongo_db = g.mongo_db
+        twitter_client = self.twitter_client
+
+        def run():
+            try:
+                with app.app_context():
+                    g.mongo_db = mongo_db
+                    g.twitter_client = twitter_client
+                    self._refresh_tweets(search)
+            except Exception as e:
+                with app.app_context():
+                    handle_logger(message=f"Background refresh failed for '{search}': {str(e)}", type_logger="warning")
+            finally:
+                self.cache.end_refresh(search)
+
+        threading.Thread(target=run, name=f"tweets-refresh-{search}", daemon=True).start()
+
+    def _get_cached_tweets(self, search: str) -> List[Dict[str, Any]]:
+        """Retrieve stored tweets for a search term, newest first."""
+        try:
+            tweets_cursor = self.tweets_collection.find(
+                {"search": search},
+                CACHED_TWEET_FIELDS
+            ).sort("created_at", DESCENDING)
+            return list(tweets_cursor)
         except PyMongoError as e:
             handle_logger(message=f"Cache retrieval failed: {str(e)}", type_logger="error")
             return []
 
-    def _fetch_from_twitter(self, search: str = '', max_retries: int = 1) -> List[Dict[str, Any]]:
-        """ 
-        Fetch tweets from Twitter API, acumulando resultados até `max_retries * 10` tweets (10 tweets por requisição).
+    @instrumented("fetch")
+    def _fetch_from_twitter(
+        self, search: str = '', max_retries: int = 1, since_id: Optional[int] = None
+    ) -> Tuple[TweetBatch, bool]:
+        """
+        Fetch tweets from the Twitter API, up to `max_retries` pages of 10 tweets.
+        With `since_id` only newer tweets are returned, following `next_token` to the end
+        (at most TWITTER_INCREMENTAL_MAX_PAGES pages of 100 tweets).
+
+        Returns:
+        - The fetched tweets, and whether every tweet newer than `since_id` was read (False
+          when the page cap or the rate limit stopped an incremental fetch early)
         """
-        tweets = []
+        pages: List[TweetBatch] = []
         next_token = None
         attempts = 0
-        
-        while attempts < max_retries:
+        incremental_pages = max(1, current_app.config.get("TWITTER_INCREMENTAL_MAX_PAGES", 10))
+
+        while attempts < (max_retries if since_id is None else incremental_pages):
             try:
+                allowed, retry_at = self.rate_limiter.acquire(SEARCH_RECENT_ENDPOINT)
+                if not allowed:
+                    RATE_LIMIT_HITS.inc(reason="budget")
+                    if pages:
+                        break
+                    raise RateLimitExceeded(SEARCH_RECENT_ENDPOINT, retry_at)
+
+                TWITTER_API_CALLS.inc(client="sync")
                 response = self.twitter_client.search_recent_tweets(
-                    query=f"{search} -is:retweet",
-                    max_results=10,
-                    tweet_fields=["text", "author_id", "created_at", "public_metrics"],
-                    expansions=["author_id"],
-                    user_fields=["name", "profile_image_url"],
-                    next_token=next_token
+                    query=build_search_query(search),
+                    next_token=next_token,
+                    since_id=since_id,
+                    **search_tweet_params(since_id)
+                )
+                self.rate_limiter.update_from_headers(
+                    SEARCH_RECENT_ENDPOINT, getattr(self.twitter_client, "rate_limit_headers", None)
                 )
 
                 if not response.data:
                     break
 
-                users_map = {str(user.id): user for user in response.includes.get("users", [])}
-
-                for tweet in response.data:
-                    author_info = users_map.get(str(tweet.author_id))
-                    metrics = tweet.public_metrics
-
-                    tweets.append({
-                        "tweet_id": tweet.id,
-                        "text": tweet.text,
-                        "author_id": tweet.author_id,
-                        "author_name": author_info.name if author_info else "Unknown",
-                        "author_photo": author_info.profile_image_url if author_info else "",
-                        "created_at": tweet.created_at.isoformat() if tweet.created_at else datetime.utcnow().isoformat(),
-                        "public_metrics": {
-                            "like_count": int(metrics.get("like_count", 0)),
-                            "retweet_count": int(metrics.get("retweet_count", 0)),
-                            "reply_count": int(metrics.get("reply_count", 0)),
-                            "quote_count": int(metrics.get("quote_count", 0)),
-                            "bookmark_count": int(metrics.get("bookmark_count", 0)),
-                            "impression_count": int(metrics.get("impression_count", 0))
-                        },
-                        "likes": int(metrics.get("like_count", 0)),
-                        "retweets": int(metrics.get("retweet_count", 0)),
-                        "replies": int(metrics.get("reply_count", 0))
-                    })
+                users_map = build_users_map(response)
+                pages.append(TweetBatch.from_tweepy(response.data, users_map))
+                TWEETS_FETCHED.inc(len(response.data))
 
                 next_token = response.meta.get("next_token")
 
@@ -179,16 +635,30 @@ class TweetService:
                     break
 
                 attempts += 1
-                sleep(1)
 
             except tweepy.TooManyRequests as e:
+                RATE_LIMIT_HITS.inc(reason="too_many_requests")
                 retry_after = int(e.response.headers.get('Retry-After', 60))
                 handle_logger(
-                    message=f"Rate limited. Retrying in {retry_after}s (attempt {attempts + 1}/{max_retries})",
+                    message=f"Rate limited. Budget exhausted for {retry_after}s (attempt {attempts + 1}/{max_retries})",
                     type_logger="warning"
                 )
-                sleep(retry_after)
-                attempts += 1
+                retry_at = self.rate_limiter.register_too_many_requests(
+                    SEARCH_RECENT_ENDPOINT, e.response.headers, retry_after
+                )
+                if pages:
+                    break
+                raise RateLimitExceeded(SEARCH_RECENT_ENDPOINT, retry_at) from e
+            except RateLimitExceeded:
+                raise
+            except tweepy.BadRequest as e:
+                if since_id is None:
+                    handle_logger(message=f"Twitter API error: {str(e)}", type_logger="error")
+                    raise
+                # The watermark fell out of the recent search window: fetch without it
+                handle_logger(message=f"since_id {since_id} rejected, fetching without it: {str(e)}", type_logger="warning")
+                since_id = None
+                next_token = None
             except tweepy.TweepyException as e:
                 handle_logger(message=f"Twitter API error: {str(e)}", type_logger="error")
                 raise
@@ -196,60 +666,41 @@ class TweetService:
                 handle_logger(message=f"Unexpected error fetching tweets: {str(e)}", type_logger="error")
                 raise
 
-        return tweets
-
-    @staticmethod
-    def _process_tweets(raw_tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """
-        Process raw tweets by adding metadata.
-
-        Adds a 'stored_at' datetime, 'source', and a 'processed' flag.
-        """
-        current_time = datetime.utcnow()
-        processed = []
-        for tweet in raw_tweets:
-            tweet_copy = tweet.copy()
-            tweet_copy["stored_at"] = current_time
-            tweet_copy["source"] = "twitter_api"
-            tweet_copy["processed"] = False
-            tweet_copy["likes"] = tweet.get("likes", 0)
-            tweet_copy["retweets"] = tweet.get("retweets", 0)
-            tweet_copy["replies"] = tweet.get("replies", 0)
-            tweet_copy["likes"] = int(tweet_copy.get("likes", 0))
-            tweet_copy["retweets"] = int(tweet_copy.get("retweets", 0))
-            tweet_copy["replies"] = int(tweet_copy.get("replies", 0))\
-            
-            if isinstance(tweet_copy.get("created_at"), str):
-                try:
-                    tweet_copy["created_at"] = datetime.fromisoformat(tweet_copy["created_at"].replace("Z", "+00:00"))
-                except ValueError:
-                    tweet_copy["created_at"] = datetime.utcnow()
+        return TweetBatch.concat(pages), since_id is None or not next_token
 
-            processed.append(tweet_copy)
-        return processed
+    @instrumented("store")
+    def _store_tweets(self, tweets: List[Dict[str, Any]], search: str = '') -> Dict[str, Any]:
+        """
+        Upsert processed tweets in MongoDB by tweet_id, refreshing the engagement metrics
+        of the ones already stored.
 
-    def _store_tweets(self, tweets: List[Dict[str, Any]]) -> None:
-        """Store processed tweets in MongoDB, including engagement metrics."""
+        Returns the write report of `TweetWriter.upsert` (matched/upserted/modified counts
+        and the tweets new to this search term).
+        """
         if not tweets:
             handle_logger(message="No tweets to store", type_logger="warning")
-            return
+            return {"matched": 0, "upserted": 0, "modified": 0, "new_for_search": [], "engagement_deltas": []}
 
+        writer = TweetWriter(self.tweets_collection, batch_size=current_app.config.get("TWEETS_WRITE_BATCH_SIZE", 500))
         try:
-            result = self.tweets_collection.insert_many(
-                tweets,
-                ordered=False,
-                bypass_document_validation=False
-            )
-            handle_logger(message=f"Stored {len(result.inserted_ids)}/{len(tweets)} new tweets", type_logger="info")
-        except DuplicateKeyError as e:
-            handle_logger(message=f"Duplicate tweets detected and skipped: {str(e)}", type_logger="warning")
+            report = writer.upsert(search, tweets)
         except PyMongoError as e:
             handle_logger(message=f"Storage failed: {str(e)}", type_logger="error")
             raise
 
+        TWEETS_DUPLICATES.inc(report["matched"], source="stored")
+        handle_logger(
+            message=f"Stored {len(tweets)} tweets: {report['upserted']} new, {report['matched']} existing, {report['modified']} updated",
+            type_logger="info"
+        )
+        return report
+
     def process_hourly_metrics(self, force_refresh: bool = False, search: str = '') -> Dict[str, Any]:
         """
-        Calculate and store hourly tweet metrics, including engagement and hype score.
+        Calculate hourly tweet metrics, including engagement and hype score.
+
+        Metrics are derived at read time from the rollups maintained at ingest, so nothing
+        is written here.
 
         Parameters:
         - force_refresh (bool): Forces new tweet retrieval.
@@ -258,61 +709,140 @@ class TweetService:
         Returns:
         - dict: Contains hourly metrics, processed tweets, and sentiment analysis.
         """
+        return self._coalesce(
+            ("hourly_metrics", normalize_search(search), force_refresh),
+            lambda: self._compute_hourly_metrics(search, force_refresh)
+        )
+
+    def _compute_hourly_metrics(self, search: str, force_refresh: bool = False) -> Dict[str, Any]:
         try:
             tweets = self.get_tweets(force_refresh=force_refresh, search=search)
             if not tweets:
                 raise ValueError("No tweets available for metrics analysis")
 
-            hourly_stats = analytic_tweets(tweets)
-            if hourly_stats.empty:
-                raise ValueError("No hourly stats received")
+            metrics = self._hourly_records(normalize_search(search), tweets)
 
-            hourly_stats_list = hourly_stats.to_dict("records")
-            hype_scores = calculate_hype_score(hourly_stats_list)
+            # Process tweet sentiments
+            feelings = process_tweet(tweets)
 
-            total_tweets = len(tweets)
+            return {"metrics": metrics, "tweets": tweets, "feelings": feelings}
 
-            # Initialize aggregated metrics
-            total_likes = sum(tweet.get("likes", 0) for tweet in tweets)
-            total_retweets = sum(tweet.get("retweets", 0) for tweet in tweets)
-            total_replies = sum(tweet.get("replies", 0) for tweet in tweets)
+        except Exception as e:
+            handle_logger(message=f"❌ Error computing hourly metrics: {str(e)}", type_logger="error")
+            raise
 
-            # Compute means safely (avoid division by zero)
-            likes_mean = total_likes / total_tweets if total_tweets > 0 else 0
-            retweets_mean = total_retweets / total_tweets if total_tweets > 0 else 0
-            replies_mean = total_replies / total_tweets if total_tweets > 0 else 0
+    def process_batch_metrics(self, searches: List[str], force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Calculate hourly metrics for many search terms in one pass.
 
-            # Process hourly stats with engagement and hype scores
-            for record in hourly_stats_list:
-                hour = int(record.get("hour"))
+        Terms that need new tweets are fetched together and ingested with one rollup bulk
+        write each; metrics are then read from the rollups (or computed with one shared
+        sentiment analyzer on the fallback path).
 
-                # Add engagement metrics
-                record["likes_mean"] = likes_mean
-                record["retweets_mean"] = retweets_mean
-                record["replies_mean"] = replies_mean
+        Parameters:
+        - searches (list): Search terms to analyze.
+        - force_refresh (bool): Forces new tweet retrieval for every term.
 
-                # Add hype score
-                hype = next((h for h in hype_scores if int(h["hour"]) == int(hour)), {"hype_score": 0})
-                record["hype_score"] = hype["hype_score"]
+        Returns:
+        - dict: "results" with hourly metrics per term and "errors" with the message per failed term.
+        """
+        searches = list(dict.fromkeys(normalize_search(search) for search in searches if normalize_search(search)))
+        if not searches:
+            raise ValueError("No search terms provided")
 
-                # Perform single database update per document
-                self.metrics_collection.update_one(
-                    {"hour": hour},
-                    {"$set": record},
-                    upsert=True
-                )
+        self._prepare_cache()
+        refresh_errors = self._refresh_many([search for search in searches if self._needs_refresh(search, force_refresh)])
 
-            handle_logger(message="✅ Hourly metrics saved successfully.", type_logger="info")
+        sia = get_sentiment_analyzer()
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
 
-            # Retrieve updated metrics
-            all_metrics_cursor = self.metrics_collection.find({}, {"_id": 0})
-            all_metrics = list(all_metrics_cursor)
+        for search in searches:
+            try:
+                try:
+                    records = self._hourly_records(search, sia=sia)
+                except ValueError:
+                    error = refresh_errors.get(search)
+                    raise error if error is not None else ValueError("No tweets available")
 
-            # Process tweet sentiments
-            feelings = process_tweet(tweets)
+                results[search] = {"tweet_count": sum(record["tweet_count"] for record in records), "metrics": records}
+            except Exception as e:
+                handle_logger(message=f"❌ Batch metrics failed for '{search}': {str(e)}", type_logger="warning")
+                errors[search] = str(e)
+
+        handle_logger(message=f"✅ Batch metrics computed for {len(results)} search terms.", type_logger="info")
+        return {"results": results, "errors": errors}
+
+    def _refresh_many(self, searches: List[str]) -> Dict[str, Exception]:
+        """Refresh several search terms, concurrently when the asyncio client is available. Returns errors per term."""
+        if not searches:
+            return {}
+
+        if len(searches) > 1 and AsyncTwitterClient is not None:
+            results = self.collect_many(searches)
+        else:
+            results = {}
+            for search in searches:
+                try:
+                    results[search] = self._refresh_tweets(search)
+                except Exception as e:
+                    results[search] = e
 
-            return {"metrics": all_metrics, "tweets": tweets, "feelings": feelings}
+        return {search: result for search, result in results.items() if isinstance(result, Exception)}
 
-        except Exception as e:
-            handle_logger(message=f"❌ Error saving hourly metrics: {str(e)}", type_logger="error")
-            raise
\ No newline at end of file
+    def _hourly_stats(self, search: str, tweets: Optional[List[Dict[str, Any]]] = None, sia=None) -> pd.DataFrame:
+        """
+        Hourly metrics of a search term.
+
+        With METRICS_ENGINE=rollup (default) they are read from the time-bucket rollups
+        maintained at ingest; terms without rollups (ingested before them, see
+        `manage.py rebuild-rollups`) fall back to the aggregation engine. With
+        METRICS_ENGINE=aggregation they are computed by a MongoDB aggregation over the stored
+        sentiment and engagement. The pandas path over `tweets` (read from the cache when not
+        given) is used when configured,
+        when stored tweets lack current sentiment scores, or when the aggregation fails.
+        """
+        engine = current_app.config.get("METRICS_ENGINE", "rollup")
+        window_hours = current_app.config.get("METRICS_WINDOW_HOURS", 0)
+        # Aligned on the rollup buckets, so every engine reads the same window
+        since = self.metrics_rollup.window_start(datetime.utcnow() - timedelta(hours=window_hours)) if window_hours else None
+
+        if engine == "rollup":
+            try:
+                records = self.metrics_rollup.hourly(search, since=since)
+                if records:
+                    return pd.DataFrame(records, columns=HOURLY_METRIC_COLUMNS)
+                handle_logger(message=f"No rollups for '{search}', using aggregation metrics", type_logger="info")
+            except PyMongoError as e:
+                handle_logger(message=f"Rollup read failed, using aggregation: {str(e)}", type_logger="warning")
+            engine = "aggregation"
+
+        if engine == "aggregation":
+            try:
+                outdated = self.tweets_collection.count_documents(
+                    {"search": search, "sentiment_version": {"$ne": SENTIMENT_VERSION}}, limit=1
+                )
+                if not outdated:
+                    return aggregate_hourly_metrics(self.tweets_collection, search, since=since)
+                handle_logger(message=f"Tweets of '{search}' lack current sentiment, using pandas metrics", type_logger="info")
+            except PyMongoError as e:
+                handle_logger(message=f"Metrics aggregation failed, using pandas: {str(e)}", type_logger="warning")
+
+        if tweets is None:
+            tweets = self._get_cached_tweets(search)
+        if since is not None:
+            tweets = [tweet for tweet in tweets if isinstance(tweet.get("created_at"), datetime) and tweet["created_at"] >= since]
+        return analytic_tweets(tweets, sia=sia)
+
+    def _hourly_records(self, search: str, tweets: Optional[List[Dict[str, Any]]] = None, sia=None) -> List[Dict[str, Any]]:
+        """Hourly metrics of a search term, with the hype score of each hour."""
+        hourly_stats = self._hourly_stats(search, tweets, sia=sia)
+        if hourly_stats.empty:
+            raise ValueError("No hourly stats received")
+
+        # Scores are aligned with the rows, so they are added as a column
+        hourly_stats = hourly_stats.assign(
+            hour=hourly_stats["hour"].astype(int),
+            hype_score=HypeScoreEngine.from_config(current_app.config).score(hourly_stats)
+        )
+        return hourly_stats.to_dict("records")
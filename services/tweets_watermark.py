@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from pymongo.collection import Collection
+
+
+class TweetWatermarks:
+    """
+    Per-search `since_id` watermarks stored in the ``tweets_watermarks`` collection.
+
+    The watermark is the highest tweet id already ingested for a search term, so the
+    next fetch only asks the Twitter API for newer tweets.
+    """
+
+    def __init__(self, collection: Collection):
+        self.collection = collection
+
+    def get(self, search: str) -> Optional[int]:
+        entry = self.collection.find_one({"search": search}, {"_id": 0, "since_id": 1})
+        if not entry or entry.get("since_id") is None:
+            return None
+        return int(entry["since_id"])
+
+    def advance(self, search: str, tweet_ids: Iterable[Any]) -> Optional[int]:
+        """Move the watermark forward to the highest of `tweet_ids`. It never moves back."""
+        ids = [int(tweet_id) for tweet_id in tweet_ids if str(tweet_id).isdigit()]
+        if not ids:
+            return None
+
+        highest = max(ids)
+        self.collection.update_one(
+            {"search": search},
+            {"$max": {"since_id": highest}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return highest
+
+    def reset(self, search: str) -> None:
+        """Drop the watermark, e.g. when it falls outside the recent search window."""
+        self.collection.delete_one({"search": search})
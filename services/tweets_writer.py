@@ -0,0 +1,139 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+from config.indexes import require_unique_tweet_id
+
+ENGAGEMENT_FIELDS = ("public_metrics", "likes", "retweets", "replies")
+
+
+class TweetWriter:
+    """
+    Bulk upsert layer for the ``tweets`` collection.
+
+    Tweets are upserted by `tweet_id` with `bulk_write`: new tweets are inserted, existing
+    ones get their engagement counts refreshed, and the search term is added to their
+    `search` array. Writes are sent in batches of `batch_size`.
+
+    Whether a tweet is new to a search is decided by the write itself, so concurrent
+    ingests of the same term (other workers, the collector) never both report it: the
+    upsert only matches tweets without the term, and on tweets that have it the insert
+    fails on the unique `tweet_id` index. That index (config/indexes.py) is required:
+    `upsert` raises MissingIndexError instead of writing without it.
+    """
+
+    def __init__(self, collection: Collection, batch_size: int = 500):
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+
+    def upsert(self, search: str, tweets: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Upsert processed tweets found by a search term.
+
+        Returns:
+        - dict with the "matched", "upserted" and "modified" counts, "new_for_search" (the
+          tweets this search did not have yet, for rollups) and "engagement_deltas" (the
+          engagement change of the tweets it already had)
+        """
+        report = {"matched": 0, "upserted": 0, "modified": 0, "new_for_search": [], "engagement_deltas": []}
+        if tweets:
+            require_unique_tweet_id(self.collection)
+
+        for start in range(0, len(tweets), self.batch_size):
+            batch = tweets[start:start + self.batch_size]
+            existing = self._existing(batch)
+            now = datetime.utcnow()
+
+            operations = []
+            for tweet in batch:
+                on_insert = {k: v for k, v in tweet.items() if k not in ENGAGEMENT_FIELDS and k not in ("search", "_id")}
+                operations.append(UpdateOne(
+                    {"tweet_id": tweet["tweet_id"], "search": {"$ne": search}},
+                    {
+                        "$setOnInsert": on_insert,
+                        "$set": {**self._engagement(tweet), "engagement_updated_at": now},
+                        "$addToSet": {"search": search}
+                    },
+                    upsert=True
+                ))
+
+            try:
+                details = self.collection.bulk_write(operations, ordered=False).bulk_api_result
+            except BulkWriteError as e:
+                # Duplicate keys are the tweets this search already has (or that a
+                # concurrent ingest just stored): they are updated below
+                details = e.details
+                if any(error.get("code") != 11000 for error in details.get("writeErrors", [])):
+                    raise
+
+            known = {error["index"] for error in details.get("writeErrors", [])}
+            report["matched"] += details.get("nMatched", 0)
+            report["upserted"] += details.get("nUpserted", 0)
+            report["modified"] += details.get("nModified", 0)
+            report["new_for_search"].extend(tweet for index, tweet in enumerate(batch) if index not in known)
+
+            self._refresh_engagement(search, [batch[index] for index in sorted(known)], existing, now, report)
+
+        return report
+
+    def _refresh_engagement(
+        self,
+        search: str,
+        tweets: List[Dict[str, Any]],
+        existing: Dict[Any, Dict[str, Any]],
+        now: datetime,
+        report: Dict[str, Any]
+    ) -> None:
+        """
+        Update the engagement of tweets the search already has, adding their change to
+        `engagement_deltas`. Changed tweets are swapped one by one, reading the previous
+        counts in the same operation, so concurrent ingests add each change once.
+        """
+        unchanged = []
+        for tweet in tweets:
+            engagement = self._engagement(tweet)
+            previous = existing.get(tweet["tweet_id"])
+            if previous is not None and search in self._searches(previous) and all(
+                previous.get(field) == tweet.get(field) for field in ("likes", "retweets", "replies")
+            ):
+                # Nothing to add to the rollups; a concurrent change already counted itself
+                unchanged.append(UpdateOne({"tweet_id": tweet["tweet_id"]}, {"$set": {"engagement_updated_at": now}}))
+                continue
+
+            previous = self.collection.find_one_and_update(
+                {"tweet_id": tweet["tweet_id"], "search": search},
+                {"$set": {**engagement, "engagement_updated_at": now}},
+                projection={"_id": 0, "created_at": 1, "likes": 1, "retweets": 1, "replies": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+            if previous is None:
+                continue
+            report["matched"] += 1
+            deltas = {field: (tweet.get(field) or 0) - (previous.get(field) or 0) for field in ("likes", "retweets", "replies")}
+            if any(deltas.values()):
+                report["modified"] += 1
+                report["engagement_deltas"].append({"created_at": previous.get("created_at", tweet.get("created_at")), **deltas})
+
+        if unchanged:
+            report["matched"] += self.collection.bulk_write(unchanged, ordered=False).matched_count
+
+    def _existing(self, batch: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """Current search terms and engagement of the tweets of a batch already stored (a hint, read before writing)."""
+        ids = [tweet["tweet_id"] for tweet in batch]
+        cursor = self.collection.find(
+            {"tweet_id": {"$in": ids}},
+            {"_id": 0, "tweet_id": 1, "search": 1, "created_at": 1, "likes": 1, "retweets": 1, "replies": 1}
+        )
+        return {doc["tweet_id"]: doc for doc in cursor}
+
+    @staticmethod
+    def _engagement(tweet: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: tweet[k] for k in ENGAGEMENT_FIELDS if k in tweet}
+
+    @staticmethod
+    def _searches(document: Dict[str, Any]) -> List[str]:
+        searches = document.get("search") or []
+        return searches if isinstance(searches, list) else [searches]
@@ -0,0 +1,275 @@
+import atexit
+import contextlib
+import os
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from typing import Any, Callable, ContextManager, Deque, Dict, List, Optional
+
+from utils.instrumentation import TWEETS_DUPLICATES, registry, timed
+from utils.logger import handle_logger
+
+# Buffers of this process, drained on interpreter exit (and by gunicorn's worker_exit hook)
+_buffers: "weakref.WeakSet[WriteBehindBuffer]" = weakref.WeakSet()
+
+registry.gauge(
+    "write_behind_pending_tweets", "Tweets queued or being flushed by the write-behind buffers.",
+    lambda: sum(buffer.stats()["pending_tweets"] for buffer in list(_buffers))
+)
+
+
+class IngestJob:
+    """Tweets of one ingest waiting to be written, and the outcome of their flush."""
+
+    __slots__ = ("search", "documents", "submitted_at", "done", "report", "error")
+
+    def __init__(self, search: str, documents: List[Dict[str, Any]]):
+        self.search = search
+        self.documents = documents
+        self.submitted_at = time.monotonic()
+        self.done = threading.Event()
+        self.report: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait until the job is flushed. Returns the write report, or None on timeout.
+        Raises the error of a failed flush.
+        """
+        if not self.done.wait(timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.report
+
+
+class WriteBehindBuffer:
+    """
+    In-process write-behind queue for ingested tweets.
+
+    Requests submit the documents of an ingest and return without waiting for MongoDB. A
+    daemon thread flushes the queue once it holds `batch_size` tweets or its oldest job is
+    `flush_interval` seconds old. Jobs of the same search term are merged into one call
+    of `flush(search, documents)` (one bulk write, one rollup update).
+
+    Backpressure: at most `max_pending` tweets are queued or being flushed. `submit` waits
+    up to `block_timeout` seconds for room and then returns None, and the caller writes
+    synchronously instead, so nothing is dropped. The queue is drained on `close`.
+
+    Flushes run inside `context()` (e.g. a Flask app context with `g.mongo_db` set).
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[str, List[Dict[str, Any]]], Dict[str, Any]],
+        batch_size: int = 1000,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+        block_timeout: float = 5.0,
+        context: Callable[[], ContextManager] = contextlib.nullcontext
+    ):
+        self.flush = flush
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self.block_timeout = block_timeout
+        self.context = context
+        self.pid = os.getpid()
+
+        self._queue: Deque[IngestJob] = deque()
+        self._pending_tweets = 0
+        self._pending_searches: Counter = Counter()
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._counters = Counter()
+        self._max_depth = 0
+        self._flush_seconds: Deque[float] = deque(maxlen=100)
+        self._lag_seconds: Deque[float] = deque(maxlen=100)
+        _buffers.add(self)
+
+    def submit(self, search: str, documents: List[Dict[str, Any]]) -> Optional[IngestJob]:
+        """Queue the documents of an ingest. Returns None when the caller must write them itself."""
+        job = IngestJob(search, documents)
+        deadline = time.monotonic() + self.block_timeout
+        with self._cond:
+            if self._closed:
+                return None
+
+            waited = False
+            while self._pending_tweets and self._pending_tweets + len(documents) > self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["rejected"] += 1
+                    return None
+                if not waited:
+                    self._counters["backpressure_waits"] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+            self._queue.append(job)
+            self._pending_tweets += len(documents)
+            self._pending_searches[search] += 1
+            self._counters["submitted"] += 1
+            self._max_depth = max(self._max_depth, self._pending_tweets)
+            self._start()
+            self._cond.notify_all()
+        return job
+
+    def has_pending(self, search: str) -> bool:
+        """Whether tweets of `search` are queued or being flushed."""
+        with self._cond:
+            return self._pending_searches[search] > 0
+
+    def wait_for(self, search: str, timeout: Optional[float] = None) -> bool:
+        """Wait until nothing of `search` is pending. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending_searches[search] > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def flush_now(self) -> None:
+        """Have the flusher write what is queued without waiting for the batch size or interval."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Flush everything queued and wait for it. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending_tweets:
+                self._flush_requested = True
+                self._cond.notify_all()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = 10) -> bool:
+        """Drain the queue and stop the flusher. Later submits are written synchronously."""
+        if self.pid != os.getpid():
+            # The flusher thread and the queued jobs belong to the parent process
+            return True
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self._pending_tweets
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, flush counters and flush latency of this process."""
+        with self._cond:
+            flush_seconds = list(self._flush_seconds)
+            lag_seconds = list(self._lag_seconds)
+            return {
+                "queued_jobs": len(self._queue),
+                "pending_tweets": self._pending_tweets,
+                "max_pending_tweets": self._max_depth,
+                "submitted": self._counters["submitted"],
+                "flushes": self._counters["flushes"],
+                "flushed_tweets": self._counters["flushed_tweets"],
+                "failed_jobs": self._counters["failed_jobs"],
+                "backpressure_waits": self._counters["backpressure_waits"],
+                "rejected": self._counters["rejected"],
+                "flush_ms_avg": round(sum(flush_seconds) / len(flush_seconds) * 1000, 2) if flush_seconds else None,
+                "flush_ms_max": round(max(flush_seconds) * 1000, 2) if flush_seconds else None,
+                "lag_ms_avg": round(sum(lag_seconds) / len(lag_seconds) * 1000, 2) if lag_seconds else None,
+            }
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="tweets-write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        with self.context():
+            self._flush_loop()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+
+                flush_at = self._queue[0].submitted_at + self.flush_interval
+                while self._pending_tweets < self.batch_size and not (self._closed or self._flush_requested):
+                    remaining = flush_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                jobs = list(self._queue)
+                self._queue.clear()
+                self._flush_requested = False
+
+            self._flush_jobs(jobs)
+
+            with self._cond:
+                for job in jobs:
+                    self._pending_tweets -= len(job.documents)
+                    self._pending_searches[job.search] -= 1
+                    if not self._pending_searches[job.search]:
+                        del self._pending_searches[job.search]
+                self._cond.notify_all()
+
+    def _flush_jobs(self, jobs: List[IngestJob]) -> None:
+        started = time.monotonic()
+        by_search: Dict[str, List[IngestJob]] = {}
+        for job in jobs:
+            by_search.setdefault(job.search, []).append(job)
+
+        for search, search_jobs in by_search.items():
+            # The same tweet fetched twice before a flush is written once, with its latest engagement
+            queued = [document for job in search_jobs for document in job.documents]
+            documents = list({document["tweet_id"]: document for document in queued}.values())
+            TWEETS_DUPLICATES.inc(len(queued) - len(documents), source="queued")
+            report, error = None, None
+            try:
+                with timed("write_behind_flush"):
+                    report = self.flush(search, documents)
+            except Exception as e:
+                error = e
+                handle_logger(
+                    message=f"❌ Write-behind flush failed for '{search}' ({len(documents)} tweets): {str(e)}",
+                    type_logger="error"
+                )
+
+            with self._cond:
+                self._counters["flushes"] += 1
+                if error is None:
+                    self._counters["flushed_tweets"] += len(documents)
+                else:
+                    self._counters["failed_jobs"] += len(search_jobs)
+                for job in search_jobs:
+                    self._lag_seconds.append(time.monotonic() - job.submitted_at)
+
+            for job in search_jobs:
+                job.report, job.error = report, error
+                job.done.set()
+
+        with self._cond:
+            self._flush_seconds.append(time.monotonic() - started)
+
+
+def close_all(timeout: Optional[float] = 10) -> None:
+    """Drain and stop every write-behind buffer of this process (shutdown hook)."""
+    for buffer in list(_buffers):
+        if not buffer.close(timeout):
+            with buffer.context():
+                handle_logger(message="⚠️ Write-behind buffer closed with tweets still pending", type_logger="warning")
+
+
+atexit.register(close_all)
@@ -0,0 +1,109 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+# Settings are read when config.settings is imported: the whole suite runs offline
+# (mongomock and replayed Twitter responses), without the response LRU so every test
+# builds its own responses
+os.environ["OFFLINE_MODE"] = "true"
+os.environ["OFFLINE_MONGO_URI"] = ""
+os.environ["OFFLINE_RECORDING"] = ""
+os.environ["HTTP_RESPONSE_CACHE_SIZE"] = "0"
+os.environ["WARM_UP_ON_START"] = "false"
+os.environ.pop("WARM_UP_IN_WORKERS", None)
+
+from flask import g  # noqa: E402
+
+from config import create_app, indexes  # noqa: E402
+from config.clients import registry  # noqa: E402
+from config.mongo_db import get_mongo_db  # noqa: E402
+from offline.twitter import RecordedResponses, ReplayTwitterClient, TWITTER_EPOCH_MS  # noqa: E402
+from resources import tweets_resource  # noqa: E402
+from services.tweets_service import TweetService  # noqa: E402
+from services.write_behind import close_all  # noqa: E402
+
+
+def tweet_id(created_at: datetime, sequence: int = 0) -> int:
+    """Snowflake id of a tweet created at `created_at` (ids grow with time, as since_id expects)."""
+    return ((int(created_at.timestamp() * 1000) - TWITTER_EPOCH_MS) << 22) | sequence
+
+
+def api_tweet(created_at: datetime, text: str = "great launch today", likes: int = 0, sequence: int = 0, author: str = "1"):
+    """A tweet in the API v2 JSON shape."""
+    identifier = tweet_id(created_at, sequence)
+    return {
+        "id": str(identifier),
+        "text": text,
+        "author_id": author,
+        "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "edit_history_tweet_ids": [str(identifier)],
+        "public_metrics": {"like_count": likes, "retweet_count": 0, "reply_count": 0, "quote_count": 0},
+    }
+
+
+def api_page(search: str, tweets, next_token=None):
+    """A recorded search page of `tweets` (newest first, as the API sends them)."""
+    tweets = sorted(tweets, key=lambda tweet: int(tweet["id"]), reverse=True)
+    meta = {"result_count": len(tweets)}
+    if next_token:
+        meta["next_token"] = next_token
+    authors = sorted({tweet["author_id"] for tweet in tweets})
+    return {"query": f"{search} -is:retweet", "response": {
+        "data": tweets,
+        "includes": {"users": [{"id": author, "name": f"User {author}", "username": f"user{author}", "profile_image_url": "p"} for author in authors]},
+        "meta": meta,
+    }}
+
+
+@pytest.fixture
+def now():
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Offline app with an empty mongomock database and a fresh tweet service."""
+    monkeypatch.setattr(indexes, "_ensured", False)
+    monkeypatch.setattr(indexes, "_tweet_id_checked", set())
+    monkeypatch.setattr(tweets_resource, "tweet_service", TweetService())
+
+    app = create_app("prod")
+    app.config["TESTING"] = True
+    yield app
+    close_all()
+    registry.close()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def service():
+    return tweets_resource.tweet_service
+
+
+@pytest.fixture
+def db(app):
+    """MongoDB database of the app (the one its requests use)."""
+    return get_mongo_db()
+
+
+@pytest.fixture
+def context(app, db):
+    """App context with the database set, as during a request (for code called outside one)."""
+    with app.app_context():
+        g.mongo_db = db
+        yield
+
+
+@pytest.fixture
+def replay(app):
+    """Serve the searches from recorded pages: replay(entries) returns the replay client."""
+    def install(entries):
+        twitter = ReplayTwitterClient(RecordedResponses(entries))
+        registry.register("twitter", lambda: twitter, close=lambda client: client.session.close())
+        return twitter
+    return install
@@ -0,0 +1,82 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import api_page, api_tweet
+from services.single_flight import RequestLease, SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do(("refresh", "python"), work)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do(("refresh", "python"), work))) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    while flights.stats()["refresh"]["coalesced"] < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["result"] * 4
+    assert flights.stats()["refresh"] == {"executed": 1, "coalesced": 3, "coalesced_remote": 0, "in_flight": 0}
+
+
+def test_followers_get_the_error_of_the_leader():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError("No tweets received from Twitter API")
+
+    with pytest.raises(ValueError):
+        flights.do(("refresh", "python"), fail)
+    # The failed flight is not kept: the next call runs again
+    assert flights.do(("refresh", "python"), lambda: "ok") == "ok"
+
+
+def test_lease_is_held_by_one_worker_until_released_or_expired(db):
+    lease = RequestLease(db["request_leases"], ttl=30)
+
+    token = lease.acquire("refresh:python")
+    assert token is not None
+    assert lease.acquire("refresh:python") is None
+
+    lease.release("refresh:python", token)
+    assert lease.wait("refresh:python", timeout=1)
+    assert lease.acquire("refresh:python") is not None
+
+    db["request_leases"].update_one({"_id": "refresh:python"}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+    assert lease.acquire("refresh:python") is not None
+
+
+def test_concurrent_requests_share_one_twitter_fetch(app, replay, now):
+    twitter = replay([api_page("python", [api_tweet(now)])])
+    twitter.latency = 0.2
+
+    statuses = []
+    threads = [
+        threading.Thread(target=lambda: statuses.append(app.test_client().get("/fetch_tweets?search=python").status_code))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 5
+    assert twitter.calls == 1
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from analytics.hype_score import HypeScoreEngine, parse_weights
+from analytics.tweets_analytic import calculate_hype_score
+
+HOURLY = [
+    {"hour": 9, "tweet_count": 10, "likes_mean": 2.5, "retweets_mean": 1.0, "replies_mean": 0.5, "sentiment_mean": 0.3},
+    {"hour": 10, "tweet_count": 4, "likes_mean": 0.0, "retweets_mean": 3.0, "replies_mean": 1.0, "sentiment_mean": -0.2},
+]
+
+
+def original_formula(record):
+    return round(
+        record["tweet_count"] * 0.4 + record["likes_mean"] * 0.3 + record["retweets_mean"] * 0.2
+        + record["replies_mean"] * 0.1 + record["sentiment_mean"] * 10, 2
+    )
+
+
+def test_legacy_mode_is_the_original_formula():
+    scores = HypeScoreEngine(mode="legacy").score(pd.DataFrame(HOURLY))
+    assert scores.tolist() == [original_formula(record) for record in HOURLY]
+
+
+def test_calculate_hype_score_keeps_the_record_api():
+    assert calculate_hype_score(HOURLY) == [
+        {"hour": record["hour"], "hype_score": original_formula(record)} for record in HOURLY
+    ]
+
+
+def test_calculate_hype_score_without_an_hour_column():
+    records = [{key: value for key, value in record.items() if key != "hour"} for record in HOURLY]
+    assert calculate_hype_score(records) == [{"hour": 0, "hype_score": original_formula(record)} for record in HOURLY]
+
+
+def test_weights_override_the_legacy_ones():
+    assert parse_weights("likes_mean=1, sentiment_mean=0") == {**parse_weights(""), "likes_mean": 1.0, "sentiment_mean": 0.0}
+    with pytest.raises(ValueError):
+        parse_weights("followers=1")
+
+
+def test_normalization_ignores_constant_metrics():
+    frame = pd.DataFrame([{"tweet_count": 5, "likes_mean": 1}, {"tweet_count": 5, "likes_mean": 3}])
+    scores = HypeScoreEngine(weights={"likes_mean": 1}, normalization="minmax").score(frame)
+    assert scores.tolist() == [0.0, 1.0]
+
+
+def test_decay_halves_the_score_every_half_life():
+    frame = pd.DataFrame([{"hour": 12, "tweet_count": 10}, {"hour": 10, "tweet_count": 10}])
+    scores = HypeScoreEngine(decay_half_life=2).score(frame, now=datetime(2025, 1, 1, 12))
+    assert scores.tolist() == [4.0, 2.0]
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import pytest
+
+from conftest import api_page, api_tweet, tweet_id
+from services.tweets_watermark import TweetWatermarks
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replay client recording the parameters of every search call."""
+    def spy(twitter):
+        recorded = []
+        search = twitter.search_recent_tweets
+
+        def search_recent_tweets(query, **params):
+            recorded.append(params)
+            return search(query, **params)
+
+        monkeypatch.setattr(twitter, "search_recent_tweets", search_recent_tweets)
+        return recorded
+    return spy
+
+
+def watermark(db):
+    return TweetWatermarks(db["tweets_watermarks"]).get("python")
+
+
+def test_incremental_fetch_reads_full_pages_since_the_watermark(client, db, replay, calls, now):
+    old = [api_tweet(now - timedelta(minutes=10), sequence=i) for i in range(3)]
+    new = [api_tweet(now - timedelta(minutes=1), sequence=i) for i in range(2)]
+    recorded = calls(replay([api_page("python", old), api_page("python", new)]))
+
+    client.get("/fetch_tweets?search=python")
+    assert watermark(db) == tweet_id(now - timedelta(minutes=10), 2)
+
+    response = client.get("/fetch_tweets?search=python&force_refresh=true")
+    assert len(response.json["data"]) == 5
+    assert watermark(db) == tweet_id(now - timedelta(minutes=1), 1)
+
+    assert recorded[0]["since_id"] is None and recorded[0]["max_results"] == 10
+    assert recorded[1]["since_id"] == tweet_id(now - timedelta(minutes=10), 2)
+    assert recorded[1]["max_results"] == 100
+
+
+def test_watermark_is_kept_when_the_page_cap_stops_the_fetch(app, client, db, replay, now):
+    app.config["TWITTER_INCREMENTAL_MAX_PAGES"] = 1
+    first = api_tweet(now - timedelta(minutes=30))
+    newest = api_tweet(now - timedelta(minutes=1))
+    between = api_tweet(now - timedelta(minutes=20))
+    replay([
+        api_page("python", [first]),
+        api_page("python", [newest], next_token="more"),
+        # Read again from the watermark, as the API would
+        api_page("python", [newest, between]),
+    ])
+
+    client.get("/fetch_tweets?search=python")
+    client.get("/fetch_tweets?search=python&force_refresh=true")
+    assert watermark(db) == int(first["id"])
+    assert db["tweets"].count_documents({}) == 2
+
+    app.config["TWITTER_INCREMENTAL_MAX_PAGES"] = 10
+    response = client.get("/fetch_tweets?search=python&force_refresh=true")
+    assert watermark(db) == int(newest["id"])
+    assert [tweet["tweet_id"] for tweet in response.json["data"]] == [int(newest["id"]), int(between["id"]), int(first["id"])]
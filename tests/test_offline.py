@@ -0,0 +1,58 @@
+import threading
+
+import mongomock
+
+from offline.mongo import SerializedMongomock, create_offline_mongo_client
+from offline.twitter import RecordedResponses, ReplayTwitterClient, SyntheticResponses
+
+
+def test_offline_client_serializes_only_its_own_operations():
+    client = create_offline_mongo_client()
+
+    assert isinstance(client, SerializedMongomock)
+    assert isinstance(client["twitter_db"]["tweets"], SerializedMongomock)
+    assert not hasattr(mongomock.Collection.update_one, "__wrapped__")
+
+
+def test_concurrent_upserts_and_reads_do_not_fail():
+    collection = create_offline_mongo_client()["twitter_db"]["tweets"]
+    errors = []
+
+    def work(worker):
+        try:
+            for i in range(200):
+                collection.update_one({"tweet_id": i % 20}, {"$inc": {"seen": 1}}, upsert=True)
+                list(collection.find({"tweet_id": {"$lt": 10}}).sort("tweet_id", -1))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert collection.count_documents({}) == 20
+    assert sum(document["seen"] for document in collection.find()) == 8 * 200
+
+
+def test_synthetic_pages_follow_next_token_with_growing_ids():
+    twitter = ReplayTwitterClient(SyntheticResponses(tweets_per_page=5, pages=2))
+
+    first = twitter.search_recent_tweets("python -is:retweet")
+    second = twitter.search_recent_tweets("python -is:retweet", next_token=first.meta["next_token"])
+
+    assert len(first.data) == len(second.data) == 5
+    assert "next_token" not in second.meta
+    assert min(tweet.id for tweet in second.data) > max(tweet.id for tweet in first.data)
+    assert {user.id for user in first.includes["users"]} >= {tweet.author_id for tweet in first.data}
+    assert twitter.rate_limit_headers["x-rate-limit-remaining"] == "448"
+
+
+def test_recorded_pages_drop_tweets_up_to_since_id():
+    page = {"data": [{"id": i, "text": "t", "edit_history_tweet_ids": [i]} for i in ("30", "20", "10")], "meta": {}}
+    twitter = ReplayTwitterClient(RecordedResponses([{"query": "python -is:retweet", "response": page}]))
+
+    response = twitter.search_recent_tweets("python -is:retweet", since_id=15)
+    assert [tweet.id for tweet in response.data] == [30, 20]
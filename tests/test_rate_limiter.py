@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.rate_limiter import RateLimiter, SEARCH_RECENT_ENDPOINT
+
+
+@pytest.fixture
+def limiter(db):
+    return RateLimiter(db["rate_limits"], limit=3, window=900)
+
+
+def bucket(limiter):
+    return limiter.collection.find_one({"endpoint": SEARCH_RECENT_ENDPOINT})
+
+
+def test_acquire_takes_tokens_until_the_budget_is_exhausted(limiter):
+    assert [limiter.acquire(SEARCH_RECENT_ENDPOINT)[0] for _ in range(4)] == [True, True, True, False]
+
+    allowed, retry_at = limiter.acquire(SEARCH_RECENT_ENDPOINT)
+    assert not allowed
+    assert retry_at == bucket(limiter)["reset_at"]
+
+
+def test_headers_resynchronize_the_bucket(limiter):
+    limiter.acquire(SEARCH_RECENT_ENDPOINT)
+    limiter.update_from_headers(SEARCH_RECENT_ENDPOINT, {"x-rate-limit-remaining": "0", "x-rate-limit-limit": "180"})
+
+    assert limiter.acquire(SEARCH_RECENT_ENDPOINT)[0] is False
+    assert bucket(limiter)["limit"] == 180
+
+
+def test_refill_uses_the_limit_reported_by_the_api(limiter):
+    past_reset = int((datetime.utcnow() - timedelta(seconds=1)).timestamp())
+    limiter.acquire(SEARCH_RECENT_ENDPOINT)
+    limiter.update_from_headers(SEARCH_RECENT_ENDPOINT, {
+        "x-rate-limit-remaining": "0", "x-rate-limit-limit": "180", "x-rate-limit-reset": str(past_reset)
+    })
+
+    assert limiter.acquire(SEARCH_RECENT_ENDPOINT)[0] is True
+    assert bucket(limiter)["remaining"] == 179
+
+
+def test_too_many_requests_exhausts_the_budget_until_retry_after(limiter):
+    retry_at = limiter.register_too_many_requests(SEARCH_RECENT_ENDPOINT, None, retry_after=60)
+
+    allowed, reset_at = limiter.acquire(SEARCH_RECENT_ENDPOINT)
+    assert not allowed
+    # MongoDB keeps datetimes to the millisecond
+    assert abs(reset_at - retry_at) < timedelta(milliseconds=1)
+    assert retry_at > datetime.utcnow() + timedelta(seconds=50)
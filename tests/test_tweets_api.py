@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from config.clients import registry
+from conftest import api_page, api_tweet
+
+
+def test_refresh_and_cached_reads_return_the_same_documents(client, replay, now):
+    replay([api_page("python", [api_tweet(now - timedelta(minutes=i), sequence=i) for i in range(5)])])
+
+    refreshed = client.get("/fetch_tweets?search=python&force_refresh=true")
+    cached = client.get("/fetch_tweets?search=python")
+
+    assert refreshed.status_code == cached.status_code == 200
+    assert refreshed.json["data"] == cached.json["data"]
+    assert all(isinstance(tweet["search"], list) and "_id" in tweet for tweet in cached.json["data"])
+
+
+def test_refresh_with_write_behind_returns_the_stored_documents(app, client, replay, now):
+    app.config["WRITE_BEHIND"] = True
+    replay([api_page("python", [api_tweet(now - timedelta(minutes=i), sequence=i) for i in range(5)])])
+
+    refreshed = client.get("/fetch_tweets?search=python&force_refresh=true")
+    cached = client.get("/fetch_tweets?search=python")
+
+    assert refreshed.json["data"] == cached.json["data"]
+
+
+def test_conditional_get_returns_304_until_new_tweets_are_stored(client, replay, now):
+    twitter = replay([
+        api_page("python", [api_tweet(now - timedelta(minutes=10))]),
+        api_page("python", [api_tweet(now - timedelta(minutes=1))]),
+    ])
+
+    first = client.get("/fetch_tweets?search=python")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag
+
+    again = client.get("/fetch_tweets?search=python", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert twitter.calls == 1
+
+    changed = client.get("/fetch_tweets?search=python&force_refresh=true", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json["data"]) == 2
+
+
+def test_keyset_pagination_walks_every_tweet_once(client, replay, now):
+    replay([api_page("python", [api_tweet(now - timedelta(minutes=i), sequence=i) for i in range(5)])])
+
+    pages, after = [], None
+    while True:
+        response = client.get("/fetch_tweets?search=python&limit=2" + (f"&after={after}" if after else ""))
+        assert response.status_code == 200
+        pages.append(response.json["data"]["tweets"])
+        after = response.json["data"]["next"]
+        if not after:
+            break
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    created = [tweet["created_at"] for page in pages for tweet in page]
+    assert created == sorted(created, reverse=True)
+    assert len({tweet["tweet_id"] for page in pages for tweet in page}) == 5
+
+
+def test_health_touches_no_client(client):
+    def unavailable():
+        raise RuntimeError("Twitter credentials not configured")
+
+    registry.register("twitter", unavailable)
+    registry.register("mongo", unavailable)
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/fetch_tweets?search=python").status_code == 500
+
+
+def test_ready_fails_without_the_unique_tweet_id_index(app, client, replay, now):
+    app.config["MONGO_ENSURE_INDEXES"] = False
+    replay([api_page("python", [api_tweet(now)])])
+
+    assert client.get("/ready").status_code == 503
+    assert client.get("/fetch_tweets?search=python").status_code == 500
+
+    app.config["MONGO_ENSURE_INDEXES"] = True
+    assert client.get("/fetch_tweets?search=python").status_code == 200
+    assert client.get("/ready").status_code == 200
@@ -0,0 +1,83 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from config.indexes import MissingIndexError, ensure_indexes
+from services.tweets_writer import TweetWriter
+
+
+def document(tweet_id: int, likes: int = 0, hour: int = 10):
+    return {
+        "tweet_id": tweet_id,
+        "text": f"tweet {tweet_id}",
+        "created_at": datetime(2025, 1, 1, hour),
+        "public_metrics": {"like_count": likes},
+        "likes": likes,
+        "retweets": 0,
+        "replies": 0,
+        "sentiment": 0.5,
+    }
+
+
+@pytest.fixture
+def tweets(db, context):
+    ensure_indexes(db)
+    return db["tweets"]
+
+
+def test_upsert_reports_new_tweets_then_engagement_deltas(tweets):
+    writer = TweetWriter(tweets, batch_size=2)
+
+    first = writer.upsert("python", [document(1), document(2), document(3)])
+    assert first["upserted"] == 3
+    assert [tweet["tweet_id"] for tweet in first["new_for_search"]] == [1, 2, 3]
+
+    second = writer.upsert("python", [document(1, likes=5), document(2)])
+    assert second["new_for_search"] == []
+    assert second["modified"] == 1
+    assert second["engagement_deltas"] == [{"created_at": datetime(2025, 1, 1, 10), "likes": 5, "retweets": 0, "replies": 0}]
+    assert tweets.find_one({"tweet_id": 1})["likes"] == 5
+    assert tweets.count_documents({}) == 3
+
+
+def test_a_tweet_is_new_once_for_each_search_term(tweets):
+    writer = TweetWriter(tweets)
+
+    writer.upsert("python", [document(1)])
+    report = writer.upsert("django", [document(1)])
+
+    assert [tweet["tweet_id"] for tweet in report["new_for_search"]] == [1]
+    assert sorted(tweets.find_one({"tweet_id": 1})["search"]) == ["django", "python"]
+    assert tweets.count_documents({}) == 1
+
+
+def test_concurrent_ingests_report_each_tweet_once(tweets):
+    reports = []
+
+    def ingest():
+        reports.append(TweetWriter(tweets).upsert("python", [document(i) for i in range(20)]))
+
+    threads = [threading.Thread(target=ingest) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    new = [tweet["tweet_id"] for report in reports for tweet in report["new_for_search"]]
+    assert sorted(new) == list(range(20))
+
+
+def test_upsert_refuses_to_write_without_the_unique_index(db, context):
+    with pytest.raises(MissingIndexError):
+        TweetWriter(db["tweets"]).upsert("python", [document(1)])
+    assert db["tweets"].count_documents({}) == 0
+
+
+def test_ensure_indexes_fails_when_tweets_are_duplicated(db, context):
+    db["tweets"].insert_many([document(1), document(1)])
+
+    with pytest.raises(MissingIndexError):
+        ensure_indexes(db)
+    with pytest.raises(MissingIndexError):
+        TweetWriter(db["tweets"]).upsert("python", [document(2)])
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from services.write_behind import WriteBehindBuffer
+
+
+def documents(*tweet_ids, likes=0):
+    return [{"tweet_id": tweet_id, "likes": likes} for tweet_id in tweet_ids]
+
+
+def test_jobs_of_a_term_are_flushed_together_with_each_tweet_once():
+    flushed = []
+    buffer = WriteBehindBuffer(lambda search, docs: flushed.append((search, docs)) or {"upserted": len(docs)}, flush_interval=60)
+
+    first = buffer.submit("python", documents(1, 2))
+    second = buffer.submit("python", documents(2, 3, likes=5))
+    buffer.flush_now()
+
+    assert second.wait(5) == {"upserted": 3}
+    assert first.report == second.report
+    assert flushed == [("python", [{"tweet_id": 1, "likes": 0}, {"tweet_id": 2, "likes": 5}, {"tweet_id": 3, "likes": 5}])]
+    assert not buffer.has_pending("python")
+    buffer.close()
+
+
+def test_submit_returns_none_when_the_queue_is_full():
+    release = threading.Event()
+    buffer = WriteBehindBuffer(lambda search, docs: release.wait(5), flush_interval=0, max_pending=2, block_timeout=0.05)
+
+    assert buffer.submit("python", documents(1, 2)) is not None
+    assert buffer.submit("python", documents(3)) is None
+    assert buffer.stats()["rejected"] == 1
+
+    release.set()
+    assert buffer.drain(5)
+    assert buffer.submit("python", documents(3)) is not None
+    buffer.close()
+
+
+def test_a_failed_flush_is_raised_to_the_waiting_request(app):
+    def fail(search, docs):
+        raise RuntimeError("MongoDB unavailable")
+
+    buffer = WriteBehindBuffer(fail, flush_interval=0, context=app.app_context)
+    job = buffer.submit("python", documents(1))
+
+    with pytest.raises(RuntimeError):
+        job.wait(5)
+    assert buffer.stats()["failed_jobs"] == 1
+    buffer.close()
+
+
+def test_close_drains_the_queue_and_later_submits_are_refused():
+    flushed = []
+    buffer = WriteBehindBuffer(lambda search, docs: flushed.extend(docs), flush_interval=60)
+
+    buffer.submit("python", documents(1))
+    assert buffer.close(5)
+    assert flushed == documents(1)
+    assert buffer.submit("python", documents(2)) is None
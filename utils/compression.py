@@ -0,0 +1,78 @@
+import gzip
+from typing import Optional
+
+from flask import Flask, Response, request
+
+from utils.http_cache import ResponseCache
+from utils.instrumentation import timed
+
+try:
+    import brotli
+except ImportError:  # brotli is optional (pip install brotli)
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/plain", "text/html", "text/csv"}
+
+# Compressed bodies of responses with an ETag, so hot payloads are compressed once per encoding
+compressed_cache = ResponseCache(max_entries=128, max_bytes=20 * 1024 * 1024)
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """Best encoding accepted by the client: brotli (when installed), then gzip."""
+    offered = (["br"] if brotli is not None else []) + ["gzip"]
+    return accept_encodings.best_match(offered)
+
+
+def init_compression(app: Flask) -> None:
+    """
+    Compress responses bigger than COMPRESS_MIN_SIZE bytes with the encoding negotiated
+    from Accept-Encoding. Streamed responses (NDJSON) are sent as they are.
+    """
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        config = app.config
+        if not config.get("COMPRESS_RESPONSES", True):
+            return response
+
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        if len(body) < config.get("COMPRESS_MIN_SIZE", 1024):
+            return response
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        etag, _ = response.get_etag()
+        cached = compressed_cache.get(f"{etag}:{encoding}") if etag else None
+        if cached is not None:
+            compressed = cached[0]
+        else:
+            with timed("compress"):
+                compressed = compress(
+                    body, encoding,
+                    gzip_level=config.get("COMPRESS_GZIP_LEVEL", 6),
+                    brotli_quality=config.get("COMPRESS_BROTLI_QUALITY", 4)
+                )
+            if etag:
+                compressed_cache.put(f"{etag}:{encoding}", compressed, response.mimetype)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
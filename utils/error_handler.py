@@ -5,6 +5,7 @@ from werkzeug.exceptions import HTTPException
 import traceback
 import logging
 
+from services.rate_limiter import RateLimitExceeded
 from utils.logger import handle_logger
 from utils.response_http_util import standard_response
 
@@ -44,6 +45,11 @@ def handle_exceptions(route_function):
     def wrapper(*args, **kwargs):
         try:
             return route_function(*args, **kwargs)
+        except RateLimitExceeded as re:
+            handle_logger(message=f"RateLimitExceeded: {str(re)}", type_logger="warning")
+            response, status_code = standard_response(False, "Twitter API rate limit reached, try again later", 429)
+            response.headers["Retry-After"] = str(re.retry_after)
+            return response, status_code
         except ValueError as ve:
             handle_logger(message=f"ValueError: {str(ve)}", type_logger="error")
             return standard_response(False, str(ve), 400)
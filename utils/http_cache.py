@@ -0,0 +1,123 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import Response, current_app, request
+from werkzeug.http import is_resource_modified
+
+
+class ResponseCache:
+    """
+    In-process LRU of serialized JSON responses, keyed by ETag.
+
+    The ETag changes whenever the underlying data changes, so entries never need to be
+    invalidated: outdated ones simply stop being requested and fall off the LRU. Bounded
+    by entry count and by total body size.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 50 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        if max_entries is not None:
+            self.max_entries = int(max_entries)
+        if max_bytes is not None:
+            self.max_bytes = int(max_bytes)
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, body: bytes, mimetype: str) -> None:
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._entries[key] = (body, mimetype)
+            self._size += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._size}
+
+
+response_cache = ResponseCache()
+
+
+def make_etag(route: str, variant: str, version: str) -> str:
+    return hashlib.sha1(f"{route}|{variant}|{version}".encode("utf-8")).hexdigest()[:32]
+
+
+def conditional_response(
+    route: str,
+    version: str,
+    last_modified: Optional[datetime],
+    build: Callable[[], Tuple[Response, int]],
+    variant: str = "",
+    store: bool = True
+):
+    """
+    Serve a read endpoint with ETag / Last-Modified validation.
+
+    Parameters:
+    - route: Route name, also used for its `<ROUTE>_MAX_AGE` Cache-Control setting
+    - version: Version token of the data behind the response (see `TweetService.data_version`)
+    - last_modified: When that data last changed
+    - build: Builds the response when the client's copy is outdated, as (response, status)
+    - variant: Everything else the body depends on (search term, query params)
+    - store: Keep the serialized body in the in-process LRU (not for streamed responses)
+
+    Returns:
+    - 304 Not Modified when If-None-Match / If-Modified-Since match, the cached body on an
+      LRU hit, or the built response. Only 200 responses get the caching headers.
+    """
+    etag = make_etag(route, variant, version)
+    max_age = current_app.config.get(f"{route.upper()}_MAX_AGE", 0)
+
+    def with_headers(response: Response) -> Response:
+        response.set_etag(etag, weak=True)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.cache_control.max_age = max_age
+        response.cache_control.must_revalidate = True
+        return response
+
+    if not is_resource_modified(request.environ, etag=f'W/"{etag}"', last_modified=last_modified):
+        return with_headers(Response(status=304))
+
+    response_cache.configure(
+        max_entries=current_app.config.get("HTTP_RESPONSE_CACHE_SIZE"),
+        max_bytes=current_app.config.get("HTTP_RESPONSE_CACHE_MAX_BYTES")
+    )
+    if store:
+        cached = response_cache.get(etag)
+        if cached is not None:
+            body, mimetype = cached
+            return with_headers(Response(body, status=200, mimetype=mimetype))
+
+    response, status = build()
+    if status != 200:
+        return response, status
+
+    if store:
+        response_cache.put(etag, response.get_data(), response.mimetype)
+    return with_headers(response)
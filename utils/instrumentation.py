@@ -0,0 +1,334 @@
+import bisect
+import inspect
+import threading
+import time
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Flask, g, request
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+NAMESPACE = "coletor"
+
+# Seconds, from a cache hit to a slow Twitter fetch
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base of the metrics of a `Registry`: name, help text, label names and the lock of its values."""
+
+    kind = "untyped"
+
+    def __init__(self, registry: "Registry", name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = f"{NAMESPACE}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        return iter(())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+    def clear(self) -> None:
+        pass
+
+
+class Counter(Metric):
+    """Monotonic count per label set. `inc` is a no-op while the registry is disabled."""
+
+    kind = "counter"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if not self.registry.enabled or not amount:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield "", dict(zip(self.labelnames, key)), value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Metric):
+    """
+    Cumulative histogram of observations (seconds) per label set, with `_sum` and `_count`.
+    `observe` is a no-op while the registry is disabled.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, *args: Any, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1])) for key, state in self._values.items())
+        for key, (counts, total) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Metric):
+    """Value read when the metrics are rendered: `collect()` returns a number or {label value tuple: number}."""
+
+    kind = "gauge"
+
+    def __init__(self, *args: Any, collect: Callable[[], Any], **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.collect = collect
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        value = self.collect()
+        if isinstance(value, dict):
+            for key, number in sorted(value.items()):
+                yield "", dict(zip(self.labelnames, key if isinstance(key, tuple) else (key,))), number
+        elif value is not None:
+            yield "", {}, value
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+# Stage timings of the current request, collected for its profile (see utils/profiling.py)
+_stage_recorder: ContextVar[Optional[Dict[str, Dict[str, float]]]] = ContextVar("stage_recorder", default=None)
+
+
+def start_stage_recording(stages: Dict[str, Dict[str, float]]) -> Token:
+    """
+    Also add the stages timed in the current context to `stages` ({stage: {"calls", "seconds"}}),
+    whether or not the metrics are enabled. Pass the token to `stop_stage_recording`.
+    """
+    return _stage_recorder.set(stages)
+
+
+def stop_stage_recording(token: Token) -> None:
+    _stage_recorder.reset(token)
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "stage", "started")
+
+    def __init__(self, histogram: Histogram, stage: str):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self) -> "_StageTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        elapsed = time.perf_counter() - self.started
+        self.histogram.observe(elapsed, stage=self.stage)
+        stages = _stage_recorder.get()
+        if stages is not None:
+            entry = stages.setdefault(self.stage, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+        return False
+
+
+class Registry:
+    """
+    Metrics of this process, rendered in the Prometheus text format.
+
+    Disabled by default: counters and histograms then ignore updates and `timed` returns a
+    shared no-op context manager (unless a profiled request records its stages), so
+    instrumented code pays an attribute check and a context variable lookup.
+    Each gunicorn worker keeps its own values (a scrape reads the worker that answered).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = time.time()
+        self._metrics: Dict[str, Metric] = {}
+
+    def configure(self, enabled: bool) -> None:
+        self.enabled = bool(enabled)
+
+    def _register(self, metric: Metric) -> Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets=buckets))
+
+    def gauge(self, name: str, documentation: str, collect: Callable[[], Any], labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames, collect=collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception:  # a failing gauge callback must not break the scrape
+                continue
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Forget the recorded values (counters and histograms)."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "stage_duration_seconds", "Duration of the pipeline stages (fetch, process, store, ...).", ("stage",)
+)
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Duration of the HTTP requests, by route.", ("endpoint", "method", "status")
+)
+TWEETS_FETCHED = registry.counter("tweets_fetched_total", "Tweets received from the Twitter API.")
+TWEETS_DUPLICATES = registry.counter(
+    "tweets_duplicates_total", "Fetched tweets already stored or queued, updated instead of inserted.", ("source",)
+)
+TWITTER_API_CALLS = registry.counter("twitter_api_calls_total", "Search requests sent to the Twitter API.", ("client",))
+RATE_LIMIT_HITS = registry.counter(
+    "twitter_rate_limited_total",
+    "Twitter fetches stopped by the rate limit: 'budget' (shared budget exhausted) or 'too_many_requests' (HTTP 429).",
+    ("reason",)
+)
+registry.gauge("process_start_time_seconds", "Start time of the process (Unix epoch).", lambda: registry.started_at)
+
+
+def timed(stage: str):
+    """
+    Context manager timing a pipeline stage into `stage_duration_seconds`.
+
+        with timed("store"):
+            ...
+    """
+    if not registry.enabled and _stage_recorder.get() is None:
+        return _NOOP_TIMER
+    return _StageTimer(STAGE_SECONDS, stage)
+
+
+def instrumented(stage: str) -> Callable:
+    """Decorator timing every call of a function (or coroutine function) as `stage`."""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not registry.enabled and _stage_recorder.get() is None:
+                    return await fn(*args, **kwargs)
+                with _StageTimer(STAGE_SECONDS, stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not registry.enabled and _stage_recorder.get() is None:
+                return fn(*args, **kwargs)
+            with _StageTimer(STAGE_SECONDS, stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def init_instrumentation(app: Flask) -> None:
+    """
+    Enable the metrics with INSTRUMENTATION_ENABLED and time every request by route.
+    Register it before `init_compression` so the timing includes the compression.
+    """
+    registry.configure(app.config.get("INSTRUMENTATION_ENABLED", False))
+    if not registry.enabled:
+        return
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started: Optional[float] = g.pop("request_started", None)
+        if started is not None:
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                endpoint=request.url_rule.rule if request.url_rule is not None else "unmatched",
+                method=request.method,
+                status=response.status_code
+            )
+        return response
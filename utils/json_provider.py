@@ -0,0 +1,91 @@
+import decimal
+import uuid
+from datetime import date, datetime
+from typing import Any
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from utils.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # orjson is optional (pip install orjson)
+    orjson = None
+
+JSON_SERIALIZERS = ("orjson", "std")
+
+
+def _to_json(o: Any) -> Any:
+    """Types MongoDB documents and pandas results carry that JSON does not know."""
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if hasattr(o, "item"):  # numpy scalars
+        return o.item()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class StdJSONProvider(DefaultJSONProvider):
+    """
+    Flask's json provider, with ObjectId as str and datetimes as ISO 8601, so documents
+    read from MongoDB can be returned as they are.
+    """
+
+    default = staticmethod(_to_json)
+
+    def response(self, *args: Any, **kwargs: Any):
+        with timed("serialize"):
+            return super().response(*args, **kwargs)
+
+
+class OrjsonProvider(StdJSONProvider):
+    """
+    JSON provider backed by orjson, which serializes datetimes (ISO 8601), dataclasses and
+    numpy values natively and falls back to `_to_json` for ObjectId. Same output shape as
+    `StdJSONProvider`: sorted keys, compact unless `compact` is False or the app is in debug.
+    """
+
+    def _options(self, pretty: bool = False) -> int:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj: Any, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, default=_to_json, option=self._options(pretty))
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        with timed("serialize"):
+            obj = self._prepare_response_obj(args, kwargs)
+            pretty = self.compact is False or (self.compact is None and self._app.debug)
+            body = self.dumps_bytes(obj, pretty=pretty) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def make_json_provider(app: Flask, serializer: str = "orjson") -> DefaultJSONProvider:
+    """
+    JSON provider for `app.json`. Falls back to the standard library when orjson is
+    requested but not installed.
+    """
+    if serializer not in JSON_SERIALIZERS:
+        raise ValueError(f"Unknown JSON serializer: {serializer}")
+    if serializer == "orjson" and orjson is not None:
+        return OrjsonProvider(app)
+    return StdJSONProvider(app)
@@ -0,0 +1,21 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+def encode_cursor(created_at: Optional[datetime], object_id: ObjectId) -> str:
+    """Encode the (created_at, _id) keyset of the last tweet of a page as an opaque cursor."""
+    created = created_at.isoformat() if isinstance(created_at, datetime) else ""
+    raw = f"{created}|{object_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by `encode_cursor`. Raises ValueError on malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created, object_id = raw.split("|", 1)
+        return datetime.fromisoformat(created), ObjectId(object_id)
+    except (ValueError, InvalidId, UnicodeError) as e:
+        raise ValueError("Invalid 'after' cursor") from e
@@ -9,4 +9,54 @@ def get_query_params():
     if not search:
         return None, standard_response(False, "Missing 'search' parameter", 400)
 
-    return force_refresh, search
\ No newline at end of file
+    return force_refresh, search
+
+def get_pagination_params(max_limit: int = 500):
+    """
+    Extracts pagination and streaming parameters from request.
+
+    Returns:
+    - limit (int | None): Page size, None when pagination was not requested.
+    - after (str | None): Opaque cursor returned by the previous page.
+    - stream (bool): Whether the response should be streamed as NDJSON.
+    """
+    limit = request.args.get('limit')
+    after = request.args.get('after') or None
+    stream = request.args.get('format', "").lower() == "ndjson"
+
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("'limit' must be an integer")
+        if limit < 1:
+            raise ValueError("'limit' must be greater than zero")
+        limit = min(limit, max_limit)
+    elif after is not None:
+        limit = max_limit
+
+    return limit, after, stream
+
+
+def get_batch_params(max_terms: int = 20):
+    """
+    Extracts and validates the JSON body of a batch request.
+
+    Expected body: {"searches": ["term", ...], "force_refresh": false}
+    """
+    body = request.get_json(silent=True) or {}
+    searches = body.get('searches')
+    force_refresh = bool(body.get('force_refresh', False))
+
+    if not isinstance(searches, list) or not searches:
+        raise ValueError("'searches' must be a non-empty list")
+    if not all(isinstance(search, str) for search in searches):
+        raise ValueError("'searches' must only contain strings")
+
+    searches = [search.strip().lower() for search in searches if search.strip()]
+    if not searches:
+        raise ValueError("'searches' must contain at least one term")
+    if len(searches) > max_terms:
+        raise ValueError(f"At most {max_terms} search terms are allowed per batch")
+
+    return force_refresh, searches
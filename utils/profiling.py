@@ -0,0 +1,236 @@
+import cProfile
+import glob
+import hmac
+import io
+import json
+import marshal
+import os
+import pstats
+import threading
+import time
+import uuid
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, Response, g, request
+
+from utils.instrumentation import start_stage_recording, stop_stage_recording
+from utils.logger import handle_logger
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # pyinstrument is optional (pip install pyinstrument)
+    SamplingProfiler = None
+
+PROFILERS = ("auto", "cprofile", "pyinstrument")
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_MODES = {"1": "store", "true": "store", "store": "store", "download": "download"}
+
+# One profiled request at a time per process: profilers do not nest, and a profiled
+# request is slower, so concurrent ones would mostly measure each other
+_profile_lock = threading.Lock()
+
+
+def resolve_profiler(name: str) -> str:
+    """Profiler to use: "auto" picks the sampling profiler (pyinstrument) when installed."""
+    if name not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {name}")
+    if name == "auto":
+        return "pyinstrument" if SamplingProfiler is not None else "cprofile"
+    if name == "pyinstrument" and SamplingProfiler is None:
+        return "cprofile"
+    return name
+
+
+class RequestProfile:
+    """Profile of one request: the profiler output and the time spent in each pipeline stage."""
+
+    def __init__(self, profiler: str, mode: str):
+        self.profiler_name = profiler
+        self.mode = mode
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.seconds = 0.0
+        self._profiler: Any = SamplingProfiler() if profiler == "pyinstrument" else cProfile.Profile()
+        self._token = None
+        self._started = 0.0
+        self._running = False
+
+    def start(self) -> None:
+        self._token = start_stage_recording(self.stages)
+        self._started = time.perf_counter()
+        if self.profiler_name == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        self._running = True
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        if self.profiler_name == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        self.seconds = time.perf_counter() - self._started
+        stop_stage_recording(self._token)
+
+    def artifact(self) -> Tuple[str, bytes]:
+        """File name and content of the raw profile: pstats data (cProfile) or an HTML report (pyinstrument)."""
+        if self.profiler_name == "pyinstrument":
+            return f"{self.id}.html", self._profiler.output_html().encode("utf-8")
+        self._profiler.create_stats()
+        return f"{self.id}.prof", marshal.dumps(self._profiler.stats)
+
+    def report(self, limit: int = 40) -> str:
+        """Text report: the call tree (pyinstrument) or the functions by cumulative time (cProfile)."""
+        if self.profiler_name == "pyinstrument":
+            return self._profiler.output_text(unicode=True, color=False)
+        stream = io.StringIO()
+        pstats.Stats(self._profiler, stream=stream).sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def summary(self, response: Response) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "profiler": self.profiler_name,
+            "method": request.method,
+            "path": request.path,
+            "query": request.query_string.decode("utf-8", "replace"),
+            "status": response.status_code,
+            "pid": os.getpid(),
+            "seconds": round(self.seconds, 6),
+            # Stages can nest (e.g. store inside write_behind_flush), so they may add up to more than the total
+            "stages": {
+                stage: {"calls": int(entry["calls"]), "seconds": round(entry["seconds"], 6)}
+                for stage, entry in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"])
+            },
+        }
+
+    def server_timing(self) -> str:
+        """Stage durations as a Server-Timing header (shown by the browser dev tools)."""
+        timings = [f"{stage};dur={entry['seconds'] * 1000:.1f}" for stage, entry in self.stages.items()]
+        return ", ".join(timings + [f"total;dur={self.seconds * 1000:.1f}"])
+
+
+def _requested_mode(app: Flask) -> Optional[str]:
+    """Mode asked by the request ("store" or "download"), when it is allowed to ask for one."""
+    value = request.headers.get(PROFILE_HEADER) or request.args.get("profile")
+    mode = PROFILE_MODES.get((value or "").lower())
+    if mode is None:
+        return None
+
+    token = app.config.get("PROFILING_TOKEN")
+    if token:
+        given = request.headers.get(PROFILE_TOKEN_HEADER) or request.args.get("profile_token") or ""
+        if not hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8")):
+            return None
+    return mode
+
+
+def store_profile(directory: str, profile: RequestProfile, summary: Dict[str, Any], max_files: int = 50) -> str:
+    """
+    Write the profile, its text report and its summary (JSON) to `directory`, keeping
+    the `max_files` most recent profiles. Returns the path of the summary.
+    """
+    os.makedirs(directory, exist_ok=True)
+    name, content = profile.artifact()
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(content)
+    with open(os.path.join(directory, f"{profile.id}.txt"), "w", encoding="utf-8") as f:
+        f.write(profile.report())
+    summary_path = os.path.join(directory, f"{profile.id}.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump({**summary, "artifact": name}, f, indent=2)
+
+    summaries = sorted(glob.glob(os.path.join(directory, "*.json")), key=os.path.getmtime)
+    for old in summaries[:max(0, len(summaries) - max_files)]:
+        stem = os.path.splitext(old)[0]
+        for path in glob.glob(f"{glob.escape(stem)}.*"):
+            os.remove(path)
+    return summary_path
+
+
+def download_response(profile: RequestProfile, summary: Dict[str, Any]) -> Response:
+    """Zip with the profile, its text report and the summary, sent instead of the response."""
+    name, content = profile.artifact()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(name, content)
+        archive.writestr(f"{profile.id}.txt", profile.report())
+        archive.writestr(f"{profile.id}.json", json.dumps({**summary, "artifact": name}, indent=2))
+
+    response = Response(buffer.getvalue(), mimetype="application/zip")
+    response.headers["Content-Disposition"] = f'attachment; filename="profile-{profile.id}.zip"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def init_profiling(app: Flask) -> None:
+    """
+    Profile requests on demand, when PROFILING_ENABLED.
+
+    A request sent with "X-Profile: 1" (or ?profile=1) runs under the profiler (PROFILER)
+    and its profile is stored in PROFILE_DIR; with "download" the profile is returned as a
+    zip instead of the response. When PROFILING_TOKEN is set, the request must also send
+    it ("X-Profile-Token" or ?profile_token=). Profiled responses carry the profile id and
+    the time spent in each pipeline stage (Server-Timing).
+
+    Only one request per process is profiled at a time; others run unprofiled. Disabled,
+    no hook is registered. Register it first so the profile covers the other hooks.
+    Streamed bodies (NDJSON) are generated after the profile ends.
+    """
+    if not app.config.get("PROFILING_ENABLED", False):
+        return
+
+    profiler = resolve_profiler(app.config.get("PROFILER", "auto"))
+    if not app.config.get("PROFILING_TOKEN") and not app.debug:
+        app.logger.warning("⚠️ Profiling enabled without PROFILING_TOKEN: any client can profile requests")
+
+    @app.before_request
+    def start_profile():
+        mode = _requested_mode(app)
+        if mode is None:
+            return None
+        if not _profile_lock.acquire(blocking=False):
+            g.profile_busy = True
+            return None
+        g.profile = RequestProfile(profiler, mode)
+        g.profile.start()
+        return None
+
+    @app.after_request
+    def finish_profile(response: Response) -> Response:
+        if g.pop("profile_busy", False):
+            response.headers["X-Profile-Status"] = "busy"
+            return response
+
+        profile: Optional[RequestProfile] = g.get("profile")
+        if profile is None:
+            return response
+        profile.stop()
+
+        summary = profile.summary(response)
+        if profile.mode == "download":
+            cors_headers = [(name, value) for name, value in response.headers if name.startswith("Access-Control-")]
+            response = download_response(profile, summary)
+            response.headers.extend(cors_headers)
+        else:
+            path = store_profile(
+                app.config.get("PROFILE_DIR", "profiles"), profile, summary, app.config.get("PROFILE_MAX_FILES", 50)
+            )
+            handle_logger(message=f"🔬 Profile {profile.id} of {request.path} stored in {path}", type_logger="info")
+
+        response.headers["X-Profile-Id"] = profile.id
+        response.headers["Server-Timing"] = profile.server_timing()
+        return response
+
+    @app.teardown_request
+    def release_profile(exception=None):
+        profile: Optional[RequestProfile] = g.pop("profile", None)
+        if profile is not None:
+            profile.stop()
+            _profile_lock.release()